@@ -0,0 +1,179 @@
+"""
+Application settings read from environment variables and the project .env.
+"""
+
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from dotenv import load_dotenv
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+dotenv_path = BASE_DIR / '.env'
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Runtime configuration. Defaults suit a single production worker."""
+    db_username: Optional[str] = None
+    db_password: Optional[str] = None
+    db_host: Optional[str] = None
+    db_port: Optional[str] = None
+    db_name: Optional[str] = None
+    # Full SQLAlchemy URL; overrides the DB_* parts above when set.
+    database_url_override: Optional[str] = None
+
+    db_echo: bool = False
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    # Pooled connections opened at startup (per worker, per database), capped at db_pool_size.
+    db_pool_warmup: int = 2
+    # asyncpg prepared statement cache; set to 0 behind pgbouncer in transaction mode.
+    db_statement_cache_size: int = 100
+
+    # Read replicas for GET routes; empty means every query uses the primary.
+    database_replica_urls: tuple[str, ...] = ()
+    # After a write, the client's reads stay on the primary for this long.
+    db_replica_sticky_seconds: float = 5.0
+    # A replica that failed to connect is skipped for this long.
+    db_replica_retry_seconds: float = 30.0
+
+    rate_limit_enabled: bool = True
+    # shm:// counters are shared by all workers on the host; memory:// is per process.
+    rate_limit_storage_uri: str = "shm://"
+    rate_limit_register: str = "10/minute"
+    rate_limit_register_bulk: str = "10/minute"
+
+    # Attendee exports are exempt from rate limits but capped per worker.
+    export_max_concurrency: int = 4
+
+    # Idempotency-Key responses kept per worker for POST /events and /{event_id}/register.
+    idempotency_max_keys: int = 10000
+    idempotency_ttl_seconds: float = 86400.0
+
+    # Group-commit window for POST /{event_id}/register; 0 disables batching.
+    registration_batch_window_ms: float = 0.0
+    registration_batch_max_size: int = 500
+
+    # Seat holds (POST /{event_id}/holds) reserve a seat this long before
+    # they must be confirmed; the sweeper frees expired ones every
+    # seat_hold_sweep_seconds (0 disables), seat_hold_sweep_batch per transaction.
+    seat_hold_ttl_seconds: int = 600
+    seat_hold_sweep_seconds: float = 5.0
+    seat_hold_sweep_batch: int = 500
+
+    # Live seat counts on GET /events/stats/stream: updates within this window
+    # are coalesced, other workers' registrations are polled every
+    # seat_feed_poll_seconds (0 disables), idle streams get a keep-alive comment.
+    seat_feed_coalesce_ms: float = 100.0
+    seat_feed_poll_seconds: float = 2.0
+    seat_feed_keepalive_seconds: float = 15.0
+
+    # Per-route latency / query metrics on GET /metrics.
+    metrics_enabled: bool = True
+    # Log a warning when one request issues more statements than this; 0 disables.
+    metrics_query_warning_threshold: int = 10
+
+    # Request profiling: requests sending "X-Profile: <profile_token>", plus
+    # this fraction of all requests, get a stack/SQL profile written to
+    # profile_dir. Off unless a token or a sample rate is set.
+    profile_token: Optional[str] = None
+    profile_sample_rate: float = 0.0
+    profile_dir: str = str(BASE_DIR / "profiles")
+    profile_interval_ms: float = 1.0
+
+    @property
+    def profiling_enabled(self) -> bool:
+        return bool(self.profile_token) or self.profile_sample_rate > 0
+
+    @property
+    def database_url(self) -> str:
+        if self.database_url_override:
+            return self.database_url_override
+        return (
+            f"postgresql+asyncpg://{self.db_username}:{self.db_password}"
+            f"@{self.db_host}:{self.db_port}/{self.db_name}"
+        )
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """Build settings from the process environment."""
+        return cls(
+            db_username=os.getenv('DB_USERNAME'),
+            db_password=os.getenv('DB_PASSWORD'),
+            db_host=os.getenv('DB_HOST'),
+            db_port=os.getenv('DB_PORT'),
+            db_name=os.getenv('DB_NAME'),
+            database_url_override=os.getenv('DATABASE_URL') or None,
+            db_echo=_env_bool('DB_ECHO', cls.db_echo),
+            db_pool_size=_env_int('DB_POOL_SIZE', cls.db_pool_size),
+            db_max_overflow=_env_int('DB_MAX_OVERFLOW', cls.db_max_overflow),
+            db_pool_timeout=_env_float('DB_POOL_TIMEOUT', cls.db_pool_timeout),
+            db_pool_recycle=_env_int('DB_POOL_RECYCLE', cls.db_pool_recycle),
+            db_pool_pre_ping=_env_bool('DB_POOL_PRE_PING', cls.db_pool_pre_ping),
+            db_pool_warmup=_env_int('DB_POOL_WARMUP', cls.db_pool_warmup),
+            db_statement_cache_size=_env_int('DB_STATEMENT_CACHE_SIZE', cls.db_statement_cache_size),
+            database_replica_urls=tuple(
+                url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()
+            ),
+            db_replica_sticky_seconds=_env_float('DB_REPLICA_STICKY_SECONDS', cls.db_replica_sticky_seconds),
+            db_replica_retry_seconds=_env_float('DB_REPLICA_RETRY_SECONDS', cls.db_replica_retry_seconds),
+            rate_limit_enabled=_env_bool('RATE_LIMIT_ENABLED', cls.rate_limit_enabled),
+            rate_limit_storage_uri=os.getenv('RATE_LIMIT_STORAGE_URI') or cls.rate_limit_storage_uri,
+            rate_limit_register=os.getenv('RATE_LIMIT_REGISTER') or cls.rate_limit_register,
+            rate_limit_register_bulk=os.getenv('RATE_LIMIT_REGISTER_BULK') or cls.rate_limit_register_bulk,
+            export_max_concurrency=_env_int('EXPORT_MAX_CONCURRENCY', cls.export_max_concurrency),
+            idempotency_max_keys=_env_int('IDEMPOTENCY_MAX_KEYS', cls.idempotency_max_keys),
+            idempotency_ttl_seconds=_env_float('IDEMPOTENCY_TTL_SECONDS', cls.idempotency_ttl_seconds),
+            registration_batch_window_ms=_env_float(
+                'REGISTRATION_BATCH_WINDOW_MS', cls.registration_batch_window_ms
+            ),
+            registration_batch_max_size=_env_int(
+                'REGISTRATION_BATCH_MAX_SIZE', cls.registration_batch_max_size
+            ),
+            seat_hold_ttl_seconds=_env_int('SEAT_HOLD_TTL_SECONDS', cls.seat_hold_ttl_seconds),
+            seat_hold_sweep_seconds=_env_float('SEAT_HOLD_SWEEP_SECONDS', cls.seat_hold_sweep_seconds),
+            seat_hold_sweep_batch=_env_int('SEAT_HOLD_SWEEP_BATCH', cls.seat_hold_sweep_batch),
+            seat_feed_coalesce_ms=_env_float('SEAT_FEED_COALESCE_MS', cls.seat_feed_coalesce_ms),
+            seat_feed_poll_seconds=_env_float('SEAT_FEED_POLL_SECONDS', cls.seat_feed_poll_seconds),
+            seat_feed_keepalive_seconds=_env_float(
+                'SEAT_FEED_KEEPALIVE_SECONDS', cls.seat_feed_keepalive_seconds
+            ),
+            metrics_enabled=_env_bool('METRICS_ENABLED', cls.metrics_enabled),
+            metrics_query_warning_threshold=_env_int(
+                'METRICS_QUERY_WARNING_THRESHOLD', cls.metrics_query_warning_threshold
+            ),
+            profile_token=os.getenv('PROFILE_TOKEN') or None,
+            profile_sample_rate=_env_float('PROFILE_SAMPLE_RATE', cls.profile_sample_rate),
+            profile_dir=os.getenv('PROFILE_DIR') or cls.profile_dir,
+            profile_interval_ms=_env_float('PROFILE_INTERVAL_MS', cls.profile_interval_ms),
+        )
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Load .env (without overriding real environment variables) and return the settings."""
+    load_dotenv(dotenv_path=dotenv_path)
+    return Settings.from_env()
@@ -2,19 +2,86 @@
 CRUD operations for attendee management.
 """
 
-from uuid import UUID
-from datetime import datetime, timezone
+from collections import Counter
+from typing import AsyncIterator, Optional, Sequence
+from uuid import UUID, uuid4
+from datetime import datetime, timedelta, timezone
 
+from sqlalchemy import Row, delete, exists, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 
 from app import models
+from app.database.db_connection import reads_from_replica
 from app.schemas import attendees
+from utils.cache import EventMetadataCache, event_metadata_cache, event_seats_cache
+from utils.seat_feed import seat_feed
+from utils.common import encode_cursor, decode_cursor
 
 
 # Register attendee
 
+def _event_start_utc(event) -> datetime:
+    """Return the event start time as an aware UTC datetime."""
+    if event.start_time.tzinfo is None:
+        return event.start_time.replace(tzinfo=timezone.utc)
+    return event.start_time.astimezone(timezone.utc)
+
+# Event fields that never change once the event exists.
+EVENT_METADATA_COLUMNS = (models.Event.start_time, models.Event.max_capacity)
+
+async def _event_metadata(session: AsyncSession, event_id: UUID, fresh: bool = False) -> Optional[Row]:
+    """
+    Return the event's (start_time, max_capacity), or None if there is no
+    such event, from event_metadata_cache when possible; otherwise one
+    primary-key lookup whose result is cached. A miss is only cached when
+    the lookup ran on the primary: a lagging replica may not have the event yet.
+    With fresh, always looks the event up, refreshing the cached entry: the
+    archival job runs in its own process, so an API worker can still have
+    an archived event cached for up to the cache TTL.
+    """
+    cached = None if fresh else event_metadata_cache.get(event_id)
+    if cached is not None:
+        event_metadata_cache.saved_round_trips += 1
+        return None if cached is EventMetadataCache.MISSING else cached
+    row = (await session.execute(
+        select(*EVENT_METADATA_COLUMNS).where(models.Event.id == event_id)
+    )).first()
+    if row is None:
+        if not reads_from_replica(session):
+            event_metadata_cache.set_missing(event_id)
+    else:
+        event_metadata_cache.set(event_id, row)
+    return row
+
+def _reject_from_cache(event_id: UUID, now_utc: datetime) -> None:
+    """
+    Fail a registration for a started event straight from
+    event_metadata_cache, skipping the seat claim and the failure lookup.
+    Unknown ids are not refused from the cache: the seat claim and the
+    fresh failure lookup confirm them on the primary.
+    """
+    cached = event_metadata_cache.get(event_id)
+    if cached is not None and cached is not EventMetadataCache.MISSING and now_utc >= _event_start_utc(cached):
+        event_metadata_cache.saved_round_trips += 2
+        raise HTTPException(status_code=400, detail="Registration closed: event has already started.")
+
+async def _raise_claim_failure(session: AsyncSession, event_id: UUID) -> None:
+    """
+    Explain why a seat claim matched no row.
+    Only runs on the failure path, so successful registrations never pay for it.
+    """
+    event = await _event_metadata(session, event_id, fresh=True)
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found.")
+    if datetime.now(timezone.utc) >= _event_start_utc(event):
+        raise HTTPException(status_code=400, detail="Registration closed: event has already started.")
+    raise HTTPException(status_code=400, detail="Event is fully booked.")
+
 async def register_attendee(
     session: AsyncSession,
     event_id: UUID,
@@ -22,73 +89,450 @@ async def register_attendee(
 ) -> models.Attendee:
     """
     Register a new attendee for an event.
-    Validates event existence, timing, capacity, and duplicate email.
+    Claims a seat with a single conditional UPDATE on the event's
+    registered_count, so the timing and capacity checks cost one statement
+    and concurrent registrations cannot overbook. Seats held by seat holds
+    are not available. Duplicate emails are
+    rejected by the _event_email_uc constraint, which also releases the seat.
+    Started events are usually refused from
+    event_metadata_cache without any statement.
     Raises HTTPException on failure.
     """
-    event = await session.get(models.Event, event_id)
-    if not event:
-        raise HTTPException(status_code=404, detail="Event not found.")
+    now_utc = datetime.now(timezone.utc)
+    _reject_from_cache(event_id, now_utc)
+    claim = await session.execute(
+        update(models.Event)
+        .where(
+            models.Event.id == event_id,
+            models.Event.start_time > now_utc,
+            models.Event.registered_count + models.Event.held_count < models.Event.max_capacity
+        )
+        .values(registered_count=models.Event.registered_count + 1)
+        .returning(models.Event.max_capacity, models.Event.registered_count, models.Event.held_count)
+        .execution_options(synchronize_session=False)
+    )
+    seats = claim.first()
+    if seats is None:
+        await session.rollback()
+        await _raise_claim_failure(session, event_id)
 
-    # Check if event has started
-    if event.start_time.tzinfo is None:
-        event_start = event.start_time.replace(tzinfo=timezone.utc)
-    else:
-        event_start = event.start_time.astimezone(timezone.utc)
+    new_attendee = models.Attendee(
+        name=attendee_in.name,
+        email=attendee_in.email,
+        event_id=event_id
+    )
+    session.add(new_attendee)
+    try:
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        raise HTTPException(status_code=400, detail="Email already registered for this event.")
+    event_seats_cache.invalidate()
+    seat_feed.publish(event_id, seats.max_capacity, seats.registered_count, seats.held_count)
+    return new_attendee
+
+# Bulk register attendees
+
+def _insert_ignoring_duplicates(session: AsyncSession):
+    """Return a dialect-specific INSERT that skips rows clashing with _event_email_uc."""
+    insert = pg_insert if session.get_bind().dialect.name == "postgresql" else sqlite_insert
+    return (
+        insert(models.Attendee)
+        .on_conflict_do_nothing(index_elements=["event_id", "email"])
+        .returning(models.Attendee.id, models.Attendee.email)
+    )
+
+async def register_attendees_bulk(
+    session: AsyncSession,
+    event_id: UUID,
+    attendees_in: list[attendees.AttendeeCreate]
+) -> attendees.BulkRegistrationReport:
+    """
+    Register a group of attendees for an event in one transaction.
+    Event timing is validated once while the event row is locked, rows are
+    inserted in a single batched statement that skips emails already on
+    _event_email_uc, and seats are claimed for the accepted rows only.
+    Rows past the remaining capacity are rejected, not the whole request,
+    unless their email is already registered, which is reported as a
+    duplicate.
+    Raises HTTPException if the event does not exist or has started.
+    """
     now_utc = datetime.now(timezone.utc)
-    if now_utc >= event_start:
-        raise HTTPException(status_code=400, detail="Registration closed: event has already started.")
+    _reject_from_cache(event_id, now_utc)
+    # No-op UPDATE: takes the event row lock so single registrations wait
+    # for this batch, and returns the seat counter read under that lock.
+    locked = await session.execute(
+        update(models.Event)
+        .where(models.Event.id == event_id, models.Event.start_time > now_utc)
+        .values(registered_count=models.Event.registered_count)
+        .returning(models.Event.max_capacity, models.Event.registered_count, models.Event.held_count)
+        .execution_options(synchronize_session=False)
+    )
+    row = locked.first()
+    if row is None:
+        await session.rollback()
+        await _raise_claim_failure(session, event_id)
+    remaining = row.max_capacity - row.registered_count - row.held_count
 
-    # Check for overbooking
-    result = await session.execute(
-        select(models.Attendee).where(models.Attendee.event_id == event.id)
+    results: list[attendees.BulkRegistrationResult] = [None] * len(attendees_in)
+    candidates = []
+    seen = set()
+    for index, attendee_in in enumerate(attendees_in):
+        if attendee_in.email in seen:
+            results[index] = attendees.BulkRegistrationResult(
+                index=index, email=attendee_in.email, status="duplicate",
+                detail="Email repeated in this request."
+            )
+            continue
+        seen.add(attendee_in.email)
+        candidates.append((index, attendee_in))
+
+    # Normally one INSERT; another round only runs when duplicates left seats unfilled.
+    accepted = 0
+    while candidates and accepted < remaining:
+        batch = candidates[:remaining - accepted]
+        candidates = candidates[len(batch):]
+        inserted = await session.execute(
+            _insert_ignoring_duplicates(session),
+            [
+                {"id": uuid4(), "name": a.name, "email": a.email, "event_id": event_id}
+                for _, a in batch
+            ]
+        )
+        inserted_ids = {email: attendee_id for attendee_id, email in inserted.all()}
+        for index, attendee_in in batch:
+            attendee_id = inserted_ids.get(attendee_in.email)
+            if attendee_id is None:
+                results[index] = attendees.BulkRegistrationResult(
+                    index=index, email=attendee_in.email, status="duplicate",
+                    detail="Email already registered for this event."
+                )
+            else:
+                accepted += 1
+                results[index] = attendees.BulkRegistrationResult(
+                    index=index, email=attendee_in.email, status="accepted", id=attendee_id
+                )
+
+    # Rows left over once the event is full: report those already registered as duplicates.
+    registered = set()
+    if candidates:
+        registered = set((await session.execute(
+            select(models.Attendee.email).where(
+                models.Attendee.event_id == event_id,
+                models.Attendee.email.in_([a.email for _, a in candidates])
+            )
+        )).scalars())
+    for index, attendee_in in candidates:
+        if attendee_in.email in registered:
+            results[index] = attendees.BulkRegistrationResult(
+                index=index, email=attendee_in.email, status="duplicate",
+                detail="Email already registered for this event."
+            )
+        else:
+            results[index] = attendees.BulkRegistrationResult(
+                index=index, email=attendee_in.email, status="rejected",
+                detail="Event is fully booked."
+            )
+
+    if accepted:
+        await session.execute(
+            update(models.Event)
+            .where(models.Event.id == event_id)
+            .values(registered_count=models.Event.registered_count + accepted)
+            .execution_options(synchronize_session=False)
+        )
+    await session.commit()
+    if accepted:
+        event_seats_cache.invalidate()
+        seat_feed.publish(event_id, row.max_capacity, row.registered_count + accepted, row.held_count)
+
+    return attendees.BulkRegistrationReport(
+        accepted=accepted,
+        duplicate=sum(r.status == "duplicate" for r in results),
+        rejected=sum(r.status == "rejected" for r in results),
+        results=results
     )
-    attendees = result.scalars().all()
-    if len(attendees) >= event.max_capacity:
-        raise HTTPException(status_code=400, detail="Event is fully booked.")
-
-    # Check for duplicate email
-    result = await session.execute(
-        select(models.Attendee).where(
-            models.Attendee.event_id == event.id,
-            models.Attendee.email == attendee_in.email
+
+# Seat holds
+
+async def hold_seat(
+    session: AsyncSession,
+    event_id: UUID,
+    attendee_in: attendees.AttendeeCreate,
+    ttl_seconds: int
+) -> models.SeatHold:
+    """
+    Reserve a seat for attendee_in for ttl_seconds (never past the event
+    start) while they check out.
+    The seat is claimed from the event's held_count with the same single
+    conditional UPDATE as register_attendee, so holds and registrations
+    together cannot overbook, and it stays claimed until the hold is
+    confirmed, released or expired. An email that is already registered
+    or holds an unexpired seat for the event is refused, and its seat
+    claim rolled back.
+    Raises HTTPException on failure.
+    """
+    now_utc = datetime.now(timezone.utc)
+    _reject_from_cache(event_id, now_utc)
+    claim = await session.execute(
+        update(models.Event)
+        .where(
+            models.Event.id == event_id,
+            models.Event.start_time > now_utc,
+            models.Event.registered_count + models.Event.held_count < models.Event.max_capacity
         )
+        .values(held_count=models.Event.held_count + 1)
+        .returning(
+            models.Event.start_time, models.Event.max_capacity,
+            models.Event.registered_count, models.Event.held_count
+        )
+        .execution_options(synchronize_session=False)
     )
-    if result.first():
+    seats = claim.first()
+    if seats is None:
+        await session.rollback()
+        await _raise_claim_failure(session, event_id)
+    # Checked under the event row lock taken by the claim, so concurrent
+    # holds and registrations for the same email see each other.
+    taken = await session.scalar(select(
+        exists().where(models.Attendee.event_id == event_id, models.Attendee.email == attendee_in.email)
+        | exists().where(
+            models.SeatHold.event_id == event_id,
+            models.SeatHold.email == attendee_in.email,
+            models.SeatHold.expires_at > now_utc
+        )
+    ))
+    if taken:
+        await session.rollback()
         raise HTTPException(status_code=400, detail="Email already registered for this event.")
 
-    new_attendee = models.Attendee(
+    hold = models.SeatHold(
+        event_id=event_id,
         name=attendee_in.name,
         email=attendee_in.email,
-        event_id=event.id
+        expires_at=min(now_utc + timedelta(seconds=ttl_seconds), _event_start_utc(seats))
     )
-    session.add(new_attendee)
+    session.add(hold)
     await session.commit()
-    await session.refresh(new_attendee)
+    event_seats_cache.invalidate()
+    seat_feed.publish(event_id, seats.max_capacity, seats.registered_count, seats.held_count)
+    return hold
+
+async def _drop_holds(session: AsyncSession, *criteria) -> tuple[int, list[Row]]:
+    """
+    Delete the seat holds matching criteria and hand their seats back with
+    one counter UPDATE per event. Only holds this statement actually deleted
+    are counted, so a hold raced by the sweeper is never released twice.
+    Returns the number of holds deleted and the new seat counts of the
+    affected events, to publish after commit.
+    """
+    deleted = await session.execute(
+        delete(models.SeatHold).where(*criteria).returning(models.SeatHold.event_id),
+        execution_options={"synchronize_session": False}
+    )
+    released_per_event = Counter(deleted.scalars())
+    seats = []
+    for event_id, released in released_per_event.items():
+        counts = await session.execute(
+            update(models.Event)
+            .where(models.Event.id == event_id)
+            .values(held_count=models.Event.held_count - released)
+            .returning(
+                models.Event.id, models.Event.max_capacity,
+                models.Event.registered_count, models.Event.held_count
+            )
+            .execution_options(synchronize_session=False)
+        )
+        seats.append(counts.one())
+    return sum(released_per_event.values()), seats
+
+def _publish_seats(seats: Sequence[Row]) -> None:
+    if seats:
+        event_seats_cache.invalidate()
+    for row in seats:
+        seat_feed.publish(row.id, row.max_capacity, row.registered_count, row.held_count)
+
+async def confirm_seat_hold(session: AsyncSession, event_id: UUID, hold_id: UUID) -> models.Attendee:
+    """
+    Turn an unexpired seat hold into an attendee.
+    The hold is deleted by primary key and its seat moved from held_count
+    to registered_count in the same transaction, so capacity is never
+    checked again and a confirm cannot oversell. If the email is already
+    registered for the event, the hold is released.
+    Raises HTTPException if the hold is unknown (404) or expired (410).
+    """
+    now_utc = datetime.now(timezone.utc)
+    deleted = await session.execute(
+        delete(models.SeatHold)
+        .where(
+            models.SeatHold.id == hold_id,
+            models.SeatHold.event_id == event_id,
+            models.SeatHold.expires_at > now_utc
+        )
+        .returning(models.SeatHold.name, models.SeatHold.email),
+        execution_options={"synchronize_session": False}
+    )
+    hold = deleted.first()
+    if hold is None:
+        await session.rollback()
+        stale = await session.get(models.SeatHold, hold_id)
+        if stale is not None and stale.event_id == event_id:
+            raise HTTPException(status_code=410, detail="Seat hold has expired.")
+        raise HTTPException(status_code=404, detail="Seat hold not found.")
+
+    seats = (await session.execute(
+        update(models.Event)
+        .where(models.Event.id == event_id)
+        .values(
+            held_count=models.Event.held_count - 1,
+            registered_count=models.Event.registered_count + 1
+        )
+        .returning(models.Event.max_capacity, models.Event.registered_count, models.Event.held_count)
+        .execution_options(synchronize_session=False)
+    )).one()
+    new_attendee = models.Attendee(name=hold.name, email=hold.email, event_id=event_id)
+    session.add(new_attendee)
+    try:
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        _, seats = await _drop_holds(session, models.SeatHold.id == hold_id)
+        await session.commit()
+        _publish_seats(seats)
+        raise HTTPException(status_code=400, detail="Email already registered for this event.")
+    event_seats_cache.invalidate()
+    seat_feed.publish(event_id, seats.max_capacity, seats.registered_count, seats.held_count)
     return new_attendee
 
+async def release_seat_hold(session: AsyncSession, event_id: UUID, hold_id: UUID) -> None:
+    """
+    Cancel a seat hold and give its seat back straight away.
+    Raises HTTPException if the hold is unknown or already expired and swept.
+    """
+    released, seats = await _drop_holds(
+        session, models.SeatHold.id == hold_id, models.SeatHold.event_id == event_id
+    )
+    if not released:
+        await session.rollback()
+        raise HTTPException(status_code=404, detail="Seat hold not found.")
+    await session.commit()
+    _publish_seats(seats)
+
+async def expire_seat_holds(
+    session: AsyncSession,
+    now: Optional[datetime] = None,
+    batch_size: int = 500
+) -> int:
+    """
+    Delete holds that expired before now (default: the current time) and
+    give their seats back, oldest first, batch_size holds per transaction.
+    Expired holds are found on ix_seat_holds_expires_at, so each batch
+    costs the same however many holds are live. Returns the number expired.
+    """
+    now = now or datetime.now(timezone.utc)
+    expired = 0
+    while True:
+        # SKIP LOCKED lets every worker's sweeper run without blocking the others (Postgres).
+        hold_ids = (await session.execute(
+            select(models.SeatHold.id)
+            .where(models.SeatHold.expires_at <= now)
+            .order_by(models.SeatHold.expires_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )).scalars().all()
+        if not hold_ids:
+            break
+        released, seats = await _drop_holds(session, models.SeatHold.id.in_(hold_ids))
+        await session.commit()
+        _publish_seats(seats)
+        expired += released
+        if len(hold_ids) < batch_size:
+            break
+    return expired
+
 # List attendees with pagination
 
 async def list_attendees(
     session: AsyncSession,
     event_id: UUID,
     page: int = 1,
-    page_size: int = 10
-) -> list[models.Attendee]:
+    page_size: int = 10,
+    cursor: Optional[str] = None,
+    archived: bool = False
+) -> Sequence[Row]:
     """
-    List attendees for an event with pagination.
-    Raises HTTPException if event not found.
+    List attendees for an event, ordered by email, as read-only Core rows of
+    AttendeeRead columns (no ORM instances are built).
+    With a cursor, seeks past the last email of the previous page on the
+    _event_email_uc index (keyset pagination), so every page costs the same;
+    otherwise falls back to page/page_size offsets.
+    With archived, reads an archived event's attendees from attendees_archive.
+    An empty page of a live event re-checks the events table, so an event
+    archived since it was cached is reported as not found rather than empty.
+    Raises HTTPException if event not found or the cursor is invalid.
     """
-    event = await session.get(models.Event, event_id)
+    if archived:
+        attendee_model = models.ArchivedAttendee
+        event = await session.get(models.ArchivedEvent, event_id)
+    else:
+        attendee_model = models.Attendee
+        event = await _event_metadata(session, event_id)
     if not event:
         raise HTTPException(status_code=404, detail="Event not found.")
 
-    offset = (page - 1) * page_size
     query = (
-        select(models.Attendee)
-        .where(models.Attendee.event_id == event.id)
-        .offset(offset)
+        select(attendee_model.id, attendee_model.name, attendee_model.email)
+        .where(attendee_model.event_id == event_id)
+        .order_by(attendee_model.email)
         .limit(page_size)
     )
+    if cursor:
+        try:
+            (last_email,) = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor.")
+        query = query.where(attendee_model.email > last_email)
+    else:
+        query = query.offset((page - 1) * page_size)
+
+    rows = (await session.execute(query)).all()
+    if not rows and not archived and not await _event_metadata(session, event_id, fresh=True):
+        raise HTTPException(status_code=404, detail="Event not found.")
+    return rows
+
+def next_attendee_cursor(page: Sequence, page_size: int) -> Optional[str]:
+    """Return the cursor for the page after this one, or None on the last page."""
+    if len(page) < page_size:
+        return None
+    return encode_cursor([page[-1].email])
+
+async def stream_attendee_rows(
+    session: AsyncSession,
+    event_id: UUID,
+    chunk_size: int = 1000
+) -> AsyncIterator[Sequence[Row]]:
+    """
+    Check the event exists, then return an iterator over all its attendees
+    (AttendeeRead columns, ordered by email) read from a server-side cursor
+    in chunks of chunk_size, so memory stays flat for any event size.
+    The event is always looked up (not taken from event_metadata_cache), so
+    an archived event is not exported as an empty file.
+    Raises HTTPException if event not found.
+    """
+    event = await _event_metadata(session, event_id, fresh=True)
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found.")
+
+    query = (
+        select(models.Attendee.id, models.Attendee.name, models.Attendee.email)
+        .where(models.Attendee.event_id == event_id)
+        .order_by(models.Attendee.email)
+        .execution_options(yield_per=chunk_size)
+    )
+
+    async def partitions():
+        result = await session.stream(query)
+        async for partition in result.partitions():
+            yield partition
 
-    result = await session.execute(query)
-    return result.scalars().all()
+    return partitions()
@@ -0,0 +1,103 @@
+"""
+Group-commit pipeline for registrations on hot events.
+
+When an event opens, thousands of register_attendee calls for the same
+event each run their own statements and commit alone, contending on the
+event row and waiting for one fsync each. RegistrationBatcher gathers the
+registrations that arrive for an event within a short window and commits
+them together through register_attendees_bulk, then hands every caller its
+own attendee or error.
+"""
+
+import asyncio
+from collections import defaultdict
+from typing import Callable
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.crud.attendees import register_attendees_bulk
+from app.schemas import attendees
+
+
+class RegistrationBatcher:
+    """Coalesce concurrent registrations per event into one transaction."""
+
+    def __init__(
+        self,
+        session_maker: Callable[[], AsyncSession],
+        window_ms: float = 5.0,
+        max_batch_size: int = 500
+    ):
+        self.session_maker = session_maker
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self._pending: dict[UUID, list[tuple[attendees.AttendeeCreate, asyncio.Future]]] = defaultdict(list)
+        self._timers: dict[UUID, asyncio.TimerHandle] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self.batches = 0
+        self.registrations = 0
+
+    async def register(self, event_id: UUID, attendee_in: attendees.AttendeeCreate) -> models.Attendee:
+        """
+        Queue a registration and wait for its batch to commit.
+        Raises the same HTTPExceptions as register_attendee.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending[event_id]
+        pending.append((attendee_in, future))
+        if len(pending) >= self.max_batch_size:
+            self._start_flush(event_id)
+        elif event_id not in self._timers:
+            self._timers[event_id] = loop.call_later(self.window, self._start_flush, event_id)
+        return await future
+
+    def _start_flush(self, event_id: UUID) -> None:
+        timer = self._timers.pop(event_id, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(event_id, [])
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._flush(event_id, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, event_id: UUID, batch: list) -> None:
+        try:
+            async with self.session_maker() as session:
+                report = await register_attendees_bulk(session, event_id, [a for a, _ in batch])
+        except BaseException as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            if not isinstance(exc, Exception):
+                raise
+            return
+
+        self.batches += 1
+        self.registrations += len(batch)
+        for (attendee_in, future), result in zip(batch, report.results):
+            if future.done():
+                continue
+            if result.status == "accepted":
+                future.set_result(models.Attendee(
+                    id=result.id, name=attendee_in.name, email=attendee_in.email, event_id=event_id
+                ))
+            elif result.status == "duplicate":
+                future.set_exception(
+                    HTTPException(status_code=400, detail="Email already registered for this event.")
+                )
+            else:
+                future.set_exception(HTTPException(status_code=400, detail="Event is fully booked."))
+
+    def stats(self) -> dict:
+        """Return batch counters, to check how well registrations coalesce."""
+        return {
+            "batches": self.batches,
+            "registrations": self.registrations,
+            "mean_batch_size": self.registrations / self.batches if self.batches else 0.0,
+            "pending": sum(len(batch) for batch in self._pending.values()),
+        }
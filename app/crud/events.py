@@ -2,17 +2,26 @@
 CRUD operations for event management.
 """
 
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone, tzinfo
+from typing import AsyncIterable, AsyncIterator, Optional, Sequence
+from uuid import UUID, uuid4
 
 from sqlalchemy.future import select
-from sqlalchemy import and_
+from sqlalchemy import Row, Select, and_, column, delete, func, insert, literal_column, table, text, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import ValidationError
 
 from fastapi import HTTPException
 
 from app import models
+from app.database.calendar import Bucket, local_bucket, local_midnight_utc
+from app.database.search import location_contains
 from app.schemas import events
-from  utils.common import ist_to_utc
+from  utils.common import ist_to_utc, encode_cursor, decode_cursor
+from utils.cache import event_list_cache, event_metadata_cache, event_seats_cache
+from utils.records import RecordError
 
 
 async def create_event(
@@ -50,28 +59,424 @@ async def create_event(
     )
     session.add(new_event)
     await session.commit()
+    event_list_cache.invalidate()
+    event_seats_cache.invalidate()
+    event_metadata_cache.invalidate(new_event.id)
     await session.refresh(new_event)
     return new_event
 
+def _event_columns(model, with_seats: bool = False) -> tuple:
+    """Columns of model served by EventRead, plus the seat counts with_seats."""
+    columns = (model.id, model.name, model.location, model.start_time, model.end_time, model.max_capacity)
+    if with_seats:
+        remaining = model.max_capacity - model.registered_count
+        if model is models.Event:
+            # Seats held by pending checkouts are not available either.
+            remaining -= model.held_count
+        columns += (model.registered_count, remaining.label("remaining_capacity"))
+    return columns
+
+# Columns served by EventRead; selecting them directly skips ORM instances.
+EVENT_READ_COLUMNS = _event_columns(models.Event)
+# EVENT_READ_COLUMNS plus seat counts, read from the registered_count counter.
+EVENT_SEAT_COLUMNS = _event_columns(models.Event, with_seats=True)
+
+def _event_filters(
+    model,
+    location: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    include_past: bool = False
+) -> list:
+    """
+    Return the WHERE clauses shared by event listings and the calendar.
+    start_date and end_date bound start_time inclusively and may be given
+    alone; like the upcoming-only default, each is a plain range predicate
+    on start_time, so all of them merge into one seek on ix_events_start_time_id.
+    """
+    archived = model is models.ArchivedEvent
+    filters = []
+    if not (include_past or archived):
+        filters.append(model.start_time > datetime.now(timezone.utc))
+    if location:
+        # The archive is rarely searched and has no trigram/FTS index.
+        filters.append(model.location.ilike(f"%{location}%") if archived else location_contains(location))
+    if start_date:
+        filters.append(model.start_time >= start_date)
+    if end_date:
+        filters.append(model.start_time <= end_date)
+    return filters
+
+def _events_query(
+    location: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    columns: Optional[tuple] = None,
+    include_past: bool = False,
+    archived: bool = False
+) -> Select:
+    """
+    Build the filtered event query, ordered by (start_time, id) so that
+    results and cursors are stable across calls. With a limit, the query
+    seeks past the (start_time, id) key in cursor, so each page costs the
+    same regardless of its depth.
+    Only events that have not started are listed unless include_past is
+    set; archived queries events_archive instead, where every event is past.
+    Raises HTTPException if the cursor is invalid.
+    """
+    model = models.ArchivedEvent if archived else models.Event
+    query = select(*columns) if columns else select(model)
+
+    filters = _event_filters(model, location, start_date, end_date, include_past)
+    if cursor:
+        try:
+            last_start, last_id = decode_cursor(cursor)
+            last_start, last_id = datetime.fromisoformat(last_start), UUID(last_id)
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor.")
+        filters.append(tuple_(model.start_time, model.id) > tuple_(last_start, last_id))
+
+    if filters:
+        query = query.where(and_(*filters))
+    if limit:
+        query = query.limit(limit)
+
+    return query.order_by(model.start_time, model.id)
+
 async def list_events(
     session: AsyncSession,
     location: str = None,
     start_date: datetime = None,
-    end_date: datetime = None
+    end_date: datetime = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    include_past: bool = False,
+    archived: bool = False
 ) -> list[models.Event]:
     """
     List upcoming events, optionally filtered by location and date range.
+    See _events_query for limit/cursor pagination and past/archived events.
     """
-    query = select(models.Event)
-
-    filters = []
-    if location:
-        filters.append(models.Event.location.ilike(f"%{location}%"))
-    if start_date and end_date:
-        filters.append(models.Event.start_time.between(start_date, end_date))
-    
-    if filters:
-        query = query.where(and_(*filters))
+    query = _events_query(
+        location, start_date, end_date, limit, cursor, include_past=include_past, archived=archived
+    )
+    result = await session.execute(query)
+    return result.scalars().all()
 
+async def list_event_rows(
+    session: AsyncSession,
+    location: str = None,
+    start_date: datetime = None,
+    end_date: datetime = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    with_seats: bool = False,
+    include_past: bool = False,
+    archived: bool = False
+) -> Sequence[Row]:
+    """
+    Read-only variant of list_events returning Core rows of EVENT_READ_COLUMNS
+    (EVENT_SEAT_COLUMNS with_seats), with no identity map or attribute
+    instrumentation.
+    """
+    columns = _event_columns(models.ArchivedEvent if archived else models.Event, with_seats)
+    query = _events_query(
+        location, start_date, end_date, limit, cursor, columns, include_past=include_past, archived=archived
+    )
     result = await session.execute(query)
-    return result.scalars().all()
\ No newline at end of file
+    return result.all()
+
+def next_event_cursor(page: Sequence, limit: int) -> Optional[str]:
+    """Return the cursor for the page after this one, or None on the last page."""
+    if len(page) < limit:
+        return None
+    last = page[-1]
+    return encode_cursor([last.start_time.isoformat(), str(last.id)])
+
+async def stream_event_rows(
+    session: AsyncSession,
+    location: str = None,
+    start_date: datetime = None,
+    end_date: datetime = None,
+    chunk_size: int = 500,
+    with_seats: bool = False,
+    include_past: bool = False,
+    archived: bool = False
+) -> AsyncIterator[Sequence[Row]]:
+    """
+    Yield matching EVENT_READ_COLUMNS (or EVENT_SEAT_COLUMNS) rows from a
+    server-side cursor in chunks of chunk_size, so memory stays flat however
+    many rows match.
+    """
+    columns = _event_columns(models.ArchivedEvent if archived else models.Event, with_seats)
+    query = _events_query(
+        location, start_date, end_date, columns=columns, include_past=include_past, archived=archived
+    )
+    result = await session.stream(query.execution_options(yield_per=chunk_size))
+    async for partition in result.partitions():
+        yield partition
+
+async def event_seat_stats(session: AsyncSession, event_ids: Sequence[UUID]) -> Sequence[Row]:
+    """
+    Return id, max_capacity, registered_count, held_count and
+    remaining_capacity for the given events in one primary-key lookup, read
+    from the maintained counters rather than by counting attendees or holds.
+    Unknown ids are left out.
+    """
+    result = await session.execute(
+        select(
+            models.Event.id,
+            models.Event.max_capacity,
+            models.Event.registered_count,
+            models.Event.held_count,
+            (
+                models.Event.max_capacity - models.Event.registered_count - models.Event.held_count
+            ).label("remaining_capacity"),
+        ).where(models.Event.id.in_(event_ids))
+    )
+    return result.all()
+
+async def event_calendar(
+    session: AsyncSession,
+    zone: tzinfo,
+    start: date,
+    end: date,
+    bucket: Bucket = "day",
+    location: Optional[str] = None,
+    include_past: bool = False
+) -> Sequence[Row]:
+    """
+    Count events and total their seats per local day (or ISO week, keyed by
+    its Monday) in zone, for events starting from local date start up to,
+    not including, end. One GROUP BY over a start_time range seek; only
+    the buckets that have events are returned, in order.
+    Rows: bucket, events, max_capacity, registered_count, remaining_capacity.
+    """
+    start_utc, end_utc = local_midnight_utc(start, zone), local_midnight_utc(end, zone)
+    event = models.Event
+    filters = _event_filters(event, location, start_utc, include_past=include_past)
+    filters.append(event.start_time < end_utc)
+    result = await session.execute(
+        select(
+            local_bucket(event.start_time, zone, bucket, start_utc, end_utc).label("bucket"),
+            func.count().label("events"),
+            func.sum(event.max_capacity).label("max_capacity"),
+            func.sum(event.registered_count).label("registered_count"),
+            func.sum(event.max_capacity - event.registered_count - event.held_count).label("remaining_capacity"),
+        )
+        .where(and_(*filters))
+        # By output name: the bucket expression carries bound parameters.
+        .group_by(literal_column("bucket"))
+        .order_by(literal_column("bucket"))
+    )
+    return result.all()
+
+# Archival
+
+ARCHIVED_EVENT_COLUMNS = (
+    "id", "name", "location", "start_time", "end_time", "max_capacity", "registered_count"
+)
+ARCHIVED_ATTENDEE_COLUMNS = ("id", "name", "email", "event_id")
+
+async def archive_finished_events(
+    session: AsyncSession,
+    finished_before: datetime,
+    batch_size: int = 500
+) -> int:
+    """
+    Move events that ended before finished_before, with their attendees,
+    into events_archive / attendees_archive, batch_size events per
+    transaction so locks stay short and the hot tables shrink steadily.
+    Rows are copied with INSERT ... SELECT inside the database and then
+    deleted. Returns the number of events archived.
+    """
+    archived = 0
+    while True:
+        # SKIP LOCKED lets several archivers run without blocking each other (Postgres).
+        event_ids = (await session.execute(
+            select(models.Event.id)
+            .where(models.Event.end_time < finished_before)
+            .order_by(models.Event.end_time)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )).scalars().all()
+        if not event_ids:
+            break
+
+        await session.execute(
+            insert(models.ArchivedEvent).from_select(
+                ARCHIVED_EVENT_COLUMNS,
+                select(*(getattr(models.Event, name) for name in ARCHIVED_EVENT_COLUMNS))
+                .where(models.Event.id.in_(event_ids))
+            )
+        )
+        await session.execute(
+            insert(models.ArchivedAttendee).from_select(
+                ARCHIVED_ATTENDEE_COLUMNS,
+                select(*(getattr(models.Attendee, name) for name in ARCHIVED_ATTENDEE_COLUMNS))
+                .where(models.Attendee.event_id.in_(event_ids))
+            )
+        )
+        await session.execute(
+            delete(models.Attendee).where(models.Attendee.event_id.in_(event_ids)),
+            execution_options={"synchronize_session": False}
+        )
+        # Holds on a finished event expired long ago; drop any the sweeper has not reached.
+        await session.execute(
+            delete(models.SeatHold).where(models.SeatHold.event_id.in_(event_ids)),
+            execution_options={"synchronize_session": False}
+        )
+        await session.execute(
+            delete(models.Event).where(models.Event.id.in_(event_ids)),
+            execution_options={"synchronize_session": False}
+        )
+        await session.commit()
+        for event_id in event_ids:
+            event_metadata_cache.invalidate(event_id)
+        archived += len(event_ids)
+        if len(event_ids) < batch_size:
+            break
+
+    if archived:
+        event_list_cache.invalidate()
+        event_seats_cache.invalidate()
+    return archived
+
+# Bulk import
+
+IMPORT_COLUMNS = ("id", "name", "location", "start_time", "end_time", "max_capacity")
+_import_staging = table("events_import", *(column(name) for name in IMPORT_COLUMNS))
+
+async def _copy_event_batch(session: AsyncSession, rows: list[dict]) -> set[str]:
+    """
+    Postgres/asyncpg: COPY the batch into a temporary staging table, then move
+    it into events in one INSERT ... SELECT that skips names already taken.
+    Returns the names that were inserted.
+    """
+    await session.execute(text(
+        "CREATE TEMP TABLE IF NOT EXISTS events_import "
+        "(LIKE events INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+    ))
+    connection = await session.connection()
+    raw = await connection.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        "events_import",
+        records=[tuple(row[name] for name in IMPORT_COLUMNS) for row in rows],
+        columns=IMPORT_COLUMNS
+    )
+    inserted = await session.execute(
+        pg_insert(models.Event)
+        .from_select(IMPORT_COLUMNS, select(*_import_staging.c))
+        .on_conflict_do_nothing(index_elements=["name"])
+        .returning(models.Event.name)
+    )
+    return set(inserted.scalars())
+
+async def _insert_event_batch(session: AsyncSession, rows: list[dict]) -> set[str]:
+    """
+    Insert a batch of events, skipping rows whose name clashes with the
+    unique constraint, and return the names that were inserted.
+    """
+    dialect = session.get_bind().dialect
+    if dialect.name == "postgresql" and dialect.driver == "asyncpg":
+        return await _copy_event_batch(session, rows)
+    insert = pg_insert if dialect.name == "postgresql" else sqlite_insert
+    inserted = await session.execute(
+        insert(models.Event)
+        .on_conflict_do_nothing(index_elements=["name"])
+        .returning(models.Event.name),
+        rows
+    )
+    return set(inserted.scalars())
+
+async def import_events(
+    session: AsyncSession,
+    records: AsyncIterable[tuple[int, dict | RecordError]],
+    batch_size: int = 1000,
+    max_reported_errors: int = 100
+) -> events.EventImportReport:
+    """
+    Import events from (line number, record) pairs, as yielded by
+    utils.records.iter_records, batch_size rows per transaction.
+    Each batch gets the same validation as create_event (IST to UTC
+    conversion, start before end, start in the future) against a single
+    clock reading, then one bulk insert. Names already taken are detected by
+    the unique constraint rather than a SELECT per row. Only the current
+    batch and the first max_reported_errors errors are held in memory.
+    """
+    inserted_total = 0
+    rejected_total = 0
+    errors: list[events.EventImportError] = []
+
+    def reject(line: int, name: Optional[str], detail: str) -> None:
+        nonlocal rejected_total
+        rejected_total += 1
+        if len(errors) < max_reported_errors:
+            errors.append(events.EventImportError(line=line, name=name, detail=detail))
+
+    async def flush(batch: list[tuple[int, dict | RecordError]]) -> None:
+        nonlocal inserted_total
+        now_utc = datetime.now(timezone.utc)
+        rejected: list[tuple[int, Optional[str], str]] = []
+        rows: list[dict] = []
+        row_lines: dict[str, int] = {}
+        for line, record in batch:
+            if isinstance(record, RecordError):
+                rejected.append((line, None, str(record)))
+                continue
+            try:
+                event_in = events.EventCreate.model_validate(record)
+            except ValidationError as exc:
+                detail = "; ".join(
+                    f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
+                )
+                rejected.append((line, record.get("name"), detail))
+                continue
+            start_time_utc = ist_to_utc(event_in.start_time)
+            end_time_utc = ist_to_utc(event_in.end_time)
+            if start_time_utc >= end_time_utc:
+                rejected.append((line, event_in.name, "Start time must be before end time."))
+            elif start_time_utc <= now_utc:
+                rejected.append((line, event_in.name, "Start time must be in the future."))
+            elif event_in.name in row_lines:
+                rejected.append((line, event_in.name, "Event name must be unique."))
+            else:
+                row_lines[event_in.name] = line
+                rows.append({
+                    "id": uuid4(),
+                    "name": event_in.name,
+                    "location": event_in.location,
+                    "start_time": start_time_utc,
+                    "end_time": end_time_utc,
+                    "max_capacity": event_in.max_capacity,
+                })
+
+        if rows:
+            inserted = await _insert_event_batch(session, rows)
+            await session.commit()
+            if inserted:
+                event_list_cache.invalidate()
+                event_seats_cache.invalidate()
+                for row in rows:
+                    if row["name"] in inserted:
+                        event_metadata_cache.invalidate(row["id"])
+            inserted_total += len(inserted)
+            rejected += [
+                (line, name, "Event name must be unique.")
+                for name, line in row_lines.items() if name not in inserted
+            ]
+        for line, name, detail in sorted(rejected, key=lambda item: item[0]):
+            reject(line, name, detail)
+
+    batch = []
+    async for line, record in records:
+        batch.append((line, record))
+        if len(batch) >= batch_size:
+            await flush(batch)
+            batch = []
+    if batch:
+        await flush(batch)
+
+    return events.EventImportReport(inserted=inserted_total, rejected=rejected_total, errors=errors)
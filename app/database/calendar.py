@@ -0,0 +1,97 @@
+"""
+Dialect-aware calendar buckets for events.start_time.
+
+local_bucket() turns a UTC timestamp into the local date of its day (or of
+the Monday of its ISO week) in a named timezone, so events can be counted
+per calendar cell with one GROUP BY.
+
+Postgres converts with timezone(tz, start_time) and truncates with
+date_trunc. SQLite has no timezone database, so the UTC offsets in force
+over the requested range are worked out here and compiled into a CASE on
+start_time; ranges are bounded, so the CASE only has a branch per DST
+change in them.
+"""
+
+from datetime import date, datetime, timedelta, timezone, tzinfo
+from typing import Literal
+
+from sqlalchemy import Date, case, cast, func, literal, literal_column
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.functions import FunctionElement
+
+Bucket = Literal["day", "week"]
+
+
+class _local_bucket(FunctionElement):
+    """Local date bucket of a timestamp; holds one expression per dialect family."""
+    inherit_cache = True
+    name = "local_bucket"
+    type = Date()
+
+
+@compiles(_local_bucket)
+def _compile_local_bucket(element, compiler, **kw):
+    postgres, _ = element.clauses
+    return compiler.process(postgres, **kw)
+
+
+@compiles(_local_bucket, "sqlite")
+def _compile_local_bucket_sqlite(element, compiler, **kw):
+    _, sqlite = element.clauses
+    return compiler.process(sqlite, **kw)
+
+
+def utc_offsets(zone: tzinfo, start: datetime, end: datetime) -> list[tuple[datetime, int]]:
+    """
+    Return [(from, offset minutes), ...] for zone between the UTC instants
+    start and end: the offset at start, then one entry per change.
+    """
+    def offset(at: datetime) -> int:
+        return int(at.astimezone(zone).utcoffset().total_seconds() // 60)
+
+    offsets = [(start, offset(start))]
+    day = start
+    while day < end:
+        following = min(day + timedelta(days=1), end)
+        if offset(following) != offsets[-1][1]:
+            # Bisect the day down to the second the offset changed.
+            low, high = 0, int((following - day).total_seconds())
+            while high - low > 1:
+                middle = (low + high) // 2
+                if offset(day + timedelta(seconds=middle)) == offsets[-1][1]:
+                    low = middle
+                else:
+                    high = middle
+            offsets.append((day + timedelta(seconds=high), offset(following)))
+        day = following
+    return offsets
+
+
+def local_bucket(column, zone: tzinfo, bucket: Bucket, start: datetime, end: datetime) -> ColumnElement:
+    """
+    Build the local date of column's day or ISO week in zone, for rows whose
+    column lies in [start, end) (aware UTC datetimes).
+    """
+    postgres = cast(
+        func.date_trunc(literal_column(f"'{bucket}'"), func.timezone(literal(str(zone)), column)), Date
+    )
+
+    offsets = utc_offsets(zone, start, end)
+    minutes = (
+        literal(offsets[0][1]) if len(offsets) == 1 else
+        case(*((column < changed, before)
+               for (_, before), (changed, _) in zip(offsets, offsets[1:])),
+             else_=offsets[-1][1])
+    )
+    modifiers = [func.printf("%+d minutes", minutes)]
+    if bucket == "week":
+        # Back to the Monday on or before the local date.
+        modifiers += [literal("-6 days"), literal("weekday 1")]
+    sqlite = func.date(column, *modifiers)
+    return _local_bucket(postgres, sqlite)
+
+
+def local_midnight_utc(day: date, zone: tzinfo) -> datetime:
+    """Return the UTC instant at which day starts in zone."""
+    return datetime.combine(day, datetime.min.time(), tzinfo=zone).astimezone(timezone.utc)
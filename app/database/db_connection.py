@@ -1,31 +1,287 @@
 """
 Database connection and session management for async SQLAlchemy.
-Loads DB credentials from .env.
+Engine and pool settings come from app.config (environment / .env).
+Engines are created by Database.start() at application startup, not on import.
+GET routes can be served from read replicas via get_read_session.
 """
 
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from pathlib import Path
-from dotenv import load_dotenv
-import os
+import asyncio
+import logging
+import time
+from typing import Callable, Optional, Sequence, Union
 
-BASE_DIR = Path(__file__).resolve().parent.parent.parent
-dotenv_path = BASE_DIR / '.env'
+from fastapi import Request, Response
+from sqlalchemy.engine import Connection, Engine, make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
-load_dotenv(dotenv_path=dotenv_path)
+from app.config import Settings
+from utils.metrics import Histogram
 
-POSTGRES_URL = f"postgresql+asyncpg://{os.getenv('DB_USERNAME')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
+logger = logging.getLogger(__name__)
 
-engine = create_async_engine(POSTGRES_URL, echo=True)
 
-async_session_maker = async_sessionmaker(
-    engine, 
-    class_=AsyncSession, 
-    expire_on_commit=False
-)
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long each checkout waited for a connection.
+    Only waiting for a connection to be returned counts: a checkout that
+    opens a new connection (pool below size plus overflow) records no wait,
+    so connect latency does not show up as pool contention.
+    on_wait, when set (by app.profiling), is also called with every wait.
+    """
 
-async def get_session():
-    """Yield an async database session for dependency injection."""
-    async with async_session_maker() as session:
-        yield session
+    on_wait: Optional[Callable[[float], None]] = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_histogram = Histogram()
+
+    def _do_get(self):
+        opens = self._pool.empty() and (self._max_overflow < 0 or self._overflow < self._max_overflow)
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = 0.0 if opens else time.perf_counter() - started
+            self.wait_histogram.observe(waited)
+            if self.on_wait is not None:
+                self.on_wait(waited)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.wait_histogram = self.wait_histogram
+        return pool
+
+
+def create_engine_from_settings(settings: Settings, url: str = None) -> AsyncEngine:
+    """
+    Create an async engine for url (default: settings.database_url).
+    Pool sizing applies to every pooled database; in-memory SQLite keeps
+    its single shared connection.
+    """
+    url = make_url(url or settings.database_url)
+    kwargs = {"echo": settings.db_echo}
+    in_memory = url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+    if not in_memory:
+        kwargs.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+            pool_pre_ping=settings.db_pool_pre_ping,
+        )
+    if url.get_driver_name() == "asyncpg":
+        url = url.update_query_dict(
+            {"prepared_statement_cache_size": str(settings.db_statement_cache_size)}
+        )
+        kwargs["connect_args"] = {"statement_cache_size": settings.db_statement_cache_size}
+    return create_async_engine(url, **kwargs)
+
+
+def pool_stats(engine: AsyncEngine) -> dict:
+    """Return checked-out, idle and overflow counts plus checkout wait times for engine's pool."""
+    pool = engine.sync_engine.pool
+    stats = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+        )
+    wait_histogram = getattr(pool, "wait_histogram", None)
+    if wait_histogram is not None:
+        stats["checkout_wait_seconds"] = wait_histogram.snapshot()
+    return stats
+
+
+class RoutingSession(Session):
+    """
+    Sync session whose bind is picked by choose_bind on first use, so a
+    session that never runs a query never chooses (or connects to) a database.
+    choose_bind may return a Connection it already checked out; the session
+    then runs on it and returns it to the pool when closed.
+    """
+
+    def __init__(self, *args, choose_bind: Callable[[], Union[Engine, Connection]], **kwargs):
+        super().__init__(*args, **kwargs)
+        self._choose_bind = choose_bind
+        self._chosen_bind = None
+
+    def get_bind(self, mapper=None, **kwargs):
+        if self._chosen_bind is None:
+            self._chosen_bind = self._choose_bind()
+        return self._chosen_bind
+
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            bind, self._chosen_bind = self._chosen_bind, None
+            if isinstance(bind, Connection):
+                bind.close()
+
+
+def reads_from_replica(session: AsyncSession) -> bool:
+    """Return whether session reads from a replica, which may lag behind the primary."""
+    return isinstance(session.sync_session, RoutingSession)
+
+
+class SessionRouter:
+    """
+    Route sessions between the primary and optional read replicas.
+    Writes always use the primary and mark the client sticky with a cookie,
+    so its reads stay on the primary until replication has caught up.
+    Other reads rotate over the replicas, skipping any that recently failed
+    to connect and falling back to the primary when none are available.
+    """
+
+    STICKY_COOKIE = "db_primary_until"
 
+    def __init__(
+        self,
+        primary: async_sessionmaker,
+        replicas: Sequence[async_sessionmaker] = (),
+        sticky_seconds: float = 5.0,
+        retry_seconds: float = 30.0
+    ):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.sticky_seconds = sticky_seconds
+        self.retry_seconds = retry_seconds
+        self._down_until = [0.0] * len(self.replicas)
+        self._next = 0
 
+    def mark_write(self, response: Response) -> None:
+        """Pin the client's reads to the primary for sticky_seconds."""
+        if self.replicas:
+            response.set_cookie(
+                self.STICKY_COOKIE, f"{time.time() + self.sticky_seconds:.3f}",
+                max_age=max(int(self.sticky_seconds), 1), httponly=True
+            )
+
+    def is_sticky(self, request: Request) -> bool:
+        try:
+            return float(request.cookies.get(self.STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def read_session(self, request: Request) -> AsyncSession:
+        """
+        Return a session that reads from a healthy replica, or from the
+        primary. The replica is picked when the session runs its first query.
+        """
+        if not self.replicas or self.is_sticky(request):
+            return self.primary()
+        return self.primary(sync_session_class=RoutingSession, choose_bind=self._read_bind)
+
+    def _read_bind(self) -> Union[Engine, Connection]:
+        # Runs inside the session's greenlet, so the sync connect below
+        # awaits the async driver.
+        now = time.monotonic()
+        for _ in range(len(self.replicas)):
+            index = self._next
+            self._next = (self._next + 1) % len(self.replicas)
+            if self._down_until[index] > now:
+                continue
+            replica = self.replicas[index].kw["bind"].sync_engine
+            try:
+                # Connect now so a dead replica is detected before the query
+                # runs; the session then queries on this same connection.
+                return replica.connect()
+            except (DBAPIError, OSError):
+                self._down_until[index] = now + self.retry_seconds
+        return self.primary.kw["bind"].sync_engine
+
+
+class Database:
+    """
+    The application's engines and session factories. start() creates them
+    from the settings and stop() disposes them; app.main calls both from its
+    lifespan, so importing the app opens no pools.
+    """
+
+    def __init__(self):
+        self.engine: Optional[AsyncEngine] = None
+        self.replica_engines: list[AsyncEngine] = []
+        self.session_maker: Optional[async_sessionmaker[AsyncSession]] = None
+        self.router: Optional[SessionRouter] = None
+
+    @property
+    def started(self) -> bool:
+        return self.engine is not None
+
+    def start(self, settings: Settings) -> None:
+        self.engine = create_engine_from_settings(settings)
+        self.session_maker = async_sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        self.replica_engines = [
+            create_engine_from_settings(settings, url) for url in settings.database_replica_urls
+        ]
+        self.router = SessionRouter(
+            self.session_maker,
+            [
+                async_sessionmaker(replica, class_=AsyncSession, expire_on_commit=False)
+                for replica in self.replica_engines
+            ],
+            sticky_seconds=settings.db_replica_sticky_seconds,
+            retry_seconds=settings.db_replica_retry_seconds
+        )
+
+    async def warm_up(self, connections: int) -> int:
+        """
+        Open up to `connections` pooled connections on the primary and each
+        replica (capped at the pool size) and return them to the pool idle.
+        Returns how many were opened; a database that is down is logged and skipped.
+        """
+        opened = 0
+        for engine in [self.engine, *self.replica_engines]:
+            pool = engine.sync_engine.pool
+            count = min(connections, pool.size()) if isinstance(pool, QueuePool) else 0
+            if count <= 0:
+                continue
+            results = await asyncio.gather(*(engine.connect() for _ in range(count)), return_exceptions=True)
+            for result in results:
+                if isinstance(result, BaseException):
+                    logger.warning("Connection warm-up failed for %s: %s", engine.url.render_as_string(), result)
+                else:
+                    await result.close()
+                    opened += 1
+        return opened
+
+    async def stop(self) -> None:
+        for engine in [self.engine, *self.replica_engines]:
+            if engine is not None:
+                await engine.dispose()
+        self.engine, self.replica_engines, self.session_maker, self.router = None, [], None, None
+
+    def session(self) -> AsyncSession:
+        """Return a new primary session, for code that runs outside a request."""
+        return self._require().primary()
+
+    def _require(self) -> SessionRouter:
+        if self.router is None:
+            raise RuntimeError("Database is not started; run the app's lifespan or call database.start().")
+        return self.router
+
+
+database = Database()
+
+async def get_session(response: Response):
+    """
+    Yield a primary (read-write) session for dependency injection.
+    Marks the client so its next reads also go to the primary.
+    The session checks out a connection only when it runs its first query.
+    """
+    router = database._require()
+    router.mark_write(response)
+    async with router.primary() as session:
+        yield session
+
+async def get_read_session(request: Request):
+    """Yield a read-only session for GET routes, on a replica when one is available."""
+    async with database._require().read_session(request) as session:
+        yield session
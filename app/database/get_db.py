@@ -5,10 +5,13 @@ Database initialization script for local development.
 Use to create all tables defined in SQLAlchemy models.
 """
 
+from app.config import get_settings
 from app.models import Base
-from app.database.db_connection import engine
+from app.database.db_connection import create_engine_from_settings
 
 async def init_db():
     """Create all database tables asynchronously."""
+    engine = create_engine_from_settings(get_settings())
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
\ No newline at end of file
+        await conn.run_sync(Base.metadata.create_all)
+    await engine.dispose()
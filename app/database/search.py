@@ -0,0 +1,48 @@
+"""
+Dialect-aware substring search on events.location.
+
+Postgres answers ILIKE '%term%' from the pg_trgm GIN index directly.
+SQLite has no such operator class, so the same filter is compiled into a
+lookup on the FTS5 trigram table maintained alongside events (see
+app.models). Terms shorter than a trigram cannot use either index and
+fall back to a plain ILIKE.
+"""
+
+from sqlalchemy import literal
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.functions import FunctionElement
+
+from app import models
+
+MIN_INDEXED_TERM = 3
+
+
+class _location_contains(FunctionElement):
+    """Case-insensitive '%term%' match on events.location."""
+    inherit_cache = True
+    name = "location_contains"
+
+
+@compiles(_location_contains)
+def _compile_location_contains(element, compiler, **kw):
+    column, pattern = element.clauses
+    return compiler.process(column.ilike(pattern), **kw)
+
+
+@compiles(_location_contains, "sqlite")
+def _compile_location_contains_sqlite(element, compiler, **kw):
+    column, pattern = element.clauses
+    return "{} IN (SELECT event_id FROM {} WHERE location LIKE {})".format(
+        compiler.process(models.Event.id, **kw),
+        models.LOCATION_FTS_TABLE,
+        compiler.process(pattern, **kw),
+    )
+
+
+def location_contains(term: str) -> ColumnElement:
+    """Build an index-backed filter matching events whose location contains term."""
+    pattern = f"%{term}%"
+    if len(term) < MIN_INDEXED_TERM:
+        return models.Event.location.ilike(pattern)
+    return _location_contains(models.Event.location, literal(pattern))
@@ -0,0 +1,175 @@
+"""
+Per-request instrumentation: latency, DB query count and DB time per route,
+plus in-flight request gauges, exported in Prometheus text format.
+
+MetricsMiddleware opens a RequestStats for every HTTP request in a context
+variable; SQLAlchemy cursor events (registered once on the Engine class, so
+they cover the primary, replicas and test engines alike) add each statement
+and its duration to it. Requests issuing more than the configured number of
+queries are logged as warnings.
+"""
+
+import logging
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from utils.metrics import Histogram, format_histogram, format_labels
+
+logger = logging.getLogger(__name__)
+
+# Statements per request; a handful is normal, dozens means an N+1 loop.
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 30, 50, 100)
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class RequestStats:
+    """Statements executed and time spent in the database by one request."""
+
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_request.get()
+    if stats is not None:
+        stats.queries += 1
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_request.get()
+    started = conn.info.get("query_started")
+    if stats is not None and started:
+        stats.db_seconds += time.perf_counter() - started.pop()
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    started = context.connection.info.get("query_started") if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+class RouteMetrics:
+    """Histograms for one (method, route) pair."""
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.db_seconds = Histogram()
+        self.responses: dict[int, int] = {}
+
+
+class RequestMetrics:
+    """In-process registry of HTTP request metrics."""
+
+    def __init__(self, query_warning_threshold: int = 0):
+        self.query_warning_threshold = query_warning_threshold
+        self.routes: dict[tuple[str, str], RouteMetrics] = {}
+        self.in_flight: dict[str, int] = {}
+
+    def observe(self, method: str, route: str, status: int, seconds: float, stats: RequestStats) -> None:
+        """Record one finished request."""
+        metrics = self.routes.get((method, route))
+        if metrics is None:
+            metrics = self.routes[(method, route)] = RouteMetrics()
+        metrics.latency.observe(seconds)
+        metrics.queries.observe(stats.queries)
+        metrics.db_seconds.observe(stats.db_seconds)
+        metrics.responses[status] = metrics.responses.get(status, 0) + 1
+        if self.query_warning_threshold and stats.queries > self.query_warning_threshold:
+            logger.warning(
+                "%s %s issued %d queries (threshold %d, %.1f ms in the database)",
+                method, route, stats.queries, self.query_warning_threshold, stats.db_seconds * 1000
+            )
+
+    def render(self) -> str:
+        """Return every metric in Prometheus text exposition format."""
+        lines = [
+            "# HELP http_requests_in_flight Requests currently being served.",
+            "# TYPE http_requests_in_flight gauge",
+        ]
+        for method, count in sorted(self.in_flight.items()):
+            lines.append(f"http_requests_in_flight{format_labels({'method': method})} {count}")
+
+        lines += [
+            "# HELP http_requests_total Finished requests by route and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route), metrics in sorted(self.routes.items()):
+            for status, count in sorted(metrics.responses.items()):
+                labels = {"method": method, "route": route, "status": status}
+                lines.append(f"http_requests_total{format_labels(labels)} {count}")
+
+        for name, attribute, help_text in (
+            ("http_request_duration_seconds", "latency", "Request latency by route."),
+            ("http_request_db_queries", "queries", "Database statements issued per request."),
+            ("http_request_db_seconds", "db_seconds", "Time per request spent executing statements."),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for (method, route), metrics in sorted(self.routes.items()):
+                lines += format_histogram(name, getattr(metrics, attribute), {"method": method, "route": route})
+        return "\n".join(lines) + "\n"
+
+
+def route_template(scope) -> str:
+    """
+    Return the matched route as a template such as /api/v1/events/{event_id}/register,
+    so label cardinality stays bounded. Path parameters are mapped back onto
+    the raw path, which is independent of how routers were included.
+    """
+    if scope.get("route") is None:
+        return UNMATCHED_ROUTE
+    params = {str(value): name for name, value in (scope.get("path_params") or {}).items()}
+    if not params:
+        return scope["path"]
+    return "/".join(
+        f"{{{params[segment]}}}" if segment in params else segment for segment in scope["path"].split("/")
+    )
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing each HTTP request and collecting its RequestStats."""
+
+    def __init__(self, app, registry: RequestMetrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = _current_request.set(stats)
+        in_flight = self.registry.in_flight
+        in_flight[method] = in_flight.get(method, 0) + 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_flight[method] -= 1
+            _current_request.reset(token)
+            self.registry.observe(method, route_template(scope), status, elapsed, stats)
@@ -2,23 +2,86 @@
 FastAPI application entrypoint for the Mini Event Management System.
 """
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from slowapi.middleware import SlowAPIMiddleware
 
 from app.routers import events
 from app.routers import attendees
+from app.config import get_settings
+from app.crud.attendees import expire_seat_holds
+from app.crud.events import event_seat_stats
+from app.database.db_connection import database, pool_stats
+from app.instrumentation import MetricsMiddleware, RequestMetrics
+from app.profiling import ProfilingMiddleware
 from utils.common import limiter
+from utils.metrics import format_histogram, format_labels
+from utils.seat_feed import seat_feed
+from utils.sweeper import hold_sweeper
+
+settings = get_settings()
+
+
+async def _fetch_seat_stats(event_ids):
+    rows = []
+    async with database.session() as session:
+        for start in range(0, len(event_ids), 1000):
+            rows += await event_seat_stats(session, event_ids[start:start + 1000])
+    return rows
+
+
+async def _expire_seat_holds() -> int:
+    async with database.session() as session:
+        return await expire_seat_holds(session, batch_size=settings.seat_hold_sweep_batch)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Create the database engines and warm their pools on startup, poll
+    seat counts for live seat streams and sweep expired seat holds;
+    dispose everything on shutdown.
+    """
+    database.start(settings)
+    await database.warm_up(settings.db_pool_warmup)
+    seat_feed.start_polling(_fetch_seat_stats, settings.seat_feed_poll_seconds)
+    hold_sweeper.start(_expire_seat_holds, settings.seat_hold_sweep_seconds)
+    try:
+        yield
+    finally:
+        await hold_sweeper.stop()
+        await seat_feed.stop()
+        await database.stop()
+
 
 app = FastAPI(
     title="Mini Event Management System",
     description="API for creating events, registering attendees, viewing attendee lists.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Rate limiter
 app.state.limiter = limiter
 app.add_middleware(SlowAPIMiddleware)
 
+# Opt-in request profiling (PROFILE_TOKEN / PROFILE_SAMPLE_RATE); not installed otherwise
+if settings.profiling_enabled:
+    app.add_middleware(
+        ProfilingMiddleware,
+        directory=settings.profile_dir,
+        token=settings.profile_token,
+        sample_rate=settings.profile_sample_rate,
+        interval_ms=settings.profile_interval_ms
+    )
+
+# Request metrics (outermost, so rate-limited requests are timed too)
+request_metrics = RequestMetrics(query_warning_threshold=settings.metrics_query_warning_threshold)
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware, registry=request_metrics)
+
 # API Version prefix
 URL_PREFIX = "/api/v1/events"
 
@@ -30,3 +93,39 @@ app.include_router(attendees.router, prefix=URL_PREFIX, tags=["Attendees"])
 @app.get(f"{URL_PREFIX}/health", tags=["Health"])
 async def root():
     return {"message": "Event Management API is running."}
+
+# Connection pool statistics, for sizing DB_POOL_SIZE / DB_MAX_OVERFLOW per worker
+@app.get(f"{URL_PREFIX}/pool-stats", tags=["Health"])
+async def get_pool_stats():
+    if not database.started:
+        return {"replicas": []}
+    return {
+        **pool_stats(database.engine),
+        "replicas": [pool_stats(replica) for replica in database.replica_engines],
+    }
+
+
+def _pool_metrics() -> list[str]:
+    pools = ([({"role": "primary", "index": 0}, database.engine)] if database.started else []) + [
+        ({"role": "replica", "index": index}, replica) for index, replica in enumerate(database.replica_engines)
+    ]
+    stats = [(labels, pool_stats(pooled)) for labels, pooled in pools]
+    lines = []
+    for key in ("checked_out", "idle", "overflow"):
+        lines.append(f"# TYPE db_pool_{key} gauge")
+        lines += [f"db_pool_{key}{format_labels(labels)} {s[key]}" for labels, s in stats if key in s]
+    lines.append("# TYPE db_pool_checkout_wait_seconds histogram")
+    for labels, pooled in pools:
+        wait_histogram = getattr(pooled.sync_engine.pool, "wait_histogram", None)
+        if wait_histogram is not None:
+            lines += format_histogram("db_pool_checkout_wait_seconds", wait_histogram, labels)
+    return lines
+
+
+# Prometheus scrape endpoint
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(
+        request_metrics.render() + "\n".join(_pool_metrics()) + "\n",
+        media_type="text/plain; version=0.0.4"
+    )
@@ -3,8 +3,10 @@ SQLAlchemy ORM models for the Event Management System.
 """
 
 import uuid
-from sqlalchemy import Column, String, Integer, ForeignKey, UniqueConstraint
-from sqlalchemy.dialects.postgresql import UUID as PG_UUID, TIMESTAMP
+from sqlalchemy import (
+    Column, String, Integer, ForeignKey, UniqueConstraint, CheckConstraint, Index, DDL, Uuid, event, func
+)
+from sqlalchemy.dialects.postgresql import TIMESTAMP
 from sqlalchemy.orm import relationship, declarative_base
 
 Base = declarative_base()
@@ -13,17 +15,43 @@ class Event(Base):
     """Database model for an event."""
     __tablename__ = "events"
 
-    id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(255), nullable=False, unique=True)
     location = Column(String(255), nullable=False)
     start_time = Column(TIMESTAMP(timezone=True), nullable=False)
     end_time = Column(TIMESTAMP(timezone=True), nullable=False)
     max_capacity = Column(Integer, nullable=False)
+    registered_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Seats reserved by unexpired or not yet swept seat holds.
+    held_count = Column(Integer, nullable=False, default=0, server_default="0")
 
     attendees = relationship(
         "Attendee", back_populates="event", cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        CheckConstraint(
+            "registered_count BETWEEN 0 AND max_capacity", name="_event_capacity_ck"
+        ),
+        CheckConstraint(
+            "held_count >= 0 AND registered_count + held_count <= max_capacity", name="_event_held_ck"
+        ),
+        # Serves start_time range filters and the (start_time, id) ordering
+        # and keyset cursor of list_events.
+        Index("ix_events_start_time_id", "start_time", "id"),
+        # Lets the archival job find finished events without scanning.
+        Index("ix_events_end_time", "end_time"),
+        # Trigram index so the location ILIKE '%...%' filter avoids a full scan.
+        Index(
+            "ix_events_location_trgm", "location",
+            postgresql_using="gin", postgresql_ops={"location": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
+
+    @property
+    def remaining_capacity(self) -> int:
+        return self.max_capacity - (self.registered_count or 0) - (self.held_count or 0)
+
     def __repr__(self):
         return f"<Event(id={self.id}, name={self.name})>"
 
@@ -31,10 +59,10 @@ class Attendee(Base):
     """Database model for an attendee."""
     __tablename__ = "attendees"
 
-    id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(255), nullable=False)
     email = Column(String(255), nullable=False)
-    event_id = Column(PG_UUID(as_uuid=True), ForeignKey("events.id"), nullable=False)
+    event_id = Column(Uuid(as_uuid=True), ForeignKey("events.id"), nullable=False)
 
     event = relationship("Event", back_populates="attendees")
 
@@ -44,3 +72,102 @@ class Attendee(Base):
 
     def __repr__(self):
         return f"<Attendee(id={self.id}, email={self.email})>"
+
+
+class SeatHold(Base):
+    """
+    A seat reserved for name/email until expires_at, counted in the event's
+    held_count. Confirming it turns it into an Attendee; once expired it is
+    deleted by the hold sweeper (app.crud.attendees.expire_seat_holds).
+    """
+    __tablename__ = "seat_holds"
+
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    event_id = Column(Uuid(as_uuid=True), ForeignKey("events.id"), nullable=False)
+    name = Column(String(255), nullable=False)
+    email = Column(String(255), nullable=False)
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False)
+
+    __table_args__ = (
+        # Lets the sweeper find expired holds, oldest first, without scanning.
+        Index("ix_seat_holds_expires_at", "expires_at"),
+        # Lets the archival job drop a finished event's leftover holds.
+        Index("ix_seat_holds_event_id", "event_id"),
+    )
+
+    def __repr__(self):
+        return f"<SeatHold(id={self.id}, email={self.email})>"
+
+
+class ArchivedEvent(Base):
+    """
+    A finished event moved out of events by the archival job
+    (app.crud.events.archive_finished_events), with its final seat count.
+    Names are not unique here: a name can be reused once its event is archived.
+    """
+    __tablename__ = "events_archive"
+
+    id = Column(Uuid(as_uuid=True), primary_key=True)
+    name = Column(String(255), nullable=False)
+    location = Column(String(255), nullable=False)
+    start_time = Column(TIMESTAMP(timezone=True), nullable=False)
+    end_time = Column(TIMESTAMP(timezone=True), nullable=False)
+    max_capacity = Column(Integer, nullable=False)
+    registered_count = Column(Integer, nullable=False)
+    archived_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_events_archive_start_time_id", "start_time", "id"),
+    )
+
+    @property
+    def remaining_capacity(self) -> int:
+        return self.max_capacity - self.registered_count
+
+    def __repr__(self):
+        return f"<ArchivedEvent(id={self.id}, name={self.name})>"
+
+class ArchivedAttendee(Base):
+    """An attendee of an archived event, moved together with it."""
+    __tablename__ = "attendees_archive"
+
+    id = Column(Uuid(as_uuid=True), primary_key=True)
+    name = Column(String(255), nullable=False)
+    email = Column(String(255), nullable=False)
+    event_id = Column(Uuid(as_uuid=True), ForeignKey("events_archive.id"), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('event_id', 'email', name='_archived_event_email_uc'),
+    )
+
+    def __repr__(self):
+        return f"<ArchivedAttendee(id={self.id}, email={self.email})>"
+
+
+# Location substring search indexes.
+# Postgres: pg_trgm must exist before ix_events_location_trgm is created.
+# SQLite: an FTS5 trigram table mirrors events.location, kept in sync by
+# triggers; app.database.search queries it instead of scanning events.
+LOCATION_FTS_TABLE = "events_location_fts"
+
+event.listen(
+    Event.__table__, "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
+
+for _statement in (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {LOCATION_FTS_TABLE} "
+    "USING fts5(location, event_id UNINDEXED, tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS {LOCATION_FTS_TABLE}_ai AFTER INSERT ON events BEGIN "
+    f"INSERT INTO {LOCATION_FTS_TABLE}(location, event_id) VALUES (new.location, new.id); END",
+    f"CREATE TRIGGER IF NOT EXISTS {LOCATION_FTS_TABLE}_ad AFTER DELETE ON events BEGIN "
+    f"DELETE FROM {LOCATION_FTS_TABLE} WHERE event_id = old.id; END",
+    f"CREATE TRIGGER IF NOT EXISTS {LOCATION_FTS_TABLE}_au AFTER UPDATE OF location ON events BEGIN "
+    f"UPDATE {LOCATION_FTS_TABLE} SET location = new.location WHERE event_id = old.id; END",
+):
+    event.listen(Event.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+
+event.listen(
+    Event.__table__, "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {LOCATION_FTS_TABLE}").execute_if(dialect="sqlite")
+)
@@ -0,0 +1,238 @@
+"""
+Opt-in profiling of single requests, for seeing where one slow request
+spends its time in production.
+
+A request is profiled when it sends the X-Profile header with the
+configured PROFILE_TOKEN, or when it is picked by PROFILE_SAMPLE_RATE.
+While it runs, a background thread samples the Python stack of the event
+loop thread every PROFILE_INTERVAL_MS, SQLAlchemy cursor events record
+every statement with its duration, and InstrumentedQueuePool reports how
+long each connection checkout waited. The profile is written to
+PROFILE_DIR as two files named after the X-Profile-Id response header:
+
+- <id>.collapsed: folded stacks ("frame;frame;frame weight", weights in
+  microseconds) for speedscope or flamegraph.pl. Python samples sit under
+  a "python" frame, statements and pool waits under "db".
+- <id>.json: the request, its timings and every statement in order.
+
+The sampler sees the whole event loop thread, so requests served at the
+same time show up in the Python stacks too; each worker profiles one
+request at a time. When neither setting is configured the middleware and
+its hooks are not installed, so requests pay nothing.
+"""
+
+import asyncio
+import hmac
+import json
+import logging
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Optional
+from uuid import uuid4
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.database.db_connection import InstrumentedQueuePool
+from app.instrumentation import route_template
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+# Folded stack frames cannot contain ";"; long statements are cut in the flame graph only.
+SQL_FRAME_LENGTH = 200
+
+
+class RequestProfile:
+    """Statements, pool waits and Python stack samples of one profiled request."""
+
+    def __init__(self, method: str, path: str):
+        self.id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid4().hex[:8]}"
+        self.method = method
+        self.path = path
+        self.started = time.perf_counter()
+        self.statements: list[dict] = []
+        self.pool_waits: list[float] = []
+        self.stacks: Counter = Counter()
+
+    def _offset_ms(self, at: float) -> float:
+        return round((at - self.started) * 1000, 3)
+
+    def add_statement(self, statement: str, started: float, seconds: float) -> None:
+        self.statements.append({
+            "sql": " ".join(statement.split()),
+            "started_ms": self._offset_ms(started),
+            "duration_ms": round(seconds * 1000, 3),
+        })
+
+    def add_pool_wait(self, seconds: float) -> None:
+        self.pool_waits.append(seconds)
+
+    def to_dict(self, route: str, status: int, seconds: float) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": route,
+            "status": status,
+            "duration_ms": round(seconds * 1000, 3),
+            "sampled_ms": round(sum(self.stacks.values()) * 1000, 3),
+            "db_ms": round(sum(s["duration_ms"] for s in self.statements), 3),
+            "pool_wait_ms": round(sum(self.pool_waits) * 1000, 3),
+            "statements": self.statements,
+        }
+
+    def collapsed(self, route: str) -> str:
+        """Return the profile as folded stacks weighted in microseconds."""
+        root = f"{self.method} {route}"
+        weights: Counter = Counter()
+        for stack, seconds in self.stacks.items():
+            weights[";".join((root, "python", *stack))] += seconds * 1e6
+        for statement in self.statements:
+            frame = statement["sql"][:SQL_FRAME_LENGTH].replace(";", ",")
+            weights[f"{root};db;{frame}"] += statement["duration_ms"] * 1000
+        if self.pool_waits:
+            weights[f"{root};db;pool checkout wait"] += sum(self.pool_waits) * 1e6
+        return "".join(f"{stack} {round(weight)}\n" for stack, weight in weights.items() if weight >= 0.5)
+
+    def write(self, directory: Path, route: str, status: int, seconds: float) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"{self.id}.collapsed").write_text(self.collapsed(route))
+        (directory / f"{self.id}.json").write_text(json.dumps(self.to_dict(route, status, seconds), indent=2))
+
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_profile.get() is not None:
+        conn.info.setdefault("profile_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    started = conn.info.get("profile_started")
+    if profile is not None and started:
+        began = started.pop()
+        profile.add_statement(statement, began, time.perf_counter() - began)
+
+
+def _handle_error(context):
+    started = context.connection.info.get("profile_started") if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+def _record_pool_wait(seconds: float) -> None:
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.add_pool_wait(seconds)
+
+
+def install_hooks() -> None:
+    """Register the statement and pool-wait hooks; called once the profiler is enabled."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+    InstrumentedQueuePool.on_wait = staticmethod(_record_pool_wait)
+
+
+class StackSampler:
+    """Thread sampling another thread's Python stack, weighting each sample by the time since the last."""
+
+    def __init__(self, thread_id: int, interval: float, stacks: Counter):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = stacks
+        self._labels: dict = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+        return label
+
+    def _run(self) -> None:
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += now - last
+            last = now
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling requests chosen by admin header or sampling rate."""
+
+    def __init__(self, app, directory: str, token: Optional[str] = None, sample_rate: float = 0.0,
+                 interval_ms: float = 1.0):
+        self.app = app
+        self.directory = Path(directory)
+        self.token = token.encode() if token else None
+        self.sample_rate = sample_rate
+        self.interval = interval_ms / 1000
+        self.profiled = 0
+        self._active = False
+        install_hooks()
+
+    def _wanted(self, scope) -> bool:
+        if self.token is not None:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER:
+                    return hmac.compare_digest(value, self.token)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self._active or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope["method"], scope["path"])
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message = {
+                    **message, "headers": [*message.get("headers", []), (PROFILE_ID_HEADER, profile.id.encode())]
+                }
+            await send(message)
+
+        self._active = True
+        token = _current_profile.set(profile)
+        sampler = StackSampler(threading.get_ident(), self.interval, profile.stacks)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            elapsed = time.perf_counter() - profile.started
+            _current_profile.reset(token)
+            self._active = False
+            self.profiled += 1
+            try:
+                await asyncio.to_thread(profile.write, self.directory, route_template(scope), status, elapsed)
+            except OSError:
+                logger.warning("Could not write request profile %s", profile.id, exc_info=True)
@@ -2,30 +2,110 @@
 Attendee-related API routes.
 """
 
-from fastapi import APIRouter, Depends, Query, Request
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Literal, Optional
 from uuid import UUID
 
-from app.schemas.attendees import AttendeeCreate, AttendeeRead
-from app.crud.attendees import register_attendee, list_attendees
-from app.database.db_connection import get_session
+from app.schemas.attendees import (
+    AttendeeCreate, AttendeeRead, AttendeeBulkCreate, BulkRegistrationReport, SeatHoldRead,
+    ATTENDEE_CSV_HEADER, dump_attendee_rows, dump_attendee_rows_csv, dump_attendee_rows_ndjson
+)
+from app.crud.attendees import (
+    register_attendee, register_attendees_bulk, list_attendees, next_attendee_cursor,
+    stream_attendee_rows, hold_seat, confirm_seat_hold, release_seat_hold
+)
+from app.crud.batching import RegistrationBatcher
+from app.database.db_connection import database, get_session, get_read_session
+from app.config import get_settings
 from utils.common import limiter
+from utils.idempotency import idempotency_store, idempotent
+from utils.rate_limit import ConcurrencyCap
+from utils.streaming import ReleasingStreamingResponse
 
 router = APIRouter()
 
+# Opt-in group commit for hot events (REGISTRATION_BATCH_WINDOW_MS > 0)
+registration_batcher = (
+    RegistrationBatcher(
+        database.session,
+        window_ms=get_settings().registration_batch_window_ms,
+        max_batch_size=get_settings().registration_batch_max_size
+    )
+    if get_settings().registration_batch_window_ms > 0 else None
+)
+
 @router.post("/{event_id}/register", response_model=AttendeeRead)
-@limiter.limit("10/minute")
+@limiter.limit(get_settings().rate_limit_register)
 async def register_event_attendee(
     request: Request,
+    response: Response,
     event_id: UUID,
     attendee: AttendeeCreate,
+    idempotency_key: Optional[str] = Header(None, description="Replays the first response for a retried request"),
     session: AsyncSession = Depends(get_session)
 ):
     """
     Register a new attendee for an event.
+    With batching enabled, concurrent registrations for the same event are
+    committed together and each caller still gets its own result.
+    A retry with the same Idempotency-Key gets the first response back, and
+    one sent while the first is still running waits for it.
+    """
+    async def register():
+        if registration_batcher is not None:
+            return await registration_batcher.register(event_id, attendee)
+        return await register_attendee(session, event_id, attendee)
+
+    return await idempotent(
+        idempotency_store, idempotency_key, request.url.path, attendee, register, AttendeeRead, response
+    )
+
+@router.post("/{event_id}/register/bulk", response_model=BulkRegistrationReport)
+@limiter.limit(get_settings().rate_limit_register_bulk)
+async def register_event_attendees_bulk(
+    request: Request,
+    event_id: UUID,
+    payload: AttendeeBulkCreate,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Register a group of attendees for an event in one batched insert.
+    Returns a per-row accepted/duplicate/rejected report.
     """
-    return await register_attendee(session, event_id, attendee)
+    return await register_attendees_bulk(session, event_id, payload.attendees)
+
+@router.post("/{event_id}/holds", response_model=SeatHoldRead)
+@limiter.limit(get_settings().rate_limit_register)
+async def hold_event_seat(
+    request: Request,
+    event_id: UUID,
+    attendee: AttendeeCreate,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Reserve a seat for SEAT_HOLD_TTL_SECONDS while the attendee checks out.
+    Confirm the hold before expires_at to register, or delete it to free the seat.
+    """
+    return await hold_seat(session, event_id, attendee, get_settings().seat_hold_ttl_seconds)
+
+@router.post("/{event_id}/holds/{hold_id}/confirm", response_model=AttendeeRead)
+async def confirm_event_seat_hold(
+    event_id: UUID,
+    hold_id: UUID,
+    session: AsyncSession = Depends(get_session)
+):
+    """Register the attendee of an unexpired seat hold; 410 once it has expired."""
+    return await confirm_seat_hold(session, event_id, hold_id)
+
+@router.delete("/{event_id}/holds/{hold_id}", status_code=204)
+async def release_event_seat_hold(
+    event_id: UUID,
+    hold_id: UUID,
+    session: AsyncSession = Depends(get_session)
+):
+    """Cancel a seat hold and free its seat immediately."""
+    await release_seat_hold(session, event_id, hold_id)
 
 @router.get("/{event_id}/attendees", response_model=List[AttendeeRead])
 async def list_event_attendees(
@@ -33,9 +113,64 @@ async def list_event_attendees(
     event_id: UUID,
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
-    session: AsyncSession = Depends(get_session)
+    cursor: Optional[str] = Query(
+        None, description="Opaque cursor from X-Next-Cursor; takes precedence over page"
+    ),
+    archived: bool = Query(False, description="List the attendees of an archived event"),
+    session: AsyncSession = Depends(get_read_session)
 ):
     """
     List attendees for a specific event with pagination.
+    The X-Next-Cursor response header carries the cursor for the next page.
+    """
+    attendees = await list_attendees(session, event_id, page, page_size, cursor, archived=archived)
+    headers = {}
+    next_cursor = next_attendee_cursor(attendees, page_size)
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return Response(content=dump_attendee_rows(attendees), media_type="application/json", headers=headers)
+
+# Concurrent exports per worker (EXPORT_MAX_CONCURRENCY)
+export_slots = ConcurrencyCap(get_settings().export_max_concurrency)
+EXPORT_CHUNK_SIZE = 1000
+
+@router.get("/{event_id}/attendees/export")
+@limiter.exempt
+async def export_event_attendees(
+    request: Request,
+    event_id: UUID,
+    export_format: Literal["csv", "ndjson"] = Query("csv", alias="format"),
+    session: AsyncSession = Depends(get_read_session)
+):
     """
-    return await list_attendees(session, event_id, page, page_size)
\ No newline at end of file
+    Stream every attendee of an event as CSV or NDJSON, ordered by email.
+    Not rate limited, but at most EXPORT_MAX_CONCURRENCY exports run per
+    worker; further requests get 429 with Retry-After.
+    """
+    if not export_slots.try_acquire():
+        raise HTTPException(
+            status_code=429, detail="Too many exports in progress, retry shortly.",
+            headers={"Retry-After": "5"}
+        )
+    try:
+        partitions = await stream_attendee_rows(session, event_id, EXPORT_CHUNK_SIZE)
+    except BaseException:
+        export_slots.release()
+        raise
+
+    if export_format == "csv":
+        media_type, dump = "text/csv", dump_attendee_rows_csv
+    else:
+        media_type, dump = "application/x-ndjson", dump_attendee_rows_ndjson
+
+    async def body():
+        # The CSV header goes out before the first query, for an immediate first byte.
+        if export_format == "csv":
+            yield ATTENDEE_CSV_HEADER
+        async for rows in partitions:
+            yield dump(rows)
+
+    return ReleasingStreamingResponse(
+        body(), media_type=media_type, on_close=export_slots.release,
+        headers={"Content-Disposition": f'attachment; filename="attendees-{event_id}.{export_format}"'}
+    )
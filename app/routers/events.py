@@ -2,54 +2,277 @@
 Event-related API routes.
 """
 
-from fastapi import APIRouter, Depends, Query, Request
+from fastapi import APIRouter, Depends, Header, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
-from datetime import datetime
-import pytz
+from typing import List, Literal, Optional
+from datetime import date, datetime, timedelta
+from uuid import UUID
+import hashlib
 
-from app.database.db_connection import get_session
-from app.schemas.events import EventCreate, EventRead
-from app.crud.events import create_event, list_events
+from app.database.db_connection import get_session, get_read_session
+from app.schemas.events import (
+    EventCalendarBucket, EventCreate, EventRead, EventImportReport, EventSeats, dump_event_rows,
+    dump_event_rows_ndjson
+)
+from app.crud.events import (
+    create_event, event_calendar, event_seat_stats, import_events, list_event_rows, next_event_cursor,
+    stream_event_rows
+)
 from fastapi import HTTPException
+from utils.cache import event_list_cache, event_metadata_cache, event_seats_cache
+from utils.common import get_timezone, limiter
+from app.config import get_settings
+from utils.idempotency import idempotency_store, idempotent
+from utils.records import iter_records
+from utils.seat_feed import seat_feed
+from utils.streaming import SSE_KEEPALIVE, ReleasingStreamingResponse, format_sse
 
 router = APIRouter()
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+MAX_STATS_IDS = 100
+MAX_CALENDAR_DAYS = 366
+
 @router.post("/", response_model=EventRead)
 async def register_event(
     request: Request,
+    response: Response,
     event: EventCreate,
+    idempotency_key: Optional[str] = Header(None, description="Replays the first response for a retried request"),
     session: AsyncSession = Depends(get_session)
 ):
     """
     Register a new event with IST to UTC conversion.
+    A retry with the same Idempotency-Key gets the first response back
+    without creating (or failing to create) the event again.
+    """
+    return await idempotent(
+        idempotency_store, idempotency_key, request.url.path, event,
+        lambda: create_event(session, event), EventRead, response
+    )
+
+IMPORT_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+}
+
+@router.post("/import", response_model=EventImportReport)
+async def import_event_file(
+    request: Request,
+    import_format: Optional[Literal["csv", "ndjson"]] = Query(
+        None, alias="format", description="Defaults to the request Content-Type"
+    ),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Import events from a CSV (with a header row) or NDJSON request body.
+    The body is parsed as it streams in and inserted in batches; rows that
+    fail validation or clash with an existing name are reported, not fatal.
     """
-    return await create_event(session, event)
+    if import_format is None:
+        content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+        import_format = IMPORT_CONTENT_TYPES.get(content_type)
+    if import_format is None:
+        raise HTTPException(
+            status_code=400, detail="Unknown import format; send format=csv or format=ndjson."
+        )
+    return await import_events(session, iter_records(request.stream(), import_format))
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header (possibly a list or weak tags) against etag."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
 
 @router.get("/", response_model=List[EventRead])
 # Note: This endpoint intentionally not rate-limited for public access
 async def get_events(
     request: Request,
     location: Optional[str] = Query(None, description="Filter by location"),
-    start_date: Optional[datetime] = Query(None, description="Filter start date (UTC)"),
-    end_date: Optional[datetime] = Query(None, description="Filter end date (UTC)"),
+    start_date: Optional[datetime] = Query(None, description="Events starting at or after (UTC)"),
+    end_date: Optional[datetime] = Query(None, description="Events starting at or before (UTC)"),
     tz: Optional[str] = Query("UTC", description="Timezone for output datetimes"),
-    session: AsyncSession = Depends(get_session)
+    limit: Optional[int] = Query(
+        None, ge=1, le=MAX_PAGE_SIZE, description="Page size; enables cursor pagination"
+    ),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor"),
+    response_format: Literal["json", "ndjson"] = Query(
+        "json", alias="format", description="ndjson streams every match, one event per line"
+    ),
+    seats: bool = Query(False, description="Include registered_count and remaining_capacity"),
+    include_past: bool = Query(False, description="Also list events that have started or ended"),
+    archived: bool = Query(False, description="List archived (finished) events instead"),
+    session: AsyncSession = Depends(get_read_session)
 ):
     """
     List upcoming events with optional filtering and timezone conversion.
+    start_date and end_date each bound the start time and can be used alone.
+    Events that have started are left out unless include_past=true;
+    archived=true lists the events moved to the archive.
+    Pass limit (and then cursor from X-Next-Cursor) to page through results,
+    or format=ndjson to stream all matches from a server-side cursor.
+    With seats=true each event carries its seat counts, from the same query.
+    JSON responses are served from an in-process cache and carry an ETag;
+    a matching If-None-Match is answered with 304.
     """
-    
-    events = await list_events(session, location, start_date, end_date)
-
     # Convert UTC times to requested timezone
     try:
-        target_tz = pytz.timezone(tz)
+        target_tz = get_timezone(tz)
+    except Exception:
+        raise HTTPException(status_code=400, detail=f"Invalid timezone: {tz}")
+
+    if response_format == "ndjson":
+        async def ndjson_lines():
+            async for rows in stream_event_rows(
+                session, location, start_date, end_date,
+                with_seats=seats, include_past=include_past, archived=archived
+            ):
+                yield dump_event_rows_ndjson(rows, target_tz, seats)
+
+        return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+    if cursor and not limit:
+        limit = DEFAULT_PAGE_SIZE
+
+    # Seat counts change with every registration, so they are cached apart
+    # from plain listings, which only change when events are created.
+    cache = event_seats_cache if seats else event_list_cache
+    cache_key = (location, start_date, end_date, tz, limit, cursor, include_past, archived)
+    cached = cache.get(cache_key)
+    if cached is None:
+        # Read the version before querying so a concurrent create_event
+        # can only make this entry stale, never hide its own event.
+        version = cache.version
+        events = await list_event_rows(
+            session, location, start_date, end_date, limit, cursor,
+            with_seats=seats, include_past=include_past, archived=archived
+        )
+        body = dump_event_rows(events, target_tz, seats)
+        etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        next_cursor = next_event_cursor(events, limit) if limit else None
+        cached = (body, etag, next_cursor)
+        if version == cache.version:
+            cache.set(cache_key, cached)
+    body, etag, next_cursor = cached
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.get("/stats", response_model=List[EventSeats])
+async def get_event_seat_stats(
+    ids: List[UUID] = Query(..., max_length=MAX_STATS_IDS, description="Event ids (repeat the parameter)"),
+    session: AsyncSession = Depends(get_read_session)
+):
+    """
+    Seat counts for up to 100 events in one query, e.g. for a page of event
+    cards. Unknown ids are left out of the result.
+    """
+    return [row._asdict() for row in await event_seat_stats(session, ids)]
+
+@router.get("/calendar", response_model=List[EventCalendarBucket])
+async def get_event_calendar(
+    start: date = Query(..., description="First local date shown"),
+    end: date = Query(..., description="Local date after the last one shown"),
+    bucket: Literal["day", "week"] = Query("day", description="Group by day or by ISO week (keyed by Monday)"),
+    tz: str = Query("UTC", description="Timezone the dates are in"),
+    location: Optional[str] = Query(None, description="Filter by location"),
+    include_past: bool = Query(False, description="Also count events that have started or ended"),
+    session: AsyncSession = Depends(get_read_session)
+):
+    """
+    Event counts and seat totals per day or week between start and end in
+    tz, for drawing a calendar without downloading the events. Computed with
+    one GROUP BY in the database; days or weeks without events are left out.
+    Cached with the seats=true listings, so registrations refresh it.
+    """
+    try:
+        zone = get_timezone(tz)
     except Exception:
         raise HTTPException(status_code=400, detail=f"Invalid timezone: {tz}")
+    if not start < end <= start + timedelta(days=MAX_CALENDAR_DAYS):
+        raise HTTPException(
+            status_code=400, detail=f"end must be after start and at most {MAX_CALENDAR_DAYS} days later."
+        )
 
-    for event in events:
-        event.start_time = event.start_time.astimezone(target_tz)
-        event.end_time = event.end_time.astimezone(target_tz)
+    cache_key = ("calendar", start, end, bucket, tz, location, include_past)
+    cached = event_seats_cache.get(cache_key)
+    if cached is None:
+        version = event_seats_cache.version
+        rows = await event_calendar(session, zone, start, end, bucket, location, include_past)
+        cached = [row._asdict() for row in rows]
+        if version == event_seats_cache.version:
+            event_seats_cache.set(cache_key, cached)
+    return cached
 
-    return events
+@router.get("/stats/stream")
+@limiter.exempt
+async def stream_event_seat_stats(
+    request: Request,
+    ids: List[UUID] = Query(..., max_length=MAX_STATS_IDS, description="Event ids (repeat the parameter)"),
+    session: AsyncSession = Depends(get_read_session)
+):
+    """
+    Server-Sent Events stream of live seat counts for up to 100 events,
+    instead of polling GET /events or /stats. Each message ("seats" event)
+    carries one event's id, max_capacity, registered_count and
+    remaining_capacity: first the current counts, then a message whenever
+    a registration changes them, coalesced over SEAT_FEED_COALESCE_MS.
+    Unknown ids are left out.
+    """
+    # Subscribe before reading the snapshot so no update can fall in between.
+    subscription = seat_feed.subscribe(ids)
+    try:
+        snapshot, missing = seat_feed.snapshot(subscription.event_ids)
+        if missing:
+            snapshot += [
+                seat_feed.remember(row.id, row.max_capacity, row.registered_count, row.held_count)
+                for row in await event_seat_stats(session, missing)
+            ]
+        # Give the connection back now; the stream itself never queries.
+        await session.close()
+    except BaseException:
+        seat_feed.unsubscribe(subscription)
+        raise
+    keepalive = get_settings().seat_feed_keepalive_seconds
+
+    async def messages():
+        for update in snapshot:
+            yield format_sse(update, event="seats")
+        while True:
+            updates = await subscription.next(timeout=keepalive)
+            if not updates:
+                yield SSE_KEEPALIVE
+            for update in updates:
+                yield format_sse(update, event="seats")
+
+    return ReleasingStreamingResponse(
+        messages(), media_type="text/event-stream",
+        on_close=lambda: seat_feed.unsubscribe(subscription),
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/cache-stats", tags=["Health"])
+async def get_event_cache_stats():
+    """
+    Hit/miss counters of the GET /events response cache, for tuning its size and TTL.
+    Counters of the separate seats=true cache are under "seats", and those
+    of the Idempotency-Key response store under "idempotency"; "seat_feed"
+    counts live seat-stream subscriptions and the updates fanned out to them;
+    "event_metadata" has the hit rate and the database round trips saved by
+    the event metadata cache of the attendee routes.
+    """
+    return {
+        **event_list_cache.stats(),
+        "seats": event_seats_cache.stats(),
+        "idempotency": idempotency_store.stats(),
+        "seat_feed": seat_feed.stats(),
+        "event_metadata": event_metadata_cache.stats(),
+    }
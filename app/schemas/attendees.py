@@ -2,6 +2,11 @@
 Pydantic schemas for Attendee creation and reading.
 """
 
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Iterable, List, Literal, Optional
 from uuid import UUID
 from pydantic import BaseModel, EmailStr, Field, ConfigDict
 
@@ -17,3 +22,63 @@ class AttendeeRead(BaseModel):
     email: EmailStr
 
     model_config = ConfigDict(from_attributes=True)
+
+class AttendeeBulkCreate(BaseModel):
+    """Schema for registering a group of attendees in one request."""
+    attendees: List[AttendeeCreate] = Field(
+        ..., min_length=1, max_length=1000, description="Attendees to register, in priority order"
+    )
+
+class BulkRegistrationResult(BaseModel):
+    """Outcome of one row of a bulk registration."""
+    index: int = Field(..., description="Position of the row in the request")
+    email: EmailStr
+    status: Literal["accepted", "duplicate", "rejected"]
+    id: Optional[UUID] = Field(None, description="Attendee id when accepted")
+    detail: Optional[str] = None
+
+class BulkRegistrationReport(BaseModel):
+    """Summary and per-row results of a bulk registration."""
+    accepted: int
+    duplicate: int
+    rejected: int
+    results: List[BulkRegistrationResult]
+
+class SeatHoldRead(BaseModel):
+    """Schema for reading a seat hold; confirm it before expires_at."""
+    id: UUID
+    event_id: UUID
+    name: str
+    email: EmailStr
+    expires_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+def dump_attendee_rows(rows: Iterable) -> bytes:
+    """
+    Serialize Core rows of AttendeeRead columns as the JSON array a
+    List[AttendeeRead] response would produce, skipping Pydantic validation.
+    """
+    return json.dumps(
+        [{"id": str(row.id), "name": row.name, "email": row.email} for row in rows],
+        ensure_ascii=False, separators=(",", ":")
+    ).encode()
+
+ATTENDEE_CSV_HEADER = b"id,name,email\r\n"
+
+def dump_attendee_rows_csv(rows: Iterable) -> bytes:
+    """Serialize Core rows of AttendeeRead columns as CSV lines (no header)."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows((str(row.id), row.name, row.email) for row in rows)
+    return buffer.getvalue().encode()
+
+def dump_attendee_rows_ndjson(rows: Iterable) -> bytes:
+    """Serialize Core rows of AttendeeRead columns as newline-delimited JSON objects."""
+    return b"".join(
+        json.dumps(
+            {"id": str(row.id), "name": row.name, "email": row.email},
+            ensure_ascii=False, separators=(",", ":")
+        ).encode() + b"\n"
+        for row in rows
+    )
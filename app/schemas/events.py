@@ -2,9 +2,13 @@
 Pydantic schemas for Event creation and reading.
 """
 
-from datetime import datetime
+import json
+from datetime import date, datetime, tzinfo
+from typing import Iterable, List, Optional
 from uuid import UUID
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, model_serializer
+
+from utils.common import format_datetime
 
 class EventCreate(BaseModel):
     """Schema for creating a new event."""
@@ -18,13 +22,93 @@ class EventCreate(BaseModel):
     )
     max_capacity: int = Field(gt=0, description="Maximum capacity (> 0)")
 
+SEAT_FIELDS = ("registered_count", "remaining_capacity")
+
 class EventRead(BaseModel):
-    """Schema for reading event data."""
+    """
+    Schema for reading event data.
+    Seat counts are filled in by POST /events (a new event has all its
+    seats left) and by GET /events?seats=true, and are left out of the
+    output otherwise.
+    """
     id: UUID
     name: str
     location: str
     start_time: datetime
     end_time: datetime
     max_capacity: int
+    registered_count: Optional[int] = Field(None, description="Seats taken")
+    remaining_capacity: Optional[int] = Field(None, description="Seats left")
 
     model_config = ConfigDict(from_attributes=True)
+
+    @model_serializer(mode="wrap")
+    def _omit_unset_seats(self, handler):
+        data = handler(self)
+        for field in SEAT_FIELDS:
+            if data.get(field) is None:
+                data.pop(field, None)
+        return data
+
+class EventSeats(BaseModel):
+    """Seat counts of one event, for GET /events/stats."""
+    id: UUID
+    max_capacity: int
+    registered_count: int
+    remaining_capacity: int
+
+class EventCalendarBucket(BaseModel):
+    """Events starting in one calendar day or week, for GET /events/calendar."""
+    bucket: date = Field(..., description="Local date of the day, or the Monday of the week")
+    events: int
+    max_capacity: int = Field(..., description="Seats across the bucket's events")
+    registered_count: int
+    remaining_capacity: int
+
+class EventImportError(BaseModel):
+    """A row of an event import that was not inserted."""
+    line: int = Field(..., description="Line number in the uploaded file")
+    name: Optional[str] = None
+    detail: str
+
+class EventImportReport(BaseModel):
+    """Summary of an event import; errors lists at most the first few rejected rows."""
+    inserted: int
+    rejected: int
+    errors: List[EventImportError]
+
+
+def event_row_to_dict(row, target_tz: tzinfo, with_seats: bool = False) -> dict:
+    """
+    Convert a Core row of EventRead columns to a JSON-ready dict with times in
+    target_tz, skipping Pydantic validation for read-only listings.
+    with_seats expects the seat columns too (EVENT_SEAT_COLUMNS).
+    """
+    data = {
+        "id": str(row.id),
+        "name": row.name,
+        "location": row.location,
+        "start_time": format_datetime(row.start_time, target_tz),
+        "end_time": format_datetime(row.end_time, target_tz),
+        "max_capacity": row.max_capacity,
+    }
+    if with_seats:
+        data["registered_count"] = row.registered_count
+        data["remaining_capacity"] = row.remaining_capacity
+    return data
+
+def dump_event_rows(rows: Iterable, target_tz: tzinfo, with_seats: bool = False) -> bytes:
+    """Serialize rows as the JSON array a List[EventRead] response would produce."""
+    return json.dumps(
+        [event_row_to_dict(row, target_tz, with_seats) for row in rows],
+        ensure_ascii=False, separators=(",", ":")
+    ).encode()
+
+def dump_event_rows_ndjson(rows: Iterable, target_tz: tzinfo, with_seats: bool = False) -> bytes:
+    """Serialize rows as newline-delimited EventRead JSON objects."""
+    return b"".join(
+        json.dumps(
+            event_row_to_dict(row, target_tz, with_seats), ensure_ascii=False, separators=(",", ":")
+        ).encode() + b"\n"
+        for row in rows
+    )
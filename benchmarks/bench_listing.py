@@ -0,0 +1,142 @@
+"""
+Benchmark the event and attendee listing read paths.
+
+Compares the ORM path (ORM instances, per-request pytz lookup, Pydantic
+validation and serialization) against the Core-row fast path used by the
+routers, reporting rows/sec and peak traced memory at several table sizes.
+
+    python -m benchmarks.bench_listing
+    python -m benchmarks.bench_listing --sizes 1000 10000 100000 --repeat 3
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List
+
+import pytz
+from pydantic import TypeAdapter
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app import models
+from app.crud.events import list_event_rows, list_events
+from app.schemas.attendees import AttendeeRead, dump_attendee_rows
+from app.schemas.events import EventRead, dump_event_rows
+from utils.common import get_timezone
+
+TZ = "Asia/Kolkata"
+_events_adapter = TypeAdapter(List[EventRead])
+_attendees_adapter = TypeAdapter(List[AttendeeRead])
+
+
+async def seed(session_maker, size: int) -> uuid.UUID:
+    """Insert size events and size attendees for one of them."""
+    now = datetime.now(timezone.utc)
+    event_id = uuid.uuid4()
+    async with session_maker() as session:
+        await session.execute(insert(models.Event), [
+            {
+                "id": event_id if i == 0 else uuid.uuid4(),
+                "name": f"Event {i}",
+                "location": f"City {i % 50}",
+                "start_time": now + timedelta(days=1, minutes=i),
+                "end_time": now + timedelta(days=2, minutes=i),
+                "max_capacity": size,
+                "registered_count": size if i == 0 else 0,
+            }
+            for i in range(size)
+        ])
+        await session.execute(insert(models.Attendee), [
+            {"id": uuid.uuid4(), "name": f"Guest {i}", "email": f"guest{i}@example.com", "event_id": event_id}
+            for i in range(size)
+        ])
+        await session.commit()
+    return event_id
+
+
+async def events_orm(session: AsyncSession, event_id: uuid.UUID) -> bytes:
+    events = await list_events(session)
+    target_tz = pytz.timezone(TZ)
+    for event in events:
+        event.start_time = event.start_time.replace(tzinfo=timezone.utc).astimezone(target_tz)
+        event.end_time = event.end_time.replace(tzinfo=timezone.utc).astimezone(target_tz)
+    return _events_adapter.dump_json(_events_adapter.validate_python(events, from_attributes=True))
+
+
+async def events_core(session: AsyncSession, event_id: uuid.UUID) -> bytes:
+    rows = await list_event_rows(session)
+    return dump_event_rows(rows, get_timezone(TZ))
+
+
+async def attendees_orm(session: AsyncSession, event_id: uuid.UUID) -> bytes:
+    result = await session.execute(
+        select(models.Attendee).where(models.Attendee.event_id == event_id)
+    )
+    attendees = result.scalars().all()
+    return _attendees_adapter.dump_json(_attendees_adapter.validate_python(attendees, from_attributes=True))
+
+
+async def attendees_core(session: AsyncSession, event_id: uuid.UUID) -> bytes:
+    result = await session.execute(
+        select(models.Attendee.id, models.Attendee.name, models.Attendee.email)
+        .where(models.Attendee.event_id == event_id)
+    )
+    return dump_attendee_rows(result.all())
+
+
+PATHS = {
+    "events/orm": events_orm,
+    "events/core": events_core,
+    "attendees/orm": attendees_orm,
+    "attendees/core": attendees_core,
+}
+
+
+async def measure(session_maker, path, event_id, size: int, repeat: int) -> tuple[float, float]:
+    """
+    Return (best rows/sec, peak MiB). Timing runs are untraced; peak memory
+    comes from one extra tracemalloc run, since tracing skews timings.
+    """
+    best = 0.0
+    for _ in range(repeat):
+        async with session_maker() as session:
+            started = time.perf_counter()
+            await path(session, event_id)
+            elapsed = time.perf_counter() - started
+        best = max(best, size / elapsed)
+
+    async with session_maker() as session:
+        tracemalloc.start()
+        await path(session, event_id)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return best, peak / 2**20
+
+
+async def main(sizes: list[int], repeat: int) -> None:
+    print(f"{'path':<16}{'rows':>9}{'rows/sec':>14}{'peak MiB':>11}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}")
+            async with engine.begin() as conn:
+                await conn.run_sync(models.Base.metadata.create_all)
+            session_maker = async_sessionmaker(engine, expire_on_commit=False)
+            event_id = await seed(session_maker, size)
+            for name, path in PATHS.items():
+                rate, peak = await measure(session_maker, path, event_id, size, repeat)
+                print(f"{name:<16}{size:>9}{rate:>14,.0f}{peak:>11.1f}")
+            await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.repeat))
@@ -0,0 +1,45 @@
+"""
+Microbenchmark the per-request cost of the rate limiter.
+
+Times the fixed-window hit slowapi performs on every limited request, for
+the per-process memory:// storage and the host-wide shm:// storage.
+
+    python -m benchmarks.bench_rate_limit
+    python -m benchmarks.bench_rate_limit --requests 500000 --clients 1000
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter
+
+import utils.rate_limit  # noqa: F401 - registers the shm:// storage scheme
+
+
+def bench(storage_uri: str, requests: int, clients: int) -> float:
+    """Return the mean microseconds per limiter hit."""
+    limiter = FixedWindowRateLimiter(storage_from_string(storage_uri))
+    limit = parse("1000000/minute")
+    keys = [f"10.0.{i // 256}.{i % 256}" for i in range(clients)]
+    started = time.perf_counter()
+    for i in range(requests):
+        limiter.hit(limit, keys[i % clients], "/api/v1/events/register")
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+def main(requests: int, clients: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, uri in (("memory", "memory://"), ("shm", f"shm://{Path(tmp) / 'ratelimit'}")):
+            print(f"{name:<8}{bench(uri, requests, clients):>8.2f} us/hit")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200_000)
+    parser.add_argument("--clients", type=int, default=100)
+    args = parser.parse_args()
+    main(args.requests, args.clients)
@@ -0,0 +1,79 @@
+"""
+Benchmark registrations per second on a single hot event.
+
+Runs the same burst of concurrent registrations through register_attendee
+(one transaction per registration) and through RegistrationBatcher (group
+commit), each against a fresh SQLite database file.
+
+    python -m benchmarks.bench_registration
+    python -m benchmarks.bench_registration --registrations 5000 --window-ms 2
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app import models
+from app.crud.attendees import register_attendee
+from app.crud.batching import RegistrationBatcher
+from app.schemas.attendees import AttendeeCreate
+
+
+async def hot_event(path: Path, capacity: int):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", connect_args={"timeout": 60})
+    async with engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    now = datetime.now(timezone.utc)
+    async with session_maker() as session:
+        event = models.Event(
+            name="Hot Event", location="Mumbai", max_capacity=capacity,
+            start_time=now + timedelta(days=1), end_time=now + timedelta(days=2)
+        )
+        session.add(event)
+        await session.commit()
+    return engine, session_maker, event.id
+
+
+async def run(registrations: int, window_ms: float, batched: bool) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, session_maker, event_id = await hot_event(Path(tmp) / "bench.db", registrations)
+        batcher = RegistrationBatcher(session_maker, window_ms=window_ms)
+
+        async def register(i):
+            attendee = AttendeeCreate(name=f"user{i}", email=f"user{i}@example.com")
+            try:
+                if batched:
+                    await batcher.register(event_id, attendee)
+                else:
+                    async with session_maker() as session:
+                        await register_attendee(session, event_id, attendee)
+            except HTTPException:
+                pass
+
+        started = time.perf_counter()
+        await asyncio.gather(*(register(i) for i in range(registrations)))
+        elapsed = time.perf_counter() - started
+        await engine.dispose()
+    return registrations / elapsed
+
+
+async def main(registrations: int, window_ms: float) -> None:
+    direct = await run(registrations, window_ms, batched=False)
+    grouped = await run(registrations, window_ms, batched=True)
+    print(f"{'direct':<10}{direct:>12,.0f} registrations/sec")
+    print(f"{'batched':<10}{grouped:>12,.0f} registrations/sec ({grouped / direct:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--registrations", type=int, default=2000)
+    parser.add_argument("--window-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.registrations, args.window_ms))
@@ -0,0 +1,259 @@
+"""
+Load test the API and record throughput and tail latency.
+
+Drives app.main:app in-process through ASGI (default) or a running server
+(--base-url), against a temporary SQLite file (default) or any database
+given with --database-url, e.g. a local Postgres:
+
+    python -m benchmarks.load_test
+    python -m benchmarks.load_test --sizes 1000 100000 --concurrency 1 16 64
+    python -m benchmarks.load_test --database-url postgresql+asyncpg://postgres:pw@localhost/bench
+    RATE_LIMIT_ENABLED=false DATABASE_URL=... uvicorn app.main:app --workers 4 &
+    python -m benchmarks.load_test --base-url http://127.0.0.1:8000 --database-url ...
+
+For every table size the events table is reseeded with that many events,
+one of which gets that many attendees, and the API caches are emptied
+(with --base-url, by waiting out the server's listing cache TTL). Each
+scenario then runs at every concurrency level; results (requests/sec,
+p50/p95/p99 in ms, errors) are written as JSON. --baseline compares against an earlier results file and
+exits non-zero when a p95 regresses by more than --max-regression.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+from sqlalchemy import delete, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app import models
+from app.config import get_settings
+from utils.cache import event_list_cache, event_metadata_cache, event_seats_cache
+from utils.common import encode_cursor
+
+PREFIX = "/api/v1/events"
+PAGE_SIZE = 50
+
+
+async def seed(database_url: str, size: int) -> dict:
+    """Replace all rows with size events and size attendees on one of them."""
+    engine = create_async_engine(database_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+        await conn.execute(delete(models.Attendee))
+        await conn.execute(delete(models.Event))
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    now = datetime.now(timezone.utc)
+    hot_id, big_id = uuid.uuid4(), uuid.uuid4()
+    events = [
+        {
+            "id": uuid.uuid4(), "name": f"Seed Event {i}", "location": f"City {i % 100}",
+            "start_time": now + timedelta(days=1, minutes=i), "end_time": now + timedelta(days=2, minutes=i),
+            "max_capacity": 100, "registered_count": 0,
+        }
+        for i in range(size)
+    ]
+    events[0].update(id=hot_id, max_capacity=size, registered_count=size)
+    events[1 % size].update(id=big_id, max_capacity=10_000_000)
+    emails = sorted(f"guest{i:08d}@example.com" for i in range(size))
+    async with session_maker() as session:
+        for start in range(0, size, 5000):
+            await session.execute(insert(models.Event), events[start:start + 5000])
+        for start in range(0, size, 5000):
+            await session.execute(insert(models.Attendee), [
+                {"id": uuid.uuid4(), "name": email, "email": email, "event_id": hot_id}
+                for email in emails[start:start + 5000]
+            ])
+        await session.commit()
+    await engine.dispose()
+    return {
+        "hot_id": hot_id,
+        "big_id": big_id,
+        "last_page": max(size // PAGE_SIZE, 1),
+        "deep_cursor": encode_cursor([emails[max(size - PAGE_SIZE - 1, 0)]]),
+    }
+
+
+def reset_caches() -> None:
+    """Drop the in-process API caches, which still hold the previous seed's responses."""
+    event_list_cache.invalidate()
+    event_seats_cache.invalidate()
+    event_metadata_cache.clear()
+
+
+def scenarios(seeded: dict) -> dict:
+    """Map scenario name to a factory of (method, url, json) for request number n."""
+    run_id = uuid.uuid4().hex[:8]
+    # Writes need names and emails unique across every run against this seed.
+    unique = itertools.count()
+    start = (datetime.now(timezone.utc) + timedelta(days=30)).isoformat()
+    end = (datetime.now(timezone.utc) + timedelta(days=31)).isoformat()
+    hot, big = seeded["hot_id"], seeded["big_id"]
+    return {
+        "create-event": lambda n: ("POST", f"{PREFIX}/", {
+            "name": f"Load {run_id} {next(unique)}", "location": "Pune",
+            "start_time": start, "end_time": end, "max_capacity": 100,
+        }),
+        "register": lambda n: ("POST", f"{PREFIX}/{big}/register", {
+            "name": f"Load {n}", "email": f"load-{run_id}-{next(unique)}@example.com",
+        }),
+        "list-events": lambda n: ("GET", f"{PREFIX}/?limit=100", None),
+        "list-events-all": lambda n: ("GET", f"{PREFIX}/", None),
+        "list-events-filtered": lambda n: ("GET", f"{PREFIX}/?location=City 7&limit=100", None),
+        "list-attendees-shallow": lambda n: ("GET", f"{PREFIX}/{hot}/attendees?page=1&page_size={PAGE_SIZE}", None),
+        "list-attendees-deep-offset": lambda n: (
+            "GET", f"{PREFIX}/{hot}/attendees?page={seeded['last_page']}&page_size={PAGE_SIZE}", None
+        ),
+        "list-attendees-deep-cursor": lambda n: (
+            "GET", f"{PREFIX}/{hot}/attendees?cursor={seeded['deep_cursor']}&page_size={PAGE_SIZE}", None
+        ),
+    }
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+async def run_scenario(client: httpx.AsyncClient, make_request, requests: int, concurrency: int) -> dict:
+    """Issue requests from concurrency workers and summarise their latencies."""
+    counter = itertools.count()
+    latencies = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while (n := next(counter)) < requests:
+            method, url, body = make_request(n)
+            started = time.perf_counter()
+            response = await client.request(method, url, json=body)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": requests,
+        "rps": requests / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "errors": errors,
+    }
+
+
+def compare(results: list, baseline_path: str, max_regression: float) -> bool:
+    """Print p95 changes against a baseline file; return False on any regression."""
+    baseline = {
+        (r["scenario"], r["table_size"], r["concurrency"]): r
+        for r in json.loads(Path(baseline_path).read_text())["results"]
+    }
+    ok = True
+    for result in results:
+        before = baseline.get((result["scenario"], result["table_size"], result["concurrency"]))
+        if not before or not before["p95_ms"]:
+            continue
+        change = result["p95_ms"] / before["p95_ms"] - 1
+        flag = "REGRESSION" if change > max_regression else ""
+        ok = ok and not flag
+        print(f"{result['scenario']:<28}{result['table_size']:>9}{result['concurrency']:>6}"
+              f"{before['p95_ms']:>10.2f}{result['p95_ms']:>10.2f}{change:>+9.0%} {flag}")
+    return ok
+
+
+async def main(args) -> int:
+    tmp = None
+    database_url = args.database_url
+    if not database_url:
+        tmp = tempfile.TemporaryDirectory()
+        database_url = f"sqlite+aiosqlite:///{Path(tmp.name) / 'load.db'}"
+
+    stack = contextlib.AsyncExitStack()
+    if args.base_url:
+        transport = None
+        base_url = args.base_url
+    else:
+        # The in-process app must read the benchmark database and not be rate limited.
+        os.environ["DATABASE_URL"] = database_url
+        get_settings.cache_clear()
+        from app.main import app
+        from utils.common import limiter
+        limiter.enabled = False
+        if args.no_cache:
+            event_list_cache.maxsize = 0
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://loadtest"
+        # ASGITransport does not send lifespan events; run the app's startup here.
+        await stack.enter_async_context(app.router.lifespan_context(app))
+
+    results = []
+    print(f"{'scenario':<28}{'rows':>9}{'conc':>6}{'req/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'err':>5}")
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=60) as client:
+        for size in args.sizes:
+            seeded = await seed(database_url, size)
+            if args.base_url:
+                # The server's caches cannot be cleared from here; let its listings expire.
+                await asyncio.sleep(max(event_list_cache.ttl, event_seats_cache.ttl))
+            else:
+                reset_caches()
+            for name, make_request in scenarios(seeded).items():
+                if args.scenarios and name not in args.scenarios:
+                    continue
+                for concurrency in args.concurrency:
+                    summary = await run_scenario(client, make_request, args.requests, concurrency)
+                    result = {"scenario": name, "table_size": size, "concurrency": concurrency, **summary}
+                    results.append(result)
+                    print(f"{name:<28}{size:>9}{concurrency:>6}{summary['rps']:>10.0f}{summary['p50_ms']:>9.2f}"
+                          f"{summary['p95_ms']:>9.2f}{summary['p99_ms']:>9.2f}{summary['errors']:>5}")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "database": database_url.split("://", 1)[0],
+            "target": args.base_url or "asgi",
+            "cache": not args.no_cache,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    await stack.aclose()
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    print(f"results written to {args.output}")
+    if tmp:
+        tmp.cleanup()
+
+    if args.baseline and not compare(results, args.baseline, args.max_regression):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", help="Target a running server instead of the in-process app")
+    parser.add_argument("--database-url", help="Database to seed (and serve, in ASGI mode)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16])
+    parser.add_argument("--requests", type=int, default=300, help="Requests per scenario run")
+    parser.add_argument("--scenarios", nargs="+", help="Only run these scenarios")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the GET /events response cache")
+    parser.add_argument("--output", default="load_test_results.json")
+    parser.add_argument("--baseline", help="Earlier results file to compare p95 latencies against")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    sys.exit(asyncio.run(main(parser.parse_args())))
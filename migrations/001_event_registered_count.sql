@@ -0,0 +1,38 @@
+-- -----------------------------
+-- Migration: events.registered_count
+-- Per-event seat counter claimed atomically by register_attendee.
+-- Run once on databases created from an older schema.sql.
+--
+-- Events overbooked by the old check-then-insert race would violate the
+-- new capacity constraint. The script lists them and aborts (rolling
+-- everything back) instead of altering their data; raise their
+-- max_capacity or remove the extra attendees, then run it again.
+-- -----------------------------
+BEGIN;
+
+ALTER TABLE events ADD COLUMN registered_count INTEGER NOT NULL DEFAULT 0;
+
+UPDATE events e
+SET registered_count = (
+    SELECT COUNT(*) FROM attendees a WHERE a.event_id = e.id
+);
+
+DO $$
+DECLARE
+    overbooked TEXT;
+BEGIN
+    SELECT string_agg(
+        format('%s "%s" (%s attendees, max_capacity %s)', id, name, registered_count, max_capacity), ', '
+    )
+    INTO overbooked
+    FROM events
+    WHERE registered_count > max_capacity;
+    IF overbooked IS NOT NULL THEN
+        RAISE EXCEPTION 'Events already overbooked: %. Raise their max_capacity or remove attendees, then re-run this migration.', overbooked;
+    END IF;
+END $$;
+
+ALTER TABLE events ADD CONSTRAINT _event_capacity_ck
+    CHECK (registered_count BETWEEN 0 AND max_capacity);
+
+COMMIT;
@@ -0,0 +1,10 @@
+-- -----------------------------
+-- Migration: trigram index on events.location
+-- Lets the location ILIKE '%...%' filter in list_events use an index
+-- instead of scanning the whole events table.
+-- CONCURRENTLY avoids blocking writes, so this cannot run in a transaction.
+-- -----------------------------
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_events_location_trgm
+    ON events USING gin (location gin_trgm_ops);
@@ -0,0 +1,77 @@
+"""
+Alembic environment: runs migrations over the app's async engine.
+"""
+
+import asyncio
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import pool
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app import models
+from app.config import get_settings
+
+config = context.config
+
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = models.Base.metadata
+
+
+def database_url() -> str:
+    """-x url=... wins over sqlalchemy.url, which wins over the app settings."""
+    return (
+        context.get_x_argument(as_dictionary=True).get("url")
+        or config.get_main_option("sqlalchemy.url")
+        or get_settings().database_url
+    )
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    # The SQLite location search table and its FTS5 shadow tables are
+    # created by migrations but are not part of the model metadata.
+    if type_ == "table" and name.startswith(models.LOCATION_FTS_TABLE):
+        return False
+    # The trigram index is Postgres-only (ddl_if in app.models).
+    if type_ == "index" and name == "ix_events_location_trgm":
+        return context.get_context().dialect.name == "postgresql"
+    return True
+
+
+def configure(**kwargs) -> None:
+    context.configure(
+        target_metadata=target_metadata,
+        include_object=include_object,
+        # SQLite cannot ALTER constraints; batch operations rebuild the table there.
+        render_as_batch=True,
+        **kwargs
+    )
+
+
+def run_migrations_offline() -> None:
+    """Emit SQL to stdout instead of connecting (alembic upgrade head --sql)."""
+    configure(url=database_url(), literal_binds=True, dialect_opts={"paramstyle": "named"})
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection: Connection) -> None:
+    configure(connection=connection)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_async_migrations() -> None:
+    engine = create_async_engine(database_url(), poolclass=pool.NullPool)
+    async with engine.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+    await engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    asyncio.run(run_async_migrations())
@@ -1,5 +1,7 @@
 -- Create extension for UUID support (if not already present)
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+-- Trigram operator classes for the location substring search index
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
 
 -- -----------------------------
 -- Table: events
@@ -10,9 +12,20 @@ CREATE TABLE events (
     location TEXT NOT NULL,
     start_time TIMESTAMPTZ NOT NULL,
     end_time TIMESTAMPTZ NOT NULL,
-    max_capacity INTEGER NOT NULL CHECK (max_capacity > 0)
+    max_capacity INTEGER NOT NULL CHECK (max_capacity > 0),
+    registered_count INTEGER NOT NULL DEFAULT 0,
+    held_count INTEGER NOT NULL DEFAULT 0,
+    CONSTRAINT _event_capacity_ck CHECK (registered_count BETWEEN 0 AND max_capacity),
+    CONSTRAINT _event_held_ck CHECK (held_count >= 0 AND registered_count + held_count <= max_capacity)
 );
 
+-- Serves location ILIKE '%...%' filters without a sequential scan
+CREATE INDEX ix_events_location_trgm ON events USING gin (location gin_trgm_ops);
+-- Serves start_time range filters and the (start_time, id) listing order / cursor
+CREATE INDEX ix_events_start_time_id ON events (start_time, id);
+-- Lets the archival job find finished events
+CREATE INDEX ix_events_end_time ON events (end_time);
+
 -- -----------------------------
 -- Table: attendees
 -- -----------------------------
@@ -23,3 +36,43 @@ CREATE TABLE attendees (
     event_id UUID NOT NULL REFERENCES events(id) ON DELETE CASCADE,
     CONSTRAINT _event_email_uc UNIQUE (event_id, email)
 );
+
+-- -----------------------------
+-- Table: seat_holds
+-- Seats reserved until expires_at; counted in events.held_count
+-- -----------------------------
+CREATE TABLE seat_holds (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    event_id UUID NOT NULL REFERENCES events(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    expires_at TIMESTAMPTZ NOT NULL
+);
+-- Lets the hold sweeper find expired holds
+CREATE INDEX ix_seat_holds_expires_at ON seat_holds (expires_at);
+-- Lets the archival job drop a finished event's leftover holds
+CREATE INDEX ix_seat_holds_event_id ON seat_holds (event_id);
+
+
+-- -----------------------------
+-- Archive: finished events and their attendees, moved by the archival job
+-- -----------------------------
+CREATE TABLE events_archive (
+    id UUID PRIMARY KEY,
+    name TEXT NOT NULL,
+    location TEXT NOT NULL,
+    start_time TIMESTAMPTZ NOT NULL,
+    end_time TIMESTAMPTZ NOT NULL,
+    max_capacity INTEGER NOT NULL,
+    registered_count INTEGER NOT NULL,
+    archived_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+CREATE INDEX ix_events_archive_start_time_id ON events_archive (start_time, id);
+
+CREATE TABLE attendees_archive (
+    id UUID PRIMARY KEY,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    event_id UUID NOT NULL REFERENCES events_archive(id),
+    CONSTRAINT _archived_event_email_uc UNIQUE (event_id, email)
+);
@@ -0,0 +1,66 @@
+"""Per-event seat counter
+
+Same change as migrations/001_event_registered_count.sql: the counter
+register_attendee claims seats from, backfilled from existing attendees.
+
+Events overbooked by the old check-then-insert race would violate the
+new capacity constraint, so the migration lists them and stops before
+changing anything, leaving their data untouched. Raise their max_capacity or
+remove the extra attendees, then upgrade again.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _check_not_overbooked() -> None:
+    overbooked = op.get_bind().execute(sa.text(
+        "SELECT events.id, events.name, COUNT(*) AS registered_count, events.max_capacity "
+        "FROM events JOIN attendees ON attendees.event_id = events.id "
+        "GROUP BY events.id, events.name, events.max_capacity "
+        "HAVING COUNT(*) > events.max_capacity ORDER BY events.name"
+    )).all()
+    if overbooked:
+        listed = ", ".join(
+            f'{row.id} "{row.name}" ({row.registered_count} attendees, max_capacity {row.max_capacity})'
+            for row in overbooked
+        )
+        raise RuntimeError(
+            f"Events already overbooked: {listed}. "
+            "Raise their max_capacity or remove attendees, then re-run this migration."
+        )
+
+
+def upgrade() -> None:
+    # Checked before any change: SQLite DDL is not rolled back on failure.
+    if not op.get_context().as_sql:
+        _check_not_overbooked()
+    with op.batch_alter_table("events") as batch_op:
+        batch_op.add_column(
+            sa.Column("registered_count", sa.Integer(), nullable=False, server_default="0")
+        )
+    op.execute(
+        "UPDATE events SET registered_count = "
+        "(SELECT COUNT(*) FROM attendees WHERE attendees.event_id = events.id)"
+    )
+    with op.batch_alter_table("events") as batch_op:
+        batch_op.create_check_constraint(
+            "_event_capacity_ck", "registered_count BETWEEN 0 AND max_capacity"
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("events") as batch_op:
+        batch_op.drop_constraint("_event_capacity_ck", type_="check")
+        batch_op.drop_column("registered_count")
@@ -0,0 +1,59 @@
+"""Index location substring search
+
+Same change as migrations/002_events_location_trgm.sql on Postgres (a
+pg_trgm GIN index, built without blocking writes). On SQLite, creates the
+FTS5 trigram table app.database.search queries, with the triggers that
+keep it in sync, and fills it from existing events.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SQLITE_UPGRADE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS events_location_fts "
+    "USING fts5(location, event_id UNINDEXED, tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS events_location_fts_ai AFTER INSERT ON events BEGIN "
+    "INSERT INTO events_location_fts(location, event_id) VALUES (new.location, new.id); END",
+    "CREATE TRIGGER IF NOT EXISTS events_location_fts_ad AFTER DELETE ON events BEGIN "
+    "DELETE FROM events_location_fts WHERE event_id = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS events_location_fts_au AFTER UPDATE OF location ON events BEGIN "
+    "UPDATE events_location_fts SET location = new.location WHERE event_id = old.id; END",
+    "INSERT INTO events_location_fts(location, event_id) SELECT location, id FROM events",
+)
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        with op.get_context().autocommit_block():
+            op.create_index(
+                "ix_events_location_trgm", "events", ["location"],
+                postgresql_using="gin", postgresql_ops={"location": "gin_trgm_ops"},
+                postgresql_concurrently=True, if_not_exists=True
+            )
+    elif op.get_bind().dialect.name == "sqlite":
+        for statement in SQLITE_UPGRADE:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.drop_index(
+                "ix_events_location_trgm", table_name="events",
+                postgresql_concurrently=True, if_exists=True
+            )
+    elif op.get_bind().dialect.name == "sqlite":
+        for trigger in ("ai", "ad", "au"):
+            op.execute(f"DROP TRIGGER IF EXISTS events_location_fts_{trigger}")
+        op.execute("DROP TABLE IF EXISTS events_location_fts")
@@ -0,0 +1,35 @@
+"""Index events by (start_time, id)
+
+Serves the start_time range filter, the (start_time, id) ordering and the
+keyset cursor of list_events, which otherwise scan and sort all events.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY keeps writes flowing while Postgres builds the index.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_events_start_time_id", "events", ["start_time", "id"],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_events_start_time_id", table_name="events",
+            postgresql_concurrently=True, if_exists=True
+        )
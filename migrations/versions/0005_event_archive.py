@@ -0,0 +1,66 @@
+"""Archive tables for finished events and an end_time index
+
+events_archive and attendees_archive receive finished events and their
+attendees from the archival job, keeping the hot tables small.
+ix_events_end_time lets that job find finished events without a scan.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "events_archive",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("location", sa.String(length=255), nullable=False),
+        sa.Column("start_time", postgresql.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("end_time", postgresql.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("max_capacity", sa.Integer(), nullable=False),
+        sa.Column("registered_count", sa.Integer(), nullable=False),
+        sa.Column(
+            "archived_at", postgresql.TIMESTAMP(timezone=True), nullable=False, server_default=sa.func.now()
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_events_archive_start_time_id", "events_archive", ["start_time", "id"])
+    op.create_table(
+        "attendees_archive",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("email", sa.String(length=255), nullable=False),
+        sa.Column("event_id", sa.Uuid(), nullable=False),
+        sa.ForeignKeyConstraint(["event_id"], ["events_archive.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("event_id", "email", name="_archived_event_email_uc"),
+    )
+    # CONCURRENTLY keeps writes flowing while Postgres builds the index.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_events_end_time", "events", ["end_time"],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_events_end_time", table_name="events",
+            postgresql_concurrently=True, if_exists=True
+        )
+    op.drop_table("attendees_archive")
+    op.drop_index("ix_events_archive_start_time_id", table_name="events_archive")
+    op.drop_table("events_archive")
@@ -0,0 +1,73 @@
+"""Seat holds and the per-event held seat counter
+
+seat_holds keeps seats reserved during checkout until they are confirmed
+or expire; events.held_count counts them so capacity checks stay a single
+conditional UPDATE. ix_seat_holds_expires_at serves the expiry sweeper,
+ix_seat_holds_event_id the archival job.
+
+SQLite cannot add a CHECK constraint in place: the batch block rebuilds
+events, which drops the location search triggers created by 0003, so they
+are recreated after it.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The triggers of migration 0003 that keep events_location_fts in sync.
+SQLITE_FTS_TRIGGERS = (
+    "CREATE TRIGGER IF NOT EXISTS events_location_fts_ai AFTER INSERT ON events BEGIN "
+    "INSERT INTO events_location_fts(location, event_id) VALUES (new.location, new.id); END",
+    "CREATE TRIGGER IF NOT EXISTS events_location_fts_ad AFTER DELETE ON events BEGIN "
+    "DELETE FROM events_location_fts WHERE event_id = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS events_location_fts_au AFTER UPDATE OF location ON events BEGIN "
+    "UPDATE events_location_fts SET location = new.location WHERE event_id = old.id; END",
+)
+
+
+def _restore_sqlite_fts_triggers() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        for statement in SQLITE_FTS_TRIGGERS:
+            op.execute(statement)
+
+
+def upgrade() -> None:
+    op.add_column("events", sa.Column("held_count", sa.Integer(), nullable=False, server_default="0"))
+    with op.batch_alter_table("events") as batch_op:
+        batch_op.create_check_constraint(
+            "_event_held_ck", "held_count >= 0 AND registered_count + held_count <= max_capacity"
+        )
+    _restore_sqlite_fts_triggers()
+    op.create_table(
+        "seat_holds",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("event_id", sa.Uuid(), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("email", sa.String(length=255), nullable=False),
+        sa.Column("expires_at", postgresql.TIMESTAMP(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["event_id"], ["events.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_seat_holds_expires_at", "seat_holds", ["expires_at"])
+    op.create_index("ix_seat_holds_event_id", "seat_holds", ["event_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_seat_holds_event_id", table_name="seat_holds")
+    op.drop_index("ix_seat_holds_expires_at", table_name="seat_holds")
+    op.drop_table("seat_holds")
+    with op.batch_alter_table("events") as batch_op:
+        batch_op.drop_constraint("_event_held_ck", type_="check")
+        batch_op.drop_column("held_count")
+    _restore_sqlite_fts_triggers()
@@ -2,13 +2,21 @@
 Pytest configuration and fixtures for the Event Management System tests.
 """
 
+import os
+import tempfile
 import pytest
 import pytest_asyncio
 import asyncio
+
+# Keep rate-limit counters of test runs out of the host-wide /dev/shm table
+os.environ.setdefault(
+    "RATE_LIMIT_STORAGE_URI", f"shm://{tempfile.mkdtemp()}/ratelimit"
+)
+
 from httpx import AsyncClient, ASGITransport
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from app.main import app
-from app.database.db_connection import get_session
+from app.database.db_connection import get_session, get_read_session
 from app.models import Base
 
 # ✅ SQLite test DB URL (or switch to Postgres test DB here)
@@ -49,6 +57,7 @@ async def override_get_session(async_session_maker_fixture):
 @pytest_asyncio.fixture
 async def client(override_get_session):
     app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_read_session] = override_get_session
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://testserver/api/v1") as ac:
         yield ac
@@ -3,8 +3,18 @@ Test module for attendee registration endpoints.
 """
 
 import pytest
+import asyncio
 import datetime
+import uuid
 import pytz
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app import models
+from app.crud.attendees import confirm_seat_hold, expire_seat_holds, hold_seat, register_attendee
+from app.crud.batching import RegistrationBatcher
+from app.schemas.attendees import AttendeeCreate
 
 @pytest.mark.asyncio
 async def test_register_attendee_success(client):
@@ -127,4 +137,438 @@ async def test_booking_not_allowed_after_event_start(client):
     }
     response = await client.post(f"/events/{event_id}/register", json=register_payload)
     assert response.status_code == 400
-    assert "Registration closed: event has already started" in response.text
\ No newline at end of file
+    assert "Registration closed: event has already started" in response.text
+
+async def _flash_sale(tmp_path, capacity):
+    """Create a file-backed database (one connection per session) with one event."""
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'concurrency.db'}",
+        connect_args={"timeout": 30}
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    async with session_maker() as session:
+        event = models.Event(
+            name="Flash Sale",
+            location="Mumbai",
+            start_time=now + datetime.timedelta(days=1),
+            end_time=now + datetime.timedelta(days=2),
+            max_capacity=capacity
+        )
+        session.add(event)
+        await session.commit()
+    return engine, session_maker, event.id
+
+
+async def _seat_counts(session_maker, event_id):
+    async with session_maker() as session:
+        event = await session.get(models.Event, event_id)
+        attendee_count = await session.scalar(
+            select(func.count()).where(models.Attendee.event_id == event_id)
+        )
+    return event.registered_count, attendee_count
+
+
+@pytest.mark.asyncio
+async def test_concurrent_registrations_never_overbook(tmp_path):
+    """
+    Hundreds of parallel registrations against one event must claim exactly
+    max_capacity seats; every other request is rejected as fully booked.
+    """
+    engine, session_maker, event_id = await _flash_sale(tmp_path, capacity=50)
+
+    async def register(i):
+        async with session_maker() as session:
+            try:
+                await register_attendee(
+                    session, event_id,
+                    AttendeeCreate(name=f"user{i}", email=f"user{i}@example.com")
+                )
+                return "ok"
+            except HTTPException as exc:
+                return exc.detail
+
+    results = await asyncio.gather(*(register(i) for i in range(300)))
+
+    assert results.count("ok") == 50
+    assert results.count("Event is fully booked.") == 250
+    assert await _seat_counts(session_maker, event_id) == (50, 50)
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_batched_registrations_commit_together(tmp_path):
+    engine, session_maker, event_id = await _flash_sale(tmp_path, capacity=50)
+    batcher = RegistrationBatcher(session_maker, window_ms=20, max_batch_size=100)
+
+    async def register(i):
+        email = "twin@example.com" if i in (0, 1) else f"user{i}@example.com"
+        try:
+            attendee = await batcher.register(event_id, AttendeeCreate(name=f"user{i}", email=email))
+            assert attendee.email == email and attendee.id
+            return "ok"
+        except HTTPException as exc:
+            return exc.detail
+
+    results = await asyncio.gather(*(register(i) for i in range(300)))
+
+    assert results[:2] == ["ok", "Email already registered for this event."]
+    assert results.count("ok") == 50
+    assert results.count("Event is fully booked.") == 249
+    assert batcher.stats()["batches"] == 3
+    assert await _seat_counts(session_maker, event_id) == (50, 50)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await batcher.register(uuid.uuid4(), AttendeeCreate(name="x", email="x@example.com"))
+    assert exc_info.value.status_code == 404
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_bulk_registration_reports_each_row(client):
+    now = datetime.datetime.now(datetime.timezone.utc)
+    payload = {
+        "name": "Corporate Offsite",
+        "location": "Goa",
+        "start_time": (now + datetime.timedelta(days=5)).isoformat(),
+        "end_time": (now + datetime.timedelta(days=6)).isoformat(),
+        "max_capacity": 4
+    }
+    create_response = await client.post("/events/", json=payload)
+    assert create_response.status_code == 200
+    event_id = create_response.json()["id"]
+
+    r = await client.post(f"/events/{event_id}/register", json={
+        "name": "Existing", "email": "existing@example.com"
+    })
+    assert r.status_code == 200
+
+    emails = ["a@example.com", "existing@example.com", "a@example.com",
+              "b@example.com", "c@example.com", "d@example.com"]
+    response = await client.post(f"/events/{event_id}/register/bulk", json={
+        "attendees": [{"name": e.split("@")[0], "email": e} for e in emails]
+    })
+    assert response.status_code == 200
+    report = response.json()
+    assert [row["status"] for row in report["results"]] == [
+        "accepted", "duplicate", "duplicate", "accepted", "accepted", "rejected"
+    ]
+    assert (report["accepted"], report["duplicate"], report["rejected"]) == (3, 2, 1)
+    assert all(row["id"] for row in report["results"] if row["status"] == "accepted")
+
+    # The event is now full for single registrations too
+    r = await client.post(f"/events/{event_id}/register", json={
+        "name": "Late", "email": "late@example.com"
+    })
+    assert r.status_code == 400
+    assert "fully booked" in r.json()["detail"]
+
+    # Already registered emails are still reported as duplicates once no seats are left
+    response = await client.post(f"/events/{event_id}/register/bulk", json={
+        "attendees": [{"name": "Existing", "email": "existing@example.com"},
+                      {"name": "Late", "email": "late@example.com"}]
+    })
+    report = response.json()
+    assert [row["status"] for row in report["results"]] == ["duplicate", "rejected"]
+    assert (report["accepted"], report["duplicate"], report["rejected"]) == (0, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_bulk_registration_unknown_event(client):
+    response = await client.post(
+        "/events/00000000-0000-0000-0000-000000000000/register/bulk",
+        json={"attendees": [{"name": "Nobody", "email": "nobody@example.com"}]}
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_list_attendees_cursor_pagination(client):
+    now = datetime.datetime.now(datetime.timezone.utc)
+    create_response = await client.post("/events/", json={
+        "name": "Cursor Event",
+        "location": "Delhi",
+        "start_time": (now + datetime.timedelta(days=3)).isoformat(),
+        "end_time": (now + datetime.timedelta(days=4)).isoformat(),
+        "max_capacity": 20
+    })
+    event_id = create_response.json()["id"]
+    emails = [f"guest{i}@example.com" for i in range(7)]
+    r = await client.post(f"/events/{event_id}/register/bulk", json={
+        "attendees": [{"name": e, "email": e} for e in emails]
+    })
+    assert r.json()["accepted"] == 7
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"page_size": 3}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get(f"/events/{event_id}/attendees", params=params)
+        assert response.status_code == 200
+        seen.extend(a["email"] for a in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == sorted(emails)
+
+    # Offset pagination keeps working and uses the same ordering
+    response = await client.get(f"/events/{event_id}/attendees?page=2&page_size=3")
+    assert [a["email"] for a in response.json()] == sorted(emails)[3:6]
+
+    response = await client.get(f"/events/{event_id}/attendees?cursor=not-a-cursor")
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_export_attendees_streams_csv_and_ndjson(client, monkeypatch):
+    import csv
+    import io
+    import json
+    from app.routers import attendees as attendee_routes
+
+    now = datetime.datetime.now(pytz.timezone("Asia/Kolkata"))
+    create_response = await client.post("/events/", json={
+        "name": "Export Event",
+        "location": "Pune",
+        "start_time": (now + datetime.timedelta(days=3)).isoformat(),
+        "end_time": (now + datetime.timedelta(days=4)).isoformat(),
+        "max_capacity": 50
+    })
+    event_id = create_response.json()["id"]
+    emails = [f"export{i:02d}@example.com" for i in range(25)]
+    await client.post(f"/events/{event_id}/register/bulk", json={
+        "attendees": [{"name": f"Guest, {e}", "email": e} for e in emails]
+    })
+    monkeypatch.setattr(attendee_routes, "EXPORT_CHUNK_SIZE", 10)
+
+    response = await client.get(f"/events/{event_id}/attendees/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["email"] for row in rows] == sorted(emails)
+    assert rows[0]["name"] == "Guest, export00@example.com"
+
+    response = await client.get(f"/events/{event_id}/attendees/export?format=ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["email"] for line in lines] == sorted(emails)
+    assert attendee_routes.export_slots.active == 0
+
+    response = await client.get(f"/events/{uuid.uuid4()}/attendees/export")
+    assert response.status_code == 404
+    assert attendee_routes.export_slots.active == 0
+
+    monkeypatch.setattr(attendee_routes.export_slots, "active", attendee_routes.export_slots.limit)
+    response = await client.get(f"/events/{event_id}/attendees/export")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "5"
+
+
+@pytest.mark.asyncio
+async def test_idempotent_registration_retries_wait_and_replay(client, monkeypatch):
+    from app.routers import attendees as attendees_router
+    from utils.common import limiter
+    from utils.idempotency import idempotency_store
+
+    limiter.reset()
+    now = datetime.datetime.now(datetime.timezone.utc)
+    create_response = await client.post("/events/", json={
+        "name": "Idempotent Registration Event",
+        "location": "Goa",
+        "start_time": (now + datetime.timedelta(days=3)).isoformat(),
+        "end_time": (now + datetime.timedelta(days=4)).isoformat(),
+        "max_capacity": 5
+    })
+    event_id = create_response.json()["id"]
+
+    calls = 0
+
+    async def slow_register(*args):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return await register_attendee(*args)
+
+    monkeypatch.setattr(attendees_router, "register_attendee", slow_register)
+    waits = idempotency_store.waits
+    headers = {"Idempotency-Key": "retry-after-timeout"}
+    body = {"name": "Mobile", "email": "mobile@example.com"}
+    first, duplicate = await asyncio.gather(
+        client.post(f"/events/{event_id}/register", json=body, headers=headers),
+        client.post(f"/events/{event_id}/register", json=body, headers=headers),
+    )
+    assert calls == 1 and idempotency_store.waits == waits + 1
+    assert first.status_code == duplicate.status_code == 200
+    assert first.json() == duplicate.json()
+
+    replay = await client.post(f"/events/{event_id}/register", json=body, headers=headers)
+    assert replay.headers["idempotent-replayed"] == "true"
+    assert replay.json()["id"] == first.json()["id"]
+    assert calls == 1
+
+    # Client errors are stored and replayed as well.
+    missing = f"/events/{uuid.uuid4()}/register"
+    assert (await client.post(missing, json=body, headers={"Idempotency-Key": "k2"})).status_code == 404
+    replayed_error = await client.post(missing, json=body, headers={"Idempotency-Key": "k2"})
+    assert replayed_error.status_code == 404 and calls == 2
+
+
+@pytest.mark.asyncio
+async def test_event_metadata_cache_skips_lookups(client):
+    from utils.cache import event_metadata_cache
+    from utils.common import limiter
+
+    limiter.reset()
+    unknown = uuid.uuid4()
+    body = {"name": "Ghost", "email": "ghost@example.com"}
+    assert (await client.post(f"/events/{unknown}/register", json=body)).status_code == 404
+    saved = event_metadata_cache.saved_round_trips
+    # Repeated unknown ids are listed from the negative cache; registrations check the primary.
+    assert (await client.post(f"/events/{unknown}/register", json=body)).status_code == 404
+    assert (await client.get(f"/events/{unknown}/attendees")).status_code == 404
+    assert event_metadata_cache.saved_round_trips == saved + 1
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    created = await client.post("/events/", json={
+        "name": "Metadata Cached Event",
+        "location": "Latur",
+        "start_time": (now + datetime.timedelta(days=6)).isoformat(),
+        "end_time": (now + datetime.timedelta(days=7)).isoformat(),
+        "max_capacity": 5
+    })
+    event_id = created.json()["id"]
+    await client.get(f"/events/{event_id}/attendees")
+    saved = event_metadata_cache.saved_round_trips
+    assert (await client.get(f"/events/{event_id}/attendees")).status_code == 200
+    assert event_metadata_cache.saved_round_trips == saved + 1
+
+    stats = (await client.get("/events/cache-stats")).json()["event_metadata"]
+    assert stats["hits"] >= 3 and stats["saved_round_trips"] >= 2
+
+
+@pytest.mark.asyncio
+async def test_lagging_replica_miss_does_not_block_registration(tmp_path):
+    from starlette.requests import Request
+    from app.crud.attendees import list_attendees
+    from app.database.db_connection import SessionRouter
+
+    makers = []
+    for name in ("primary", "replica"):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / name}.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(models.Base.metadata.create_all)
+        makers.append((engine, async_sessionmaker(engine, expire_on_commit=False)))
+    (primary_engine, primary), (replica_engine, replica) = makers
+    router = SessionRouter(primary, [replica])
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    event_id = uuid.uuid4()
+    async with primary() as session:
+        session.add(models.Event(
+            id=event_id, name="Not Yet Replicated", location="Alappuzha", max_capacity=5,
+            start_time=now + datetime.timedelta(days=1), end_time=now + datetime.timedelta(days=2)
+        ))
+        await session.commit()
+
+    async with router.read_session(Request({"type": "http", "headers": []})) as session:
+        with pytest.raises(HTTPException) as exc_info:
+            await list_attendees(session, event_id)
+        assert exc_info.value.status_code == 404
+
+    async with primary() as session:
+        attendee = await register_attendee(session, event_id, AttendeeCreate(name="Early", email="early@example.com"))
+    assert attendee.event_id == event_id
+
+    await primary_engine.dispose()
+    await replica_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_seat_holds_reserve_confirm_and_release(client):
+    from utils.common import limiter
+
+    limiter.reset()
+    now = datetime.datetime.now(datetime.timezone.utc)
+    created = await client.post("/events/", json={
+        "name": "Paid Workshop",
+        "location": "Sangli",
+        "start_time": (now + datetime.timedelta(days=6)).isoformat(),
+        "end_time": (now + datetime.timedelta(days=7)).isoformat(),
+        "max_capacity": 2
+    })
+    event_id = created.json()["id"]
+
+    first = await client.post(f"/events/{event_id}/holds", json={"name": "A", "email": "a@example.com"})
+    # An email holding a seat cannot hold another one.
+    again = await client.post(f"/events/{event_id}/holds", json={"name": "A", "email": "a@example.com"})
+    assert again.status_code == 400 and again.json()["detail"] == "Email already registered for this event."
+    second = await client.post(f"/events/{event_id}/holds", json={"name": "B", "email": "b@example.com"})
+    assert first.status_code == 200 and second.status_code == 200
+    assert first.json()["event_id"] == event_id and first.json()["email"] == "a@example.com"
+
+    # Held seats are not available to holds or registrations.
+    late = {"name": "C", "email": "c@example.com"}
+    assert (await client.post(f"/events/{event_id}/holds", json=late)).json()["detail"] == "Event is fully booked."
+    assert (await client.post(f"/events/{event_id}/register", json=late)).json()["detail"] == "Event is fully booked."
+    stats = (await client.get(f"/events/stats?ids={event_id}")).json()
+    assert stats[0]["registered_count"] == 0 and stats[0]["remaining_capacity"] == 0
+
+    hold_id = first.json()["id"]
+    confirmed = await client.post(f"/events/{event_id}/holds/{hold_id}/confirm")
+    assert confirmed.status_code == 200 and confirmed.json()["email"] == "a@example.com"
+    assert (await client.post(f"/events/{event_id}/holds/{hold_id}/confirm")).status_code == 404
+
+    released = await client.delete(f"/events/{event_id}/holds/{second.json()['id']}")
+    assert released.status_code == 204
+    # Nor can an email that is already registered.
+    registered = await client.post(f"/events/{event_id}/holds", json={"name": "A", "email": "a@example.com"})
+    assert registered.status_code == 400 and registered.json()["detail"] == "Email already registered for this event."
+    assert (await client.post(f"/events/{event_id}/register", json=late)).status_code == 200
+    stats = (await client.get(f"/events/stats?ids={event_id}")).json()
+    assert stats[0]["registered_count"] == 2 and stats[0]["remaining_capacity"] == 0
+
+
+@pytest.mark.asyncio
+async def test_seat_holds_never_overbook_and_expire(tmp_path):
+    engine, session_maker, event_id = await _flash_sale(tmp_path, capacity=5)
+
+    async def hold(i):
+        async with session_maker() as session:
+            try:
+                return await hold_seat(
+                    session, event_id, AttendeeCreate(name=f"user{i}", email=f"user{i}@example.com"), 60
+                )
+            except HTTPException as exc:
+                return exc.detail
+
+    results = await asyncio.gather(*(hold(i) for i in range(50)))
+    holds = [r for r in results if isinstance(r, models.SeatHold)]
+    assert len(holds) == 5 and results.count("Event is fully booked.") == 45
+
+    async with session_maker() as session:
+        await confirm_seat_hold(session, event_id, holds[0].id)
+    later = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(minutes=2)
+    async with session_maker() as session:
+        assert await expire_seat_holds(session, now=later, batch_size=3) == 4
+        assert await expire_seat_holds(session, now=later) == 0
+
+    async with session_maker() as session:
+        event = await session.get(models.Event, event_id)
+        assert (event.registered_count, event.held_count) == (1, 0)
+    async with session_maker() as session:
+        with pytest.raises(HTTPException) as exc_info:
+            await confirm_seat_hold(session, event_id, holds[1].id)
+    assert exc_info.value.status_code == 404
+
+    # Expired but not yet swept: the hold is refused as expired.
+    async with session_maker() as session:
+        stale = await hold_seat(session, event_id, AttendeeCreate(name="late", email="late@example.com"), 0)
+    async with session_maker() as session:
+        with pytest.raises(HTTPException) as exc_info:
+            await confirm_seat_hold(session, event_id, stale.id)
+    assert exc_info.value.status_code == 410
+    await engine.dispose()
@@ -0,0 +1,76 @@
+"""
+Test module for the in-process TTL/LRU caches.
+"""
+
+from utils.cache import EventMetadataCache, TTLCache, VersionedCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_cache_expires_entries():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=5, clock=clock)
+    cache.set("a", 1)
+    clock.now = 4.9
+    assert cache.get("a") == 1
+    clock.now = 5.0
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_versioned_cache_invalidate():
+    cache = VersionedCache(maxsize=10, ttl=60)
+    cache.set("events", b"[]")
+    assert cache.get("events") == b"[]"
+    cache.invalidate()
+    assert cache.get("events") is None
+    assert cache.stats()["version"] == 1
+
+
+def test_event_metadata_cache_keeps_unknown_ids_apart():
+    clock = FakeClock()
+    cache = EventMetadataCache(maxsize=10, ttl=300, missing_maxsize=2, missing_ttl=30, clock=clock)
+    cache.set("known", ("start", 10))
+    for event_id in ("ghost-1", "ghost-2", "ghost-3"):
+        cache.set_missing(event_id)
+
+    # Unknown ids only ever evict each other.
+    assert cache.get("known") == ("start", 10)
+    assert cache.get("ghost-1") is None
+    assert cache.get("ghost-3") is EventMetadataCache.MISSING
+
+    clock.now = 30
+    assert cache.get("ghost-3") is None
+    assert cache.get("known") == ("start", 10)
+
+    cache.set_missing("created-later")
+    cache.invalidate("created-later")
+    assert cache.get("created-later") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (3, 3, 1)
+
+    cache.set_missing("ghost-4")
+    cache.clear()
+    assert cache.get("known") is None and cache.get("ghost-4") is None
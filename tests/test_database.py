@@ -0,0 +1,206 @@
+"""
+Test module for engine configuration and pool statistics.
+"""
+
+import asyncio
+import time
+import pytest
+from datetime import datetime, timedelta, timezone
+from fastapi import Request, Response
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app.config import Settings
+from app.database.db_connection import Database, SessionRouter, create_engine_from_settings, pool_stats
+from app.models import Base, Event
+
+
+def test_settings_from_env(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "12")
+    monkeypatch.setenv("DB_ECHO", "true")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "0")
+    monkeypatch.setenv("DATABASE_URL", "sqlite+aiosqlite:///./events.db")
+    settings = Settings.from_env()
+    assert settings.db_pool_size == 12
+    assert settings.db_echo is True
+    assert settings.db_pool_pre_ping is False
+    assert settings.database_url == "sqlite+aiosqlite:///./events.db"
+
+
+def test_asyncpg_engine_uses_pool_settings():
+    settings = Settings(
+        db_username="u", db_password="p", db_host="localhost", db_port="5432", db_name="events",
+        db_pool_size=7, db_max_overflow=3, db_statement_cache_size=0
+    )
+    engine = create_engine_from_settings(settings)
+    stats = pool_stats(engine)
+    assert stats["pool"] == "InstrumentedQueuePool"
+    assert (stats["size"], stats["max_overflow"], stats["checked_out"]) == (7, 3, 0)
+    assert engine.url.query["prepared_statement_cache_size"] == "0"
+    assert engine.echo is False
+
+
+@pytest.mark.asyncio
+async def test_pool_stats_track_checkouts(tmp_path):
+    settings = Settings(database_url_override=f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}")
+    engine = create_engine_from_settings(settings)
+    hold = asyncio.Event()
+
+    async def use_connection():
+        async with engine.connect():
+            await hold.wait()
+
+    tasks = [asyncio.create_task(use_connection()) for _ in range(2)]
+    await asyncio.sleep(0.1)
+    assert pool_stats(engine)["checked_out"] == 2
+    hold.set()
+    await asyncio.gather(*tasks)
+
+    stats = pool_stats(engine)
+    assert stats["checked_out"] == 0
+    assert stats["idle"] == 2
+    assert stats["checkout_wait_seconds"]["count"] == 2
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_pool_wait_excludes_connect_time(tmp_path):
+    settings = Settings(
+        database_url_override=f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}", db_pool_size=1, db_max_overflow=0
+    )
+    engine = create_engine_from_settings(settings)
+    event.listen(engine.sync_engine, "connect", lambda *args: time.sleep(0.2))
+    pool = engine.sync_engine.pool
+
+    async with engine.connect():
+        pass
+    assert pool.wait_histogram.snapshot()["sum"] < 0.1
+
+    async def hold_briefly():
+        async with engine.connect():
+            await asyncio.sleep(0.2)
+
+    holder = asyncio.create_task(hold_briefly())
+    await asyncio.sleep(0.05)
+    async with engine.connect():
+        pass
+    await holder
+    assert pool.wait_histogram.snapshot()["sum"] >= 0.1
+    await engine.dispose()
+
+
+async def _sqlite_session_maker(path, names):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    maker = async_sessionmaker(engine, expire_on_commit=False)
+    now = datetime.now(timezone.utc)
+    async with maker() as session:
+        for name in names:
+            session.add(Event(
+                name=name, location="Pune", max_capacity=10,
+                start_time=now + timedelta(days=1), end_time=now + timedelta(days=2)
+            ))
+        await session.commit()
+    return engine, maker
+
+
+async def _event_names(session):
+    return (await session.execute(select(Event.name))).scalars().all()
+
+
+def _request(cookie: str = "") -> Request:
+    headers = [(b"cookie", cookie.encode())] if cookie else []
+    return Request({"type": "http", "headers": headers})
+
+
+@pytest.mark.asyncio
+async def test_session_router_reads_from_replica_with_read_your_writes(tmp_path):
+    primary_engine, primary = await _sqlite_session_maker(tmp_path / "primary.db", ["Written", "Replicated"])
+    replica_engine, replica = await _sqlite_session_maker(tmp_path / "replica.db", ["Replicated"])
+    router = SessionRouter(primary, [replica], sticky_seconds=5)
+
+    async with router.read_session(_request()) as session:
+        assert await _event_names(session) == ["Replicated"]
+
+    response = Response()
+    router.mark_write(response)
+    cookie = response.headers["set-cookie"].split(";")[0]
+    async with router.read_session(_request(cookie)) as session:
+        assert sorted(await _event_names(session)) == ["Replicated", "Written"]
+
+    await primary_engine.dispose()
+    await replica_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_replica_read_sessions_check_out_one_connection_each(tmp_path):
+    primary_engine, primary = await _sqlite_session_maker(tmp_path / "primary.db", ["Written"])
+    replica_engine, replica = await _sqlite_session_maker(tmp_path / "replica.db", ["Replicated"])
+    router = SessionRouter(primary, [replica])
+    checkouts = []
+    event.listen(replica_engine.sync_engine, "checkout", lambda *args: checkouts.append(1))
+
+    for _ in range(10):
+        async with router.read_session(_request()) as session:
+            assert await _event_names(session) == ["Replicated"]
+            assert await _event_names(session) == ["Replicated"]
+
+    assert len(checkouts) == 10
+    assert replica_engine.sync_engine.pool.checkedout() == 0
+    await primary_engine.dispose()
+    await replica_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_session_router_falls_back_to_primary_when_replica_is_down(tmp_path):
+    primary_engine, primary = await _sqlite_session_maker(tmp_path / "primary.db", ["Written"])
+    down_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    router = SessionRouter(primary, [async_sessionmaker(down_engine)], retry_seconds=30)
+
+    async with router.read_session(_request()) as session:
+        # The replica is only picked (and found down) when the first query runs.
+        assert router._down_until[0] == 0
+        assert await _event_names(session) == ["Written"]
+    assert router._down_until[0] > 0
+
+    await primary_engine.dispose()
+    await down_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_database_warms_pool_and_sessions_connect_lazily(tmp_path):
+    database = Database()
+    database.start(Settings(database_url_override=f"sqlite+aiosqlite:///{tmp_path / 'warm.db'}", db_pool_size=3))
+    assert await database.warm_up(5) == 3
+    stats = pool_stats(database.engine)
+    assert (stats["checked_out"], stats["idle"]) == (0, 3)
+
+    async with database.session():
+        pass
+    assert pool_stats(database.engine)["checkout_wait_seconds"]["count"] == 3
+
+    async with database.session() as session:
+        await session.execute(select(1))
+        assert pool_stats(database.engine)["checked_out"] == 1
+    assert pool_stats(database.engine)["checkout_wait_seconds"]["count"] == 4
+
+    engine = database.engine
+    await database.stop()
+    assert not database.started
+    assert engine.sync_engine.pool.checkedin() == 0
+
+
+@pytest.mark.asyncio
+async def test_app_lifespan_starts_and_disposes_database(tmp_path, monkeypatch):
+    import app.main
+    from app.database.db_connection import database
+
+    # Importing the app opens nothing.
+    assert not database.started
+    settings = Settings(database_url_override=f"sqlite+aiosqlite:///{tmp_path / 'app.db'}", db_pool_warmup=2)
+    monkeypatch.setattr(app.main, "settings", settings)
+    async with app.main.app.router.lifespan_context(app.main.app):
+        assert database.started
+        assert pool_stats(database.engine)["idle"] == 2
+    assert not database.started
@@ -1,8 +1,16 @@
 # tests/test_events.py
 
+import json
+import uuid
 import pytest
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import List
 import pytz
+from pydantic import TypeAdapter
+
+from app.crud.events import _events_query
+from app.schemas.events import EventRead, dump_event_rows
 from utils.common import get_ist_datetime
 
 
@@ -80,3 +88,452 @@ async def test_event_name_uniqueness(client):
     r2 = await client.post("/events/", json=payload)
     assert r2.status_code == 400
     assert "unique" in r2.text.lower()
+
+
+@pytest.mark.asyncio
+async def test_list_events_cursor_pagination(client):
+    response = await client.get("/events/")
+    all_ids = [e["id"] for e in response.json()]
+    assert len(all_ids) > 2
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        page = await client.get("/events/", params=params)
+        assert page.status_code == 200
+        assert len(page.json()) <= 2
+        seen.extend(e["id"] for e in page.json())
+        cursor = page.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == all_ids
+
+    response = await client.get("/events/?limit=2&cursor=bad")
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_list_events_ndjson_stream(client):
+    expected = (await client.get("/events/?tz=Asia/Kolkata")).json()
+    response = await client.get("/events/?format=ndjson&tz=Asia/Kolkata")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines == expected
+    assert all(e["start_time"].endswith("+05:30") for e in lines)
+
+
+@pytest.mark.asyncio
+async def test_list_events_etag_and_cache_invalidation(client):
+    first = await client.get("/events/?location=Nagpur")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    hits_before = (await client.get("/events/cache-stats")).json()["hits"]
+    revalidated = await client.get("/events/?location=Nagpur", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert (await client.get("/events/cache-stats")).json()["hits"] == hits_before + 1
+
+    r = await client.post("/events/", json={
+        "name": "Nagpur Meetup",
+        "location": "Nagpur",
+        "start_time": get_ist_datetime(48).isoformat(),
+        "end_time": get_ist_datetime(50).isoformat(),
+        "max_capacity": 10
+    })
+    assert r.status_code == 200
+
+    refreshed = await client.get("/events/?location=Nagpur", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.headers["ETag"] != etag
+    assert [e["name"] for e in refreshed.json()] == ["Nagpur Meetup"]
+
+
+def test_fast_event_serializer_matches_pydantic():
+    rows = [
+        SimpleNamespace(
+            id=uuid.uuid4(), name="Café \"Live\"", location="Pune",
+            start_time=datetime(2030, 1, 1, 10, 0, 0), end_time=datetime(2030, 1, 1, 12, 30, 0, 250000),
+            max_capacity=5
+        ),
+        SimpleNamespace(
+            id=uuid.uuid4(), name="Evening", location="Goa",
+            start_time=datetime(2030, 6, 1, 18, 0, tzinfo=timezone.utc),
+            end_time=datetime(2030, 6, 1, 21, 0, tzinfo=timezone.utc),
+            max_capacity=50
+        ),
+    ]
+    for tz in ("UTC", "Asia/Kolkata", "America/St_Johns"):
+        target_tz = pytz.timezone(tz)
+        expected = TypeAdapter(List[EventRead]).dump_json([
+            EventRead(
+                id=r.id, name=r.name, location=r.location, max_capacity=r.max_capacity,
+                start_time=r.start_time.replace(tzinfo=r.start_time.tzinfo or timezone.utc).astimezone(target_tz),
+                end_time=r.end_time.replace(tzinfo=r.end_time.tzinfo or timezone.utc).astimezone(target_tz)
+            )
+            for r in rows
+        ])
+        assert dump_event_rows(rows, target_tz) == expected
+
+
+@pytest.mark.asyncio
+async def test_location_search_uses_trigram_index(client, async_session_maker_fixture):
+    r = await client.post("/events/", json={
+        "name": "Harbour Gala",
+        "location": "Marine Drive, Mumbai",
+        "start_time": get_ist_datetime(72).isoformat(),
+        "end_time": get_ist_datetime(75).isoformat(),
+        "max_capacity": 30
+    })
+    assert r.status_code == 200
+
+    # Substring, case-insensitive, served by the FTS5 trigram table on SQLite
+    response = await client.get("/events/?location=INE dRI")
+    assert [e["name"] for e in response.json()] == ["Harbour Gala"]
+    # Terms shorter than a trigram fall back to a plain ILIKE
+    response = await client.get("/events/?location=mU")
+    assert "Harbour Gala" in [e["name"] for e in response.json()]
+
+    async with async_session_maker_fixture() as session:
+        conn = await session.connection()
+        sql = str(_events_query("Mumbai", include_past=True).compile(dialect=conn.dialect))
+        plan = await conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql, ("%Mumbai%",))
+        details = [row[-1] for row in plan]
+    assert any(d.startswith("SEARCH events USING INDEX") for d in details)
+    assert any("events_location_fts VIRTUAL TABLE INDEX" in d for d in details)
+    assert "SCAN events" not in details
+
+
+@pytest.mark.asyncio
+async def test_import_events_csv_reports_rejected_rows(client):
+    await client.post("/events/", json={
+        "name": "Import Existing", "location": "Pune",
+        "start_time": get_ist_datetime(24 * 400).isoformat(),
+        "end_time": get_ist_datetime(24 * 400 + 2).isoformat(),
+        "max_capacity": 5
+    })
+    start = get_ist_datetime(24 * 400).replace(tzinfo=None)
+    end = start + timedelta(hours=3)
+    body = "\n".join([
+        "name,location,start_time,end_time,max_capacity",
+        f"Import One,Goa,{start.isoformat()},{end.isoformat()},10",
+        f"Import Two,\"Chennai, TN\",{start.isoformat()},{end.isoformat()},20",
+        f"Import Existing,Goa,{start.isoformat()},{end.isoformat()},10",
+        f"Import One,Goa,{start.isoformat()},{end.isoformat()},10",
+        f"Import Backwards,Goa,{end.isoformat()},{start.isoformat()},10",
+        f"Import Past,Goa,2020-01-01T10:00:00,2020-01-01T12:00:00,10",
+        f"Import Empty,Goa,{start.isoformat()},{end.isoformat()},0",
+        "Import Short,Goa",
+    ])
+    response = await client.post(
+        "/events/import", content=body.encode(), headers={"Content-Type": "text/csv"}
+    )
+    assert response.status_code == 200
+    report = response.json()
+    assert report["inserted"] == 2
+    assert report["rejected"] == 6
+    details = {error["line"]: error["detail"] for error in report["errors"]}
+    assert details[4] == "Event name must be unique."
+    assert details[5] == "Event name must be unique."
+    assert details[6] == "Start time must be before end time."
+    assert details[7] == "Start time must be in the future."
+    assert details[8].startswith("max_capacity:")
+    assert details[9] == "Expected 5 columns, got 2."
+
+    listed = await client.get("/events/", params={"location": "Chennai, TN"})
+    imported = [event for event in listed.json() if event["name"] == "Import Two"]
+    # Naive times are IST, as for POST /events.
+    assert imported[0]["start_time"] == (start - timedelta(hours=5, minutes=30)).isoformat() + "Z"
+
+
+@pytest.mark.asyncio
+async def test_import_events_ndjson_in_batches(client, async_session_maker_fixture):
+    from app.crud.events import import_events
+    from utils.records import iter_records
+
+    start = get_ist_datetime(24 * 500)
+    lines = [
+        json.dumps({
+            "name": f"Ndjson Import {i}", "location": "Batchville",
+            "start_time": start.isoformat(), "end_time": (start + timedelta(hours=1)).isoformat(),
+            "max_capacity": 10
+        })
+        for i in range(25)
+    ] + ["not json", "[1, 2]"]
+
+    async def chunks():
+        payload = ("\n".join(lines) + "\n").encode()
+        for offset in range(0, len(payload), 37):
+            yield payload[offset:offset + 37]
+
+    async with async_session_maker_fixture() as session:
+        report = await import_events(
+            session, iter_records(chunks(), "ndjson"), batch_size=10, max_reported_errors=1
+        )
+    assert report.inserted == 25
+    assert report.rejected == 2
+    assert [error.line for error in report.errors] == [26]
+
+    response = await client.post("/events/import?format=ndjson", content=lines[0].encode())
+    assert response.json()["errors"][0]["detail"] == "Event name must be unique."
+    assert (await client.post("/events/import", content=b"x")).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_list_events_with_seat_counts(client):
+    created = await client.post("/events/", json={
+        "name": "Seat Count Show",
+        "location": "Seatsville",
+        "start_time": get_ist_datetime(30).isoformat(),
+        "end_time": get_ist_datetime(32).isoformat(),
+        "max_capacity": 3
+    })
+    event_id = created.json()["id"]
+    assert created.json()["registered_count"] == 0
+    assert created.json()["remaining_capacity"] == 3
+
+    plain = (await client.get("/events/?location=Seatsville")).json()
+    assert "registered_count" not in plain[0]
+
+    first = await client.get("/events/?location=Seatsville&seats=true")
+    assert first.json()[0]["registered_count"] == 0
+    assert first.json()[0]["remaining_capacity"] == 3
+
+    await client.post(f"/events/{event_id}/register", json={"name": "A", "email": "seat-a@example.com"})
+    plain_etag = (await client.get("/events/?location=Seatsville")).headers["ETag"]
+    # A registration refreshes seat listings but leaves plain listings cached.
+    second = await client.get("/events/?location=Seatsville&seats=true")
+    assert second.headers["ETag"] != first.headers["ETag"]
+    assert second.json()[0]["registered_count"] == 1
+    assert second.json()[0]["remaining_capacity"] == 2
+    assert (await client.get("/events/?location=Seatsville")).headers["ETag"] == plain_etag
+
+    streamed = await client.get("/events/?location=Seatsville&seats=true&format=ndjson")
+    assert json.loads(streamed.text.splitlines()[0])["remaining_capacity"] == 2
+
+    missing = str(uuid.uuid4())
+    stats = await client.get("/events/stats", params={"ids": [event_id, missing]})
+    assert stats.status_code == 200
+    assert stats.json() == [
+        {"id": event_id, "max_capacity": 3, "registered_count": 1, "remaining_capacity": 2}
+    ]
+    too_many = await client.get("/events/stats", params={"ids": [missing] * 101})
+    assert too_many.status_code == 422
+
+
+def test_fast_event_serializer_with_seats_matches_pydantic():
+    row = SimpleNamespace(
+        id=uuid.uuid4(), name="Seats", location="Pune",
+        start_time=datetime(2030, 1, 1, 10, 0, tzinfo=timezone.utc),
+        end_time=datetime(2030, 1, 1, 12, 0, tzinfo=timezone.utc),
+        max_capacity=5, registered_count=2, remaining_capacity=3
+    )
+    expected = TypeAdapter(List[EventRead]).dump_json([EventRead.model_validate(row)])
+    assert dump_event_rows([row], timezone.utc, with_seats=True) == expected
+
+
+@pytest.mark.asyncio
+async def test_create_event_idempotency_key_replays_first_response(client):
+    now = datetime.now(timezone.utc)
+    payload = {
+        "name": "Idempotent Event",
+        "location": "Kochi",
+        "start_time": (now + timedelta(days=9)).isoformat(),
+        "end_time": (now + timedelta(days=10)).isoformat(),
+        "max_capacity": 5
+    }
+    headers = {"Idempotency-Key": "create-idempotent-event"}
+    first = await client.post("/events/", json=payload, headers=headers)
+    assert first.status_code == 200
+    assert "idempotent-replayed" not in first.headers
+
+    # A plain retry would fail on the unique name; the keyed retry is replayed.
+    retry = await client.post("/events/", json=payload, headers=headers)
+    assert retry.status_code == 200
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert retry.json() == first.json()
+
+    changed = await client.post("/events/", json={**payload, "max_capacity": 6}, headers=headers)
+    assert changed.status_code == 422
+    assert (await client.post("/events/", json=payload)).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_idempotent_create_keeps_read_your_writes_cookie(client, async_session_maker_fixture):
+    from fastapi import Response
+    from app.database.db_connection import SessionRouter, get_session
+    from app.main import app
+
+    # With a replica configured, writes mark the client sticky to the primary.
+    router = SessionRouter(async_session_maker_fixture, [async_session_maker_fixture], sticky_seconds=5)
+
+    async def primary_session(response: Response):
+        router.mark_write(response)
+        async with async_session_maker_fixture() as session:
+            yield session
+
+    app.dependency_overrides[get_session] = primary_session
+    now = datetime.now(timezone.utc)
+    payload = {
+        "name": "Sticky Idempotent Event",
+        "location": "Thrissur",
+        "start_time": (now + timedelta(days=9)).isoformat(),
+        "end_time": (now + timedelta(days=10)).isoformat(),
+        "max_capacity": 5
+    }
+    headers = {"Idempotency-Key": "sticky-idempotent-event"}
+    first = await client.post("/events/", json=payload, headers=headers)
+    retry = await client.post("/events/", json=payload, headers=headers)
+
+    assert first.status_code == 200 and retry.headers["idempotent-replayed"] == "true"
+    for response in (first, retry):
+        assert response.headers["set-cookie"].startswith(f"{SessionRouter.STICKY_COOKIE}=")
+        assert response.headers["content-type"] == "application/json"
+
+
+@pytest.mark.asyncio
+async def test_past_events_hidden_by_default_and_archived_in_batches(client, async_session_maker_fixture):
+    from app import models
+    from app.crud.events import archive_finished_events
+
+    now = datetime.now(timezone.utc)
+    finished_ids = [uuid.uuid4() for _ in range(3)]
+    async with async_session_maker_fixture() as session:
+        for i, event_id in enumerate(finished_ids):
+            session.add(models.Event(
+                id=event_id, name=f"Finished Fair {i}", location="Archiveville", max_capacity=5,
+                registered_count=1, start_time=now - timedelta(days=10), end_time=now - timedelta(days=9)
+            ))
+        await session.flush()
+        session.add_all([
+            models.Attendee(name="Past Guest", email="past@example.com", event_id=event_id)
+            for event_id in finished_ids
+        ])
+        await session.commit()
+
+    params = {"location": "Archiveville"}
+    assert (await client.get("/events/", params=params)).json() == []
+    past = (await client.get("/events/", params={**params, "include_past": "true"})).json()
+    assert sorted(event["name"] for event in past) == [f"Finished Fair {i}" for i in range(3)]
+
+    async with async_session_maker_fixture() as session:
+        archived = await archive_finished_events(session, now - timedelta(days=1), batch_size=2)
+    assert archived == 3
+
+    assert (await client.get("/events/", params={**params, "include_past": "true"})).json() == []
+    archived_events = (await client.get("/events/", params={**params, "archived": "true"})).json()
+    assert sorted(event["id"] for event in archived_events) == sorted(str(i) for i in finished_ids)
+
+    event_id = finished_ids[0]
+    assert (await client.get(f"/events/{event_id}/attendees")).status_code == 404
+    attendees = (await client.get(f"/events/{event_id}/attendees", params={"archived": "true"})).json()
+    assert [attendee["email"] for attendee in attendees] == ["past@example.com"]
+
+
+@pytest.mark.asyncio
+async def test_event_archived_by_another_process_is_not_listed_from_cache(client, async_session_maker_fixture):
+    from app import models
+    from app.crud.events import archive_finished_events
+    from utils.cache import event_metadata_cache
+
+    now = datetime.now(timezone.utc)
+    event_id = uuid.uuid4()
+    async with async_session_maker_fixture() as session:
+        session.add(models.Event(
+            id=event_id, name="Stale Cache Fair", location="Kollam", max_capacity=5,
+            start_time=now - timedelta(days=10), end_time=now - timedelta(days=9)
+        ))
+        await session.commit()
+
+    assert (await client.get(f"/events/{event_id}/attendees")).json() == []
+    cached = event_metadata_cache.get(event_id)
+    assert cached is not None
+
+    async with async_session_maker_fixture() as session:
+        assert await archive_finished_events(session, now - timedelta(days=1)) == 1
+    # The archival job runs in its own process, so the API worker's entry survives it.
+    event_metadata_cache.set(event_id, cached)
+
+    assert (await client.get(f"/events/{event_id}/attendees")).status_code == 404
+    event_metadata_cache.set(event_id, cached)
+    assert (await client.get(f"/events/{event_id}/attendees/export")).status_code == 404
+
+
+async def _add_events(session_maker, location, start_times, capacity=10):
+    from app import models
+
+    async with session_maker() as session:
+        session.add_all([
+            models.Event(
+                name=f"{location} {i}", location=location, max_capacity=capacity, registered_count=i,
+                start_time=start, end_time=start + timedelta(hours=2)
+            )
+            for i, start in enumerate(start_times)
+        ])
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_event_filter_by_one_sided_date_range(client, async_session_maker_fixture):
+    utc = timezone.utc
+    await _add_events(async_session_maker_fixture, "Satara", [
+        datetime(2030, 1, 10, tzinfo=utc), datetime(2030, 2, 10, tzinfo=utc), datetime(2030, 3, 10, tzinfo=utc)
+    ])
+
+    async def names(**params):
+        response = await client.get("/events/", params={"location": "Satara", **params})
+        assert response.status_code == 200
+        return [event["name"] for event in response.json()]
+
+    assert await names(start_date="2030-02-01T00:00:00") == ["Satara 1", "Satara 2"]
+    assert await names(end_date="2030-02-10T00:00:00") == ["Satara 0", "Satara 1"]
+    assert await names(start_date="2030-02-01T00:00:00", end_date="2030-03-01T00:00:00") == ["Satara 1"]
+
+
+@pytest.mark.asyncio
+async def test_event_calendar_buckets_by_local_day_and_week(client, async_session_maker_fixture):
+    utc = timezone.utc
+    # 2030-03-10 is when New York moves from UTC-5 to UTC-4.
+    await _add_events(async_session_maker_fixture, "Calendarville", [
+        datetime(2030, 3, 10, 4, 30, tzinfo=utc),   # Mar 9, 23:30 in New York
+        datetime(2030, 3, 10, 15, 0, tzinfo=utc),   # Mar 10
+        datetime(2030, 3, 11, 4, 30, tzinfo=utc),   # Mar 11, 00:30 (it would be Mar 10 at UTC-5)
+        datetime(2030, 3, 20, 12, 0, tzinfo=utc),
+    ])
+    params = {"start": "2030-03-01", "end": "2030-04-01", "location": "Calendarville"}
+
+    response = await client.get("/events/calendar", params={**params, "tz": "America/New_York"})
+    assert response.status_code == 200
+    assert [(b["bucket"], b["events"]) for b in response.json()] == [
+        ("2030-03-09", 1), ("2030-03-10", 1), ("2030-03-11", 1), ("2030-03-20", 1)
+    ]
+
+    utc_days = (await client.get("/events/calendar", params=params)).json()
+    assert [(b["bucket"], b["events"]) for b in utc_days] == [("2030-03-10", 2), ("2030-03-11", 1), ("2030-03-20", 1)]
+    assert utc_days[0]["max_capacity"] == 20
+    assert utc_days[0]["registered_count"] == 1 and utc_days[0]["remaining_capacity"] == 19
+
+    weeks = (await client.get("/events/calendar", params={**params, "tz": "America/New_York", "bucket": "week"})).json()
+    assert [(b["bucket"], b["events"]) for b in weeks] == [("2030-03-04", 2), ("2030-03-11", 1), ("2030-03-18", 1)]
+
+    assert (await client.get("/events/calendar", params={**params, "end": "2030-03-01"})).status_code == 400
+    assert (await client.get("/events/calendar", params={**params, "tz": "Mars/Olympus"})).status_code == 400
+
+
+def test_utc_offsets_follow_dst_changes():
+    from zoneinfo import ZoneInfo
+    from app.database.calendar import utc_offsets
+
+    offsets = utc_offsets(
+        ZoneInfo("America/New_York"), datetime(2030, 1, 1, tzinfo=timezone.utc), datetime(2031, 1, 1, tzinfo=timezone.utc)
+    )
+    assert offsets == [
+        (datetime(2030, 1, 1, tzinfo=timezone.utc), -300),
+        (datetime(2030, 3, 10, 7, tzinfo=timezone.utc), -240),
+        (datetime(2030, 11, 3, 6, tzinfo=timezone.utc), -300),
+    ]
+    assert len(utc_offsets(ZoneInfo("Asia/Kolkata"), offsets[0][0], offsets[-1][0])) == 1
@@ -0,0 +1,66 @@
+import logging
+
+import pytest
+
+from app.instrumentation import RequestMetrics, RequestStats, route_template
+from app.main import request_metrics
+
+
+def _sample(text: str, prefix: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(prefix):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{prefix} not in metrics output")
+
+
+@pytest.mark.asyncio
+async def test_metrics_record_route_latency_and_queries(client):
+    listing = 'method="GET",route="/api/v1/events/"'
+    before = request_metrics.routes.get(("GET", "/api/v1/events/"))
+    count_before = before.latency.count if before else 0
+
+    response = await client.get("/events/", params={"location": "metrics-probe"})
+    assert response.status_code == 200
+
+    metrics = await client.get("http://testserver/metrics")
+    assert metrics.status_code == 200
+    assert metrics.headers["content-type"].startswith("text/plain")
+    text = metrics.text
+    assert "# TYPE http_request_duration_seconds histogram" in text
+    assert _sample(text, f"http_request_duration_seconds_count{{{listing}}}") == count_before + 1
+    assert _sample(text, f'http_requests_total{{{listing},status="200"}}') >= 1
+    # The listing ran at least one SELECT on the test engine.
+    assert _sample(text, f"http_request_db_queries_sum{{{listing}}}") >= 1
+    # The scrape itself is in flight while it renders.
+    assert _sample(text, 'http_requests_in_flight{method="GET"}') == 1
+    assert "db_pool_checked_out" in text
+
+
+@pytest.mark.asyncio
+async def test_unknown_paths_share_one_route_label(client):
+    await client.get("/no-such-route/1")
+    await client.get("/no-such-route/2")
+    text = (await client.get("http://testserver/metrics")).text
+    assert "/no-such-route" not in text
+    assert 'route="<unmatched>",status="404"' in text
+
+
+def test_query_warning_threshold(caplog):
+    registry = RequestMetrics(query_warning_threshold=3)
+    busy, quiet = RequestStats(), RequestStats()
+    busy.queries, quiet.queries = 4, 3
+    with caplog.at_level(logging.WARNING, logger="app.instrumentation"):
+        registry.observe("POST", "/api/v1/events/{event_id}/register", 200, 0.01, quiet)
+        registry.observe("POST", "/api/v1/events/{event_id}/register", 200, 0.01, busy)
+    assert len(caplog.records) == 1
+    assert "issued 4 queries" in caplog.records[0].getMessage()
+
+
+def test_route_template_restores_path_parameters():
+    scope = {
+        "route": object(),
+        "path": "/api/v1/events/3f2b7c1e-0000-4000-8000-000000000001/attendees",
+        "path_params": {"event_id": "3f2b7c1e-0000-4000-8000-000000000001"},
+    }
+    assert route_template(scope) == "/api/v1/events/{event_id}/attendees"
+    assert route_template({"path": "/missing"}) == "<unmatched>"
@@ -0,0 +1,110 @@
+import uuid
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect, text
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _alembic_config(url: str) -> Config:
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("sqlalchemy.url", url)
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def test_migrations_match_models(tmp_path):
+    path = tmp_path / "migrated.db"
+    config = _alembic_config(f"sqlite+aiosqlite:///{path}")
+
+    command.upgrade(config, "head")
+    # Raises AutogenerateDiffsDetected if app.models and the migrations disagree.
+    command.check(config)
+
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.connect() as conn:
+        indexes = {index["name"] for index in inspect(conn).get_indexes("events")}
+        assert {"ix_events_start_time_id", "ix_events_end_time"} <= indexes
+        tables = set(inspect(conn).get_table_names())
+        assert {"events_location_fts", "events_archive", "attendees_archive", "seat_holds"} <= tables
+        hold_indexes = {index["name"] for index in inspect(conn).get_indexes("seat_holds")}
+        assert "ix_seat_holds_expires_at" in hold_indexes
+
+    # Rebuilding events for a CHECK constraint must keep the location search triggers.
+    _assert_new_events_searchable(engine, "Bangalore")
+    command.downgrade(config, "0005")
+    _assert_new_events_searchable(engine, "Hubli")
+    engine.dispose()
+
+    command.downgrade(config, "base")
+    command.upgrade(config, "head")
+
+
+def _assert_new_events_searchable(engine, location: str) -> None:
+    event_id = uuid.uuid4().hex
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO events (id, name, location, start_time, end_time, max_capacity) "
+            "VALUES (:id, :name, :location, '2030-01-01 10:00:00', '2030-01-01 12:00:00', 10)"
+        ), {"id": event_id, "name": f"Searchable {location}", "location": location})
+    with engine.connect() as conn:
+        found = conn.execute(text(
+            "SELECT event_id FROM events_location_fts WHERE location LIKE :pattern"
+        ), {"pattern": f"%{location.lower()}%"}).scalars().all()
+    assert found == [event_id]
+
+
+def test_location_search_backfilled_by_migration(tmp_path):
+    path = tmp_path / "legacy.db"
+    config = _alembic_config(f"sqlite+aiosqlite:///{path}")
+    command.upgrade(config, "0002")
+
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO events (id, name, location, start_time, end_time, max_capacity) "
+            "VALUES ('0123456789abcdef0123456789abcdef', 'Legacy', 'Old Town, Mumbai', "
+            "'2030-01-01 10:00:00', '2030-01-01 12:00:00', 10)"
+        ))
+    command.upgrade(config, "head")
+    with engine.connect() as conn:
+        found = conn.execute(text(
+            "SELECT event_id FROM events_location_fts WHERE location LIKE '%mumbai%'"
+        )).scalars().all()
+    engine.dispose()
+    assert found == ["0123456789abcdef0123456789abcdef"]
+
+
+def test_overbooked_events_stop_the_counter_migration(tmp_path):
+    path = tmp_path / "overbooked.db"
+    config = _alembic_config(f"sqlite+aiosqlite:///{path}")
+    command.upgrade(config, "0001")
+
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO events (id, name, location, start_time, end_time, max_capacity) "
+            "VALUES ('00000000000000000000000000000001', 'Oversold', 'Pune', "
+            "'2030-01-01 10:00:00', '2030-01-01 12:00:00', 1)"
+        ))
+        for i in range(2):
+            conn.execute(text(
+                "INSERT INTO attendees (id, name, email, event_id) "
+                f"VALUES ('{i + 2:032x}', 'Guest', 'guest{i}@example.com', '00000000000000000000000000000001')"
+            ))
+
+    with pytest.raises(RuntimeError, match=r'"Oversold" \(2 attendees, max_capacity 1\)'):
+        command.upgrade(config, "head")
+    with engine.connect() as conn:
+        columns = {column["name"] for column in inspect(conn).get_columns("events")}
+    assert "registered_count" not in columns
+
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE events SET max_capacity = 2"))
+    command.upgrade(config, "head")
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT registered_count FROM events")).scalar() == 2
+    engine.dispose()
@@ -0,0 +1,79 @@
+import asyncio
+import json
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+
+from app import profiling
+from app.config import Settings
+from app.database.db_connection import create_engine_from_settings, get_read_session, get_session
+from app.main import app
+from app.profiling import ProfilingMiddleware, RequestProfile
+
+
+@pytest.fixture
+def profiled_app(override_get_session, tmp_path):
+    app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_read_session] = override_get_session
+    yield ProfilingMiddleware(app, directory=str(tmp_path), token="s3cret", interval_ms=0.2)
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_admin_header_profiles_one_request(profiled_app, tmp_path):
+    transport = ASGITransport(app=profiled_app)
+    async with AsyncClient(transport=transport, base_url="http://testserver/api/v1") as client:
+        plain = await client.get("/events/", params={"location": "profile-probe"})
+        wrong = await client.get("/events/", params={"location": "profile-probe"}, headers={"X-Profile": "guess"})
+        profiled = await client.get(
+            "/events/", params={"location": "profile-probe", "seats": "true"}, headers={"X-Profile": "s3cret"}
+        )
+
+    assert "x-profile-id" not in plain.headers and "x-profile-id" not in wrong.headers
+    assert profiled.status_code == 200
+    profile_id = profiled.headers["x-profile-id"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == [f"{profile_id}.collapsed", f"{profile_id}.json"]
+
+    report = json.loads((tmp_path / f"{profile_id}.json").read_text())
+    assert report["route"] == "/api/v1/events/" and report["status"] == 200
+    assert report["statements"] and report["statements"][0]["sql"].startswith("SELECT")
+    assert report["db_ms"] <= report["duration_ms"]
+
+    lines = (tmp_path / f"{profile_id}.collapsed").read_text().splitlines()
+    assert any(line.startswith("GET /api/v1/events/;db;SELECT") for line in lines)
+    for line in lines:
+        stack, weight = line.rsplit(" ", 1)
+        assert int(weight) > 0 and stack.startswith("GET /api/v1/events/;")
+    assert profiled_app.profiled == 1
+
+
+@pytest.mark.asyncio
+async def test_profile_records_pool_checkout_wait(tmp_path):
+    profiling.install_hooks()
+    engine = create_engine_from_settings(Settings(
+        database_url_override=f"sqlite+aiosqlite:///{tmp_path / 'p.db'}", db_pool_size=1, db_max_overflow=0
+    ))
+
+    async def hold_briefly():
+        async with engine.connect():
+            await asyncio.sleep(0.05)
+
+    holder = asyncio.create_task(hold_briefly())
+    await asyncio.sleep(0.01)
+    profile = RequestProfile("GET", "/probe")
+    token = profiling._current_profile.set(profile)
+    try:
+        # Waits for the only pooled connection to come back.
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    finally:
+        profiling._current_profile.reset(token)
+    await holder
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 2"))
+    await engine.dispose()
+
+    assert len(profile.pool_waits) == 1 and profile.pool_waits[0] > 0.01
+    assert [s["sql"] for s in profile.statements] == ["SELECT 1"]
+    assert "GET /probe;db;pool checkout wait" in profile.collapsed("/probe")
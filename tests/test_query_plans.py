@@ -0,0 +1,186 @@
+"""
+Query-plan regression tests: every statement the CRUD layer issues against a
+seeded, analyzed database must be served by an index, not a full table scan.
+
+Runs on SQLite always; set TEST_POSTGRES_URL to a scratch Postgres database
+(its tables are dropped and recreated) to check Postgres plans as well.
+"""
+
+import json
+import os
+import re
+import uuid
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app import models
+from app.crud.attendees import (
+    confirm_seat_hold, expire_seat_holds, hold_seat, list_attendees, next_attendee_cursor, register_attendee,
+    register_attendees_bulk, release_seat_hold, stream_attendee_rows
+)
+from app.crud.events import (
+    archive_finished_events, create_event, event_calendar, event_seat_stats, import_events, list_event_rows, list_events,
+    next_event_cursor, stream_event_rows
+)
+from app.schemas.attendees import AttendeeCreate
+from app.schemas.events import EventCreate
+
+EVENTS = 20_000
+ATTENDEES = 5_000
+SCANNED_TABLES = ("events", "attendees", "seat_holds")
+
+DATABASES = [pytest.param("sqlite", id="sqlite")]
+if os.getenv("TEST_POSTGRES_URL"):
+    DATABASES.append(pytest.param(os.environ["TEST_POSTGRES_URL"], id="postgres"))
+
+
+async def _seed(session_maker):
+    now = datetime.now(timezone.utc)
+    event_ids = [uuid.uuid4() for _ in range(EVENTS)]
+    # Half the attendees register for one hot event, the rest one per event.
+    hot = ATTENDEES // 2
+    attendee_events = [0] * hot + list(range(1, ATTENDEES - hot + 1))
+    async with session_maker() as session:
+        for start in range(0, EVENTS, 5000):
+            await session.execute(insert(models.Event), [
+                {
+                    "id": event_ids[i], "name": f"Seed {i}", "location": f"City {i % 200}",
+                    "start_time": now + timedelta(hours=1 + i), "end_time": now + timedelta(hours=2 + i),
+                    "max_capacity": ATTENDEES * 2,
+                    "registered_count": hot if i == 0 else int(i <= ATTENDEES - hot),
+                }
+                for i in range(start, min(start + 5000, EVENTS))
+            ])
+        await session.execute(insert(models.Attendee), [
+            {"id": uuid.uuid4(), "name": f"Guest {i}", "email": f"guest{i:05d}@example.com",
+             "event_id": event_ids[index]}
+            for i, index in enumerate(attendee_events)
+        ])
+        await session.commit()
+    return event_ids[0]
+
+
+async def _exercise_crud(session_maker, event_id):
+    """Call every CRUD query path once."""
+    now = datetime.now(timezone.utc)
+    async with session_maker() as session:
+        await create_event(session, EventCreate(
+            name="Plan Probe", location="Pune", start_time=now + timedelta(days=2),
+            end_time=now + timedelta(days=3), max_capacity=10
+        ))
+        await list_events(session)
+        await list_events(session, location="City 17")
+        await list_events(session, start_date=now + timedelta(days=10), end_date=now + timedelta(days=11))
+        await list_events(session, start_date=now + timedelta(days=800))
+        await list_events(session, end_date=now + timedelta(days=1))
+        await event_calendar(session, ZoneInfo("America/New_York"), (now + timedelta(days=30)).date(),
+                             (now + timedelta(days=60)).date(), bucket="week")
+        page = await list_event_rows(session, limit=50, with_seats=True)
+        await event_seat_stats(session, [row.id for row in page])
+        await list_event_rows(session, limit=50, cursor=next_event_cursor(page, 50))
+        await list_event_rows(session, limit=50, include_past=True)
+        await list_event_rows(session, limit=50, archived=True)
+        async for _ in stream_event_rows(session, location="City 42"):
+            pass
+        await register_attendee(session, event_id, AttendeeCreate(name="Probe", email="probe@example.com"))
+        await register_attendees_bulk(session, event_id, [
+            AttendeeCreate(name="Probe", email=f"probe{i}@example.com") for i in range(3)
+        ])
+        holds = [
+            await hold_seat(session, event_id, AttendeeCreate(name="Probe", email=f"hold{i}@example.com"), ttl)
+            for i, ttl in enumerate((600, 600, 0))
+        ]
+        await confirm_seat_hold(session, event_id, holds[0].id)
+        await release_seat_hold(session, event_id, holds[1].id)
+        await expire_seat_holds(session, now + timedelta(seconds=1))
+        await list_attendees(session, event_id, page=3, page_size=20)
+        rows = await list_attendees(session, event_id, page_size=20)
+        await list_attendees(session, event_id, page_size=20, cursor=next_attendee_cursor(rows, 20))
+        async for _ in await stream_attendee_rows(session, event_id):
+            pass
+
+        async def records():
+            yield 1, {
+                "name": "Imported Probe", "location": "Goa", "start_time": (now + timedelta(days=5)).isoformat(),
+                "end_time": (now + timedelta(days=6)).isoformat(), "max_capacity": 5
+            }
+        await import_events(session, records())
+
+        finished = [uuid.uuid4() for _ in range(3)]
+        await session.execute(insert(models.Event), [
+            {"id": finished_id, "name": f"Finished {i}", "location": "Agra", "start_time": now - timedelta(days=3),
+             "end_time": now - timedelta(days=2), "max_capacity": 5, "registered_count": 1}
+            for i, finished_id in enumerate(finished)
+        ])
+        await session.execute(insert(models.Attendee), [
+            {"id": uuid.uuid4(), "name": "Past", "email": "past@example.com", "event_id": finished_id}
+            for finished_id in finished
+        ])
+        await session.commit()
+        await archive_finished_events(session, now - timedelta(days=1), batch_size=2)
+        await list_attendees(session, finished[0], page_size=20, archived=True)
+
+
+def _sqlite_full_scans(plan_rows) -> list[str]:
+    # "SCAN events" is a full table scan; "SCAN events USING INDEX ..." walks
+    # an index in order (an ordered listing), which is fine.
+    details = [row[-1] for row in plan_rows]
+    return [d for d in details if re.match(rf"SCAN ({'|'.join(SCANNED_TABLES)})$", d)]
+
+
+def _postgres_full_scans(plan) -> list[str]:
+    scans = []
+
+    def walk(node):
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in SCANNED_TABLES:
+            scans.append(f"Seq Scan on {node['Relation Name']}")
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan[0]["Plan"])
+    return scans
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("database", DATABASES)
+async def test_crud_queries_avoid_full_table_scans(database, tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'plans.db'}" if database == "sqlite" else database
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.drop_all)
+        await conn.run_sync(models.Base.metadata.create_all)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    event_id = await _seed(session_maker)
+    async with engine.connect() as conn:
+        await conn.exec_driver_sql("ANALYZE")
+        await conn.commit()
+
+    statements = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            statements.append((statement, parameters))
+
+    await _exercise_crud(session_maker, event_id)
+    event.remove(engine.sync_engine, "before_cursor_execute", capture)
+    assert len(statements) >= 10
+
+    failures = []
+    async with engine.connect() as conn:
+        for statement, parameters in statements:
+            if engine.dialect.name == "sqlite":
+                plan = (await conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)).all()
+                scans = _sqlite_full_scans(plan)
+            else:
+                plan = (await conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters)).scalar()
+                scans = _postgres_full_scans(json.loads(plan) if isinstance(plan, str) else plan)
+            if scans:
+                failures.append(f"{scans}: {' '.join(statement.split())}")
+        await conn.rollback()
+    await engine.dispose()
+    assert not failures, "\n".join(failures)
@@ -0,0 +1,70 @@
+"""
+Test module for the host-wide shared-memory rate-limit storage.
+"""
+
+import multiprocessing
+from types import SimpleNamespace
+
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter
+
+from utils import rate_limit
+from utils.rate_limit import SharedMemoryStorage
+
+
+def _hammer(path, key, times):
+    storage = SharedMemoryStorage(f"shm://{path}")
+    for _ in range(times):
+        storage.incr(key, 60)
+
+
+def test_counts_and_expiry(tmp_path, monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(rate_limit, "time", SimpleNamespace(time=lambda: clock.now))
+    storage = storage_from_string(f"shm://{tmp_path / 'rl'}")
+    assert isinstance(storage, SharedMemoryStorage)
+
+    assert storage.incr("a", 60) == 1
+    assert storage.incr("a", 60, amount=2) == 3
+    assert storage.get("a") == 3
+    assert storage.get_expiry("a") == 1060.0
+    assert storage.get("b") == 0
+
+    clock.now = 1060.0
+    assert storage.get("a") == 0
+    assert storage.incr("a", 60) == 1
+
+    storage.clear("a")
+    assert storage.get("a") == 0
+
+
+def test_colliding_keys_stay_separate(tmp_path):
+    storage = SharedMemoryStorage(f"shm://{tmp_path / 'rl'}", slots=4)
+    for i in range(4):
+        storage.incr(f"key{i}", 60, amount=i + 1)
+    assert [storage.get(f"key{i}") for i in range(4)] == [1, 2, 3, 4]
+    storage.clear("key1")
+    assert [storage.get(f"key{i}") for i in range(4)] == [1, 0, 3, 4]
+
+
+def test_limit_is_shared_between_workers(tmp_path):
+    path = tmp_path / "rl"
+    workers = [FixedWindowRateLimiter(SharedMemoryStorage(f"shm://{path}")) for _ in range(2)]
+    limit = parse("10/minute")
+
+    results = [workers[i % 2].hit(limit, "127.0.0.1", "/register") for i in range(11)]
+    assert results == [True] * 10 + [False]
+
+
+def test_increments_are_atomic_across_processes(tmp_path):
+    path = tmp_path / "rl"
+    ctx = multiprocessing.get_context("spawn")
+    processes = [ctx.Process(target=_hammer, args=(path, "hot", 500)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=60)
+        assert process.exitcode == 0
+
+    assert SharedMemoryStorage(f"shm://{path}").get("hot") == 2000
@@ -0,0 +1,106 @@
+"""
+Test module for the live seat-count feed and its Server-Sent Events stream.
+"""
+
+import asyncio
+import datetime
+import json
+import uuid
+
+import pytest
+
+from app.main import app
+from utils.seat_feed import SeatFeed, seat_feed
+
+
+@pytest.mark.asyncio
+async def test_seat_feed_coalesces_bursts_and_fans_out():
+    feed = SeatFeed(coalesce_ms=20)
+    hot, quiet = uuid.uuid4(), uuid.uuid4()
+    watchers = [feed.subscribe([hot]) for _ in range(3)]
+    both = feed.subscribe([hot, quiet])
+
+    for count in range(1, 51):
+        feed.publish(hot, 100, count)
+    feed.publish(uuid.uuid4(), 10, 1)  # nobody subscribed: dropped
+    assert feed.published == 50
+
+    for subscription in watchers:
+        assert await subscription.next(timeout=1) == [
+            {"id": str(hot), "max_capacity": 100, "registered_count": 50, "remaining_capacity": 50}
+        ]
+    assert [update["registered_count"] for update in await both.next(timeout=1)] == [50]
+    assert feed.delivered == 4
+
+    # An unchanged count (e.g. from the poller) is not sent again.
+    feed.publish(hot, 100, 50)
+    assert await both.next(timeout=0.1) == []
+
+    for subscription in watchers + [both]:
+        feed.unsubscribe(subscription)
+    assert feed.stats()["events"] == feed.stats()["subscriptions"] == 0
+
+
+async def _open_stream(path: str, query: str):
+    """Drive the ASGI app directly, since httpx buffers whole responses."""
+    chunks: asyncio.Queue = asyncio.Queue()
+    disconnect = asyncio.Event()
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": query.encode(), "root_path": "",
+        "headers": [(b"host", b"testserver")], "client": ("127.0.0.1", 1234), "server": ("testserver", 80),
+    }
+
+    async def receive():
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            await chunks.put(message["body"])
+
+    task = asyncio.create_task(app(scope, receive, send))
+    return chunks, disconnect, task
+
+
+def _message(chunk: bytes) -> dict:
+    event, data = chunk.decode().strip().split("\n")
+    assert event == "event: seats"
+    return json.loads(data.removeprefix("data: "))
+
+
+@pytest.mark.asyncio
+async def test_seat_stream_sends_snapshot_then_registrations(client):
+    from utils.common import limiter
+
+    limiter.reset()
+    now = datetime.datetime.now(datetime.timezone.utc)
+    created = await client.post("/events/", json={
+        "name": "Live Seats Launch",
+        "location": "Streamville",
+        "start_time": (now + datetime.timedelta(days=4)).isoformat(),
+        "end_time": (now + datetime.timedelta(days=5)).isoformat(),
+        "max_capacity": 3
+    })
+    event_id = created.json()["id"]
+
+    chunks, disconnect, task = await _open_stream(
+        "/api/v1/events/stats/stream", f"ids={event_id}&ids={uuid.uuid4()}"
+    )
+    snapshot = _message(await asyncio.wait_for(chunks.get(), 5))
+    assert snapshot == {"id": event_id, "max_capacity": 3, "registered_count": 0, "remaining_capacity": 3}
+    assert seat_feed.stats()["subscriptions"] == 1
+
+    for i in range(2):
+        response = await client.post(
+            f"/events/{event_id}/register", json={"name": "Fan", "email": f"fan{i}@example.com"}
+        )
+        assert response.status_code == 200
+    # Both registrations usually land in one coalescing window.
+    update = _message(await asyncio.wait_for(chunks.get(), 5))
+    while update["remaining_capacity"] != 1:
+        update = _message(await asyncio.wait_for(chunks.get(), 5))
+
+    disconnect.set()
+    await asyncio.wait_for(task, 5)
+    assert seat_feed.stats()["subscriptions"] == 0
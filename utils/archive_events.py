@@ -0,0 +1,41 @@
+"""
+Command-line runner for the archival job: moves events that ended more than
+--older-than-days ago, with their attendees, into the archive tables.
+Safe to run from cron on several hosts at once.
+
+The job clears only its own process's caches. API workers keep serving
+cached GET /events listings for up to 30 seconds after a run. They also
+keep an archived event's cached metadata for up to 5 minutes, but the
+attendee listing and export re-check the events table instead of answering
+with an empty list.
+
+    python -m utils.archive_events
+    python -m utils.archive_events --older-than-days 30 --batch-size 1000
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from app.config import get_settings
+from app.crud.events import archive_finished_events
+from app.database.db_connection import database
+
+
+async def run(older_than_days: float, batch_size: int) -> None:
+    finished_before = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    database.start(get_settings())
+    try:
+        async with database.session() as session:
+            archived = await archive_finished_events(session, finished_before, batch_size=batch_size)
+    finally:
+        await database.stop()
+    print(f"archived {archived} events that ended before {finished_before.isoformat()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move finished events and their attendees to the archive tables.")
+    parser.add_argument("--older-than-days", type=float, default=7.0)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(run(args.older_than_days, args.batch_size))
@@ -0,0 +1,172 @@
+"""
+Bounded in-process caches with LRU eviction, TTL expiry and hit/miss counters.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    LRU cache holding at most maxsize entries, each expiring ttl seconds
+    after it was stored. Not shared between worker processes.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if absent or expired."""
+        entry = self._entries.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store value under key, evicting the least recently used entry when full."""
+        self._entries[key] = (self._clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        """Drop the entry for key, if any."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """Return size and hit/miss counters for tuning."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class VersionedCache(TTLCache):
+    """
+    TTLCache whose keys are scoped by a version counter.
+    invalidate() bumps the version in O(1); entries from older versions are
+    never read again and age out through LRU eviction or their TTL.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        return super().get((self.version, key), default)
+
+    def set(self, key: Hashable, value: Any) -> None:
+        super().set((self.version, key), value)
+
+    def invalidate(self) -> None:
+        """Make every cached entry stale."""
+        self.version += 1
+
+    def stats(self) -> dict:
+        return {**super().stats(), "version": self.version}
+
+
+class EventMetadataCache:
+    """
+    Near-immutable event metadata (start_time, max_capacity) by event id,
+    so attendee routes can skip the event lookup. Ids that do not exist are
+    cached as well, in a separate, shorter-lived LRU, so a flood of unknown
+    ids is answered without queries and cannot evict real events.
+    saved_round_trips counts the queries callers skipped thanks to a hit.
+    """
+
+    MISSING = object()
+
+    def __init__(
+        self,
+        maxsize: int = 10000,
+        ttl: float = 300.0,
+        missing_maxsize: int = 10000,
+        missing_ttl: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self._found = TTLCache(maxsize=maxsize, ttl=ttl, clock=clock)
+        self._missing = TTLCache(maxsize=missing_maxsize, ttl=missing_ttl, clock=clock)
+        self.hits = 0
+        self.misses = 0
+        self.saved_round_trips = 0
+
+    def get(self, event_id: Hashable) -> Any:
+        """Return the cached metadata, MISSING for a known-unknown id, or None."""
+        value = self._found.get(event_id)
+        if value is None and self._missing.get(event_id) is not None:
+            value = self.MISSING
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, event_id: Hashable, metadata: Any) -> None:
+        self._missing.pop(event_id)
+        self._found.set(event_id, metadata)
+
+    def set_missing(self, event_id: Hashable) -> None:
+        self._found.pop(event_id)
+        self._missing.set(event_id, True)
+
+    def invalidate(self, event_id: Hashable) -> None:
+        """Forget event_id, after it was created, changed or archived."""
+        self._found.pop(event_id)
+        self._missing.pop(event_id)
+
+    def clear(self) -> None:
+        """Forget every event, e.g. after the tables were reloaded."""
+        self._found.clear()
+        self._missing.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._found),
+            "missing_size": len(self._missing),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "saved_round_trips": self.saved_round_trips,
+            "evictions": self._found.evictions + self._missing.evictions,
+        }
+
+
+# Serialized GET /events responses, invalidated by create_event.
+event_list_cache = VersionedCache(maxsize=1024, ttl=30.0)
+# GET /events?seats=true responses, also invalidated by every registration.
+event_seats_cache = VersionedCache(maxsize=1024, ttl=30.0)
+# Event start_time / max_capacity (and unknown ids) for the attendee routes.
+event_metadata_cache = EventMetadataCache(maxsize=10000, ttl=300.0, missing_ttl=30.0)
@@ -1,12 +1,19 @@
 """
-Common utilities for timezone conversion and rate limiting.
+Common utilities for timezone conversion, pagination cursors and rate limiting.
 """
 
+import base64
+import json
 import pytz
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timezone, timedelta, tzinfo
+from functools import lru_cache
+from zoneinfo import ZoneInfo
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
+from app.config import get_settings
+import utils.rate_limit  # noqa: F401 - registers the shm:// storage scheme
+
 IST = pytz.timezone('Asia/Kolkata')
 
 def ist_to_utc(ist_time: datetime) -> datetime:
@@ -17,10 +24,59 @@ def ist_to_utc(ist_time: datetime) -> datetime:
         ist_time = IST.localize(ist_time)
     return ist_time.astimezone(timezone.utc)
 
+@lru_cache(maxsize=128)
+def get_timezone(name: str) -> tzinfo:
+    """
+    Memoized lookup for per-request timezone parameters.
+    Names are resolved through pytz (which also accepts any letter case) and
+    returned as zoneinfo objects, whose C conversions are several times
+    faster than pytz when converting many rows. zoneinfo reads the system
+    tz database, or the tzdata package where there is none.
+    Raises pytz.UnknownTimeZoneError for unknown names.
+    """
+    return ZoneInfo(pytz.timezone(name).zone)
+
+def format_datetime(value: datetime, target_tz: tzinfo) -> str:
+    """
+    Render a stored UTC datetime in target_tz as ISO 8601, byte-for-byte as
+    Pydantic would serialize it (naive values are UTC, UTC offsets become "Z").
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    text = value.astimezone(target_tz).isoformat()
+    if text.endswith("+00:00"):
+        text = text[:-6] + "Z"
+    return text
+
 def get_ist_datetime(offset_hours: int):
     """
     Utility for testing: get current IST time with an offset.
     """
     return datetime.now(IST) + timedelta(hours=offset_hours)
 
-limiter = Limiter(key_func=get_remote_address)
+def encode_cursor(values: list) -> str:
+    """
+    Encode the sort key of the last row on a page as an opaque, URL-safe cursor.
+    """
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> list:
+    """
+    Decode a cursor produced by encode_cursor.
+    Raises ValueError if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor.") from exc
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor.")
+    return values
+
+limiter = Limiter(
+    key_func=get_remote_address,
+    storage_uri=get_settings().rate_limit_storage_uri,
+    enabled=get_settings().rate_limit_enabled
+)
@@ -0,0 +1,163 @@
+"""
+Idempotency-Key support for POST routes that clients retry on timeouts.
+
+The first response for a key is kept in a bounded TTL store and replayed
+for retries without running the route again. A retry that arrives while
+the first request is still running waits for its outcome instead of
+repeating it. Keys are scoped to the request path and bound to a hash of
+the request body; reusing a key for a different body is rejected.
+
+The store is per worker process, like the response caches: a retry that
+lands on another worker runs normally and is then caught by the route's
+own uniqueness checks.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Hashable, Optional
+
+from fastapi import HTTPException, Response
+from pydantic import BaseModel
+
+from app.config import get_settings
+from utils.cache import TTLCache
+
+MAX_KEY_LENGTH = 255
+REPLAY_HEADER = "Idempotent-Replayed"
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    """A response as sent to the first request for a key."""
+    status_code: int
+    body: bytes
+    fingerprint: str
+    headers: dict = field(default_factory=dict)
+
+    def to_response(self, replayed: bool = False) -> Response:
+        headers = {**self.headers, REPLAY_HEADER: "true"} if replayed else self.headers
+        return Response(
+            content=self.body, status_code=self.status_code, media_type="application/json", headers=headers
+        )
+
+
+class IdempotencyStore:
+    """
+    Stored responses by (scope, key), at most maxsize of them for ttl
+    seconds each, plus the requests currently running for a key.
+    Only 2xx and 4xx responses are stored; after a 5xx or an unexpected
+    error the next attempt runs the route again.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 86400.0, clock: Callable[[], float] = time.monotonic):
+        self._responses = TTLCache(maxsize=maxsize, ttl=ttl, clock=clock)
+        self._in_flight: dict[Hashable, tuple[str, asyncio.Future]] = {}
+        self.replays = 0
+        self.waits = 0
+
+    async def run(
+        self,
+        key: Hashable,
+        fingerprint: str,
+        handler: Callable[[], Awaitable[StoredResponse]]
+    ) -> tuple[StoredResponse, bool]:
+        """
+        Return (response, replayed): the stored response for key, the
+        outcome of the request already running for it, or that of handler().
+        Raises HTTPException 422 when key was used with another fingerprint.
+        """
+        while True:
+            stored = self._responses.get(key)
+            if stored is not None:
+                self._check_fingerprint(stored.fingerprint, fingerprint)
+                self.replays += 1
+                return stored, True
+            running = self._in_flight.get(key)
+            if running is None:
+                break
+            self._check_fingerprint(running[0], fingerprint)
+            self.waits += 1
+            # shield: a waiter that disconnects must not cancel the first request.
+            outcome = await asyncio.shield(running[1])
+            if outcome is not None:
+                self.replays += 1
+                return outcome, True
+            # The first request ended without a storable response; try again.
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = (fingerprint, future)
+        stored = None
+        try:
+            response = await handler()
+            if response.status_code < 500:
+                stored = response
+                self._responses.set(key, stored)
+            return response, False
+        finally:
+            del self._in_flight[key]
+            future.set_result(stored)
+
+    @staticmethod
+    def _check_fingerprint(expected: str, fingerprint: str) -> None:
+        if expected != fingerprint:
+            raise HTTPException(
+                status_code=422, detail="Idempotency-Key was already used with a different request."
+            )
+
+    def stats(self) -> dict:
+        return {**self._responses.stats(), "in_flight": len(self._in_flight), "replays": self.replays,
+                "waits": self.waits}
+
+
+async def idempotent(
+    store: IdempotencyStore,
+    key: Optional[str],
+    scope: str,
+    payload: BaseModel,
+    call: Callable[[], Awaitable],
+    response_model: type[BaseModel],
+    response: Optional[Response] = None
+):
+    """
+    Run call() for a POST route, honouring an Idempotency-Key header value.
+    Without a key the route's result is returned unchanged. With one, the
+    result (or HTTPException) is serialized through response_model, stored
+    and returned as a Response; replays carry an Idempotent-Replayed header.
+    Pass the route's injected response so headers and cookies set on it by
+    dependencies (such as the read-your-writes cookie) are sent as well.
+    """
+    if key is None:
+        return await call()
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=400, detail=f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters."
+        )
+    fingerprint = hashlib.blake2b(payload.model_dump_json().encode(), digest_size=16).hexdigest()
+
+    async def handler() -> StoredResponse:
+        try:
+            result = await call()
+        except HTTPException as exc:
+            return StoredResponse(
+                exc.status_code, json.dumps({"detail": exc.detail}).encode(), fingerprint, dict(exc.headers or {})
+            )
+        body = response_model.model_validate(result).model_dump_json().encode()
+        return StoredResponse(200, body, fingerprint)
+
+    stored, replayed = await store.run((scope, key), fingerprint, handler)
+    result = stored.to_response(replayed)
+    if response is not None:
+        result.raw_headers.extend(
+            (name, value) for name, value in response.raw_headers
+            if name not in (b"content-length", b"content-type")
+        )
+    return result
+
+
+# Shared by the POST /events and POST /{event_id}/register routes.
+idempotency_store = IdempotencyStore(
+    maxsize=get_settings().idempotency_max_keys, ttl=get_settings().idempotency_ttl_seconds
+)
@@ -0,0 +1,68 @@
+"""
+Lightweight in-process metric primitives.
+"""
+
+from bisect import bisect_left
+from typing import Sequence
+
+# Seconds; covers sub-millisecond pool checkouts up to multi-second stalls.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Fixed-bucket histogram of observed values (Prometheus-style upper bounds)."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record one observation."""
+        self._counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """Return (upper bound, observations <= bound) pairs, ending with +Inf."""
+        pairs = []
+        running = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self._counts):
+            running += count
+            pairs.append((bound, running))
+        return pairs
+
+    def snapshot(self) -> dict:
+        """Return a JSON-friendly view of the histogram."""
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": {
+                ("+Inf" if bound == float("inf") else str(bound)): count
+                for bound, count in self.cumulative()
+            },
+        }
+
+
+def format_labels(labels: dict) -> str:
+    """Render a Prometheus label set, e.g. {method="GET",route="/x"}."""
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def format_histogram(name: str, histogram: Histogram, labels: dict = None) -> list[str]:
+    """Render histogram as Prometheus text-format sample lines."""
+    labels = labels or {}
+    lines = []
+    for bound, count in histogram.cumulative():
+        le = "+Inf" if bound == float("inf") else repr(bound)
+        lines.append(f"{name}_bucket{format_labels({**labels, 'le': le})} {count}")
+    lines.append(f"{name}_sum{format_labels(labels)} {histogram.sum}")
+    lines.append(f"{name}_count{format_labels(labels)} {histogram.count}")
+    return lines
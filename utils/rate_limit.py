@@ -0,0 +1,210 @@
+"""
+Host-wide rate-limit storage shared by every worker process.
+
+slowapi's default in-memory storage keeps separate counters per process, so
+under `uvicorn --workers N` the effective limit is N times the configured
+one. SharedMemoryStorage keeps fixed-window counters in a memory-mapped
+file (on /dev/shm where available) guarded by an flock, so every worker on
+the host sees the same counts. Each operation hashes the key and probes a
+bounded number of slots: O(1) with one lock/unlock syscall pair.
+
+Select it with a storage URI such as ``shm:///dev/shm/event-api-ratelimit``.
+"""
+
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+
+from limits.storage import Storage
+
+_HEADER = struct.Struct("<8sQ")
+_SLOT = struct.Struct("<QdI4x")
+_MAGIC = b"EVRLv001"
+_EMPTY = 0
+_MAX_PROBES = 32
+
+
+def default_storage_path() -> str:
+    """Prefer tmpfs so counters never touch disk."""
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return str(Path(base) / "event-api-ratelimit")
+
+
+class SharedMemoryStorage(Storage):
+    """
+    limits storage backend keeping counters in a shared memory-mapped file.
+    Supports the fixed-window strategy used by slowapi by default.
+    """
+
+    STORAGE_SCHEME = ["shm"]
+
+    def __init__(self, uri: str = None, wrap_exceptions: bool = False, slots: int = 65536, **options):
+        path = uri.split("://", 1)[1] if uri and "://" in uri else ""
+        self.path = path or default_storage_path()
+        self.slots = int(slots)
+        self._size = _HEADER.size + self.slots * _SLOT.size
+        self._thread_lock = threading.Lock()
+        self._pid = None
+        self._open()
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    def _open(self) -> None:
+        """
+        Open and map the file for this process. flock is per open file, so a
+        forked worker must not reuse its parent's descriptor.
+        """
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._pid = os.getpid()
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size < self._size:
+                os.ftruncate(self._fd, self._size)
+            self._map = mmap.mmap(self._fd, self._size)
+            magic, slots_in_file = _HEADER.unpack_from(self._map, 0)
+            if magic != _MAGIC or slots_in_file != self.slots:
+                self._map[:] = bytes(self._size)
+                _HEADER.pack_into(self._map, 0, _MAGIC, self.slots)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    @property
+    def base_exceptions(self):
+        return OSError
+
+    def _acquire(self) -> None:
+        """Exclude other threads of this process, then other processes."""
+        self._thread_lock.acquire()
+        try:
+            if self._pid != os.getpid():
+                self._open()
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        except BaseException:
+            self._thread_lock.release()
+            raise
+
+    def _release(self) -> None:
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._thread_lock.release()
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _hash(key: str) -> int:
+        # Stable across processes (unlike hash()); 0 marks an empty slot.
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+
+    def _offset(self, index: int) -> int:
+        return _HEADER.size + index * _SLOT.size
+
+    def _find(self, key_hash: int, now: float, claim: bool):
+        """
+        Return (offset, count, expiry) of the live slot for key_hash.
+        With claim, an empty or expired slot (or else the soonest to expire)
+        within the probe window is returned for reuse, with count 0.
+        """
+        start = key_hash % self.slots
+        reusable = None
+        soonest = None
+        for probe in range(_MAX_PROBES):
+            offset = self._offset((start + probe) % self.slots)
+            slot_hash, expiry, count = _SLOT.unpack_from(self._map, offset)
+            if slot_hash == key_hash and expiry > now:
+                return offset, count, expiry
+            if slot_hash == _EMPTY:
+                if reusable is None:
+                    reusable = offset
+                break
+            if expiry <= now:
+                if reusable is None:
+                    reusable = offset
+            elif soonest is None or expiry < soonest[1]:
+                soonest = (offset, expiry)
+        if not claim:
+            return None, 0, 0.0
+        return (reusable if reusable is not None else soonest[0]), 0, 0.0
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        key_hash = self._hash(key)
+        self._acquire()
+        try:
+            now = time.time()
+            offset, count, expires_at = self._find(key_hash, now, claim=True)
+            if count == 0:
+                expires_at = now + expiry
+            count += amount
+            _SLOT.pack_into(self._map, offset, key_hash, expires_at, count)
+        finally:
+            self._release()
+        return count
+
+    def get(self, key: str) -> int:
+        key_hash = self._hash(key)
+        self._acquire()
+        try:
+            return self._find(key_hash, time.time(), claim=False)[1]
+        finally:
+            self._release()
+
+    def get_expiry(self, key: str) -> float:
+        key_hash = self._hash(key)
+        self._acquire()
+        try:
+            offset, _, expires_at = self._find(key_hash, time.time(), claim=False)
+        finally:
+            self._release()
+        return expires_at if offset is not None else time.time()
+
+    def check(self) -> bool:
+        return not self._map.closed
+
+    def reset(self) -> int:
+        self._acquire()
+        try:
+            now = time.time()
+            live = sum(
+                1 for index in range(self.slots)
+                if _SLOT.unpack_from(self._map, self._offset(index))[1] > now
+            )
+            self._map[_HEADER.size:] = bytes(self._size - _HEADER.size)
+        finally:
+            self._release()
+        return live
+
+    def clear(self, key: str) -> None:
+        key_hash = self._hash(key)
+        self._acquire()
+        try:
+            offset, _, _ = self._find(key_hash, time.time(), claim=False)
+            if offset is not None:
+                # Expire rather than empty the slot, so later keys in the probe chain stay reachable.
+                _SLOT.pack_into(self._map, offset, key_hash, 0.0, 0)
+        finally:
+            self._release()
+
+
+
+class ConcurrencyCap:
+    """
+    Non-blocking cap on how many long-running requests (such as exports) a
+    worker serves at once. Callers that cannot acquire a slot should be
+    turned away rather than queued.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+
+    def try_acquire(self) -> bool:
+        if self.active >= self.limit:
+            return False
+        self.active += 1
+        return True
+
+    def release(self) -> None:
+        self.active -= 1
@@ -0,0 +1,76 @@
+"""
+Incremental CSV / NDJSON record parsing for streamed uploads and files.
+
+Input arrives as an async iterable of byte chunks (an HTTP request body or
+a file read piece by piece) and is decoded line by line, so only the
+current line is ever held in memory. CSV files need a header row; quoted
+fields must not contain line breaks.
+"""
+
+import codecs
+import csv
+import json
+from typing import AsyncIterable, AsyncIterator, BinaryIO, Literal
+
+RecordFormat = Literal["csv", "ndjson"]
+
+
+class RecordError(ValueError):
+    """A line that could not be parsed into a record."""
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """Decode UTF-8 byte chunks and yield complete lines without their line endings."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.removesuffix("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.removesuffix("\r")
+
+
+async def iter_records(
+    chunks: AsyncIterable[bytes],
+    record_format: RecordFormat
+) -> AsyncIterator[tuple[int, dict | RecordError]]:
+    """
+    Yield (line number, record) for every non-blank data line. A line that
+    cannot be parsed yields a RecordError in place of the record, so callers
+    can report it and carry on.
+    """
+    header = None
+    line_number = 0
+    async for line in iter_lines(chunks):
+        line_number += 1
+        if not line.strip():
+            continue
+        if record_format == "ndjson":
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                yield line_number, RecordError(f"Invalid JSON: {exc.msg}.")
+                continue
+            if not isinstance(record, dict):
+                yield line_number, RecordError("Each line must be a JSON object.")
+                continue
+            yield line_number, record
+            continue
+
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield line_number, RecordError(f"Expected {len(header)} columns, got {len(values)}.")
+            continue
+        yield line_number, dict(zip(header, values))
+
+
+async def iter_file_chunks(file: BinaryIO, chunk_size: int = 1 << 16) -> AsyncIterator[bytes]:
+    """Adapt a binary file object to the async chunk iterable iter_records reads."""
+    while chunk := file.read(chunk_size):
+        yield chunk
@@ -0,0 +1,183 @@
+"""
+In-process publish/subscribe feed of event seat counts.
+
+Registrations and seat holds publish an event's new seat counts after
+they commit.
+Updates are coalesced for a short window, so a burst of registrations on
+a hot event becomes one update carrying the latest count, and each update
+is handed to every subscriber of that event without touching the database.
+A subscriber holds only the latest update per event, not a queue, so slow
+or idle subscribers cost a few small objects each.
+
+Counts committed by other worker processes are picked up by a poller that
+reads the seat counts of every subscribed event in one query per interval,
+however many subscribers there are.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Iterable, Optional, Sequence
+from uuid import UUID
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """One subscriber's interest in a set of events and its undelivered updates."""
+
+    def __init__(self, event_ids: Iterable[UUID]):
+        self.event_ids = frozenset(event_ids)
+        self._latest: dict[UUID, dict] = {}
+        self._ready = asyncio.Event()
+
+    def push(self, event_id: UUID, update: dict) -> None:
+        # Overwrite rather than queue: only the latest count matters.
+        self._latest[event_id] = update
+        self._ready.set()
+
+    async def next(self, timeout: Optional[float] = None) -> list[dict]:
+        """Wait up to timeout seconds for updates; returns [] if none arrived."""
+        if not self._latest:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        updates = list(self._latest.values())
+        self._latest.clear()
+        self._ready.clear()
+        return updates
+
+
+class SeatFeed:
+    """Fan seat-count updates out to the subscribers of each event."""
+
+    def __init__(self, coalesce_ms: float = 100.0):
+        self.window = coalesce_ms / 1000
+        self._subscribers: dict[UUID, set[Subscription]] = {}
+        self._pending: dict[UUID, dict] = {}
+        # Last update delivered per subscribed event: serves snapshots to
+        # new subscribers and drops polled counts that did not change.
+        self._last: dict[UUID, dict] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._poller: Optional[asyncio.Task] = None
+        self.subscriptions = 0
+        self.published = 0
+        self.delivered = 0
+
+    def subscribe(self, event_ids: Iterable[UUID]) -> Subscription:
+        subscription = Subscription(event_ids)
+        for event_id in subscription.event_ids:
+            self._subscribers.setdefault(event_id, set()).add(subscription)
+        self.subscriptions += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.subscriptions -= 1
+        for event_id in subscription.event_ids:
+            subscribers = self._subscribers.get(event_id)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[event_id]
+                self._last.pop(event_id, None)
+
+    def snapshot(self, event_ids: Iterable[UUID]) -> tuple[list[dict], list[UUID]]:
+        """Split event_ids into (last known updates, ids with no known count)."""
+        known, missing = [], []
+        for event_id in event_ids:
+            update = self._last.get(event_id)
+            if update is None:
+                missing.append(event_id)
+            else:
+                known.append(update)
+        return known, missing
+
+    def remember(self, event_id: UUID, max_capacity: int, registered_count: int, held_count: int = 0) -> dict:
+        """Record a count read from the database for a subscribed event, without publishing it."""
+        update = _seat_update(event_id, max_capacity, registered_count, held_count)
+        if event_id in self._subscribers:
+            self._last.setdefault(event_id, update)
+        return update
+
+    def publish(self, event_id: UUID, max_capacity: int, registered_count: int, held_count: int = 0) -> None:
+        """Queue the event's current seat count for its subscribers. O(1) when it has none."""
+        if event_id not in self._subscribers:
+            return
+        self.published += 1
+        self._pending[event_id] = _seat_update(event_id, max_capacity, registered_count, held_count)
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.window, self._flush)
+
+    def _flush(self) -> None:
+        self._flush_handle = None
+        pending, self._pending = self._pending, {}
+        for event_id, update in pending.items():
+            subscribers = self._subscribers.get(event_id)
+            if not subscribers or self._last.get(event_id) == update:
+                continue
+            self._last[event_id] = update
+            for subscription in subscribers:
+                subscription.push(event_id, update)
+            self.delivered += len(subscribers)
+
+    def start_polling(
+        self,
+        fetch: Callable[[Sequence[UUID]], Awaitable[Iterable]],
+        interval: float
+    ) -> None:
+        """
+        Every interval seconds, call fetch(event ids) for all subscribed
+        events and publish the rows it returns (with id, max_capacity,
+        registered_count and held_count), so counts committed by other workers reach this
+        worker's subscribers.
+        """
+        if interval > 0 and self._poller is None:
+            self._poller = asyncio.get_running_loop().create_task(self._poll(fetch, interval))
+
+    async def _poll(self, fetch, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            event_ids = list(self._subscribers)
+            if not event_ids:
+                continue
+            try:
+                for row in await fetch(event_ids):
+                    self.publish(row.id, row.max_capacity, row.registered_count, row.held_count)
+            except Exception:
+                logger.warning("Seat feed poll failed", exc_info=True)
+
+    async def stop(self) -> None:
+        if self._poller is not None:
+            self._poller.cancel()
+            try:
+                await self._poller
+            except asyncio.CancelledError:
+                pass
+            self._poller = None
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+    def stats(self) -> dict:
+        return {
+            "events": len(self._subscribers),
+            "subscriptions": self.subscriptions,
+            "published": self.published,
+            "delivered": self.delivered,
+        }
+
+
+def _seat_update(event_id: UUID, max_capacity: int, registered_count: int, held_count: int = 0) -> dict:
+    return {
+        "id": str(event_id),
+        "max_capacity": max_capacity,
+        "registered_count": registered_count,
+        "remaining_capacity": max_capacity - registered_count - held_count,
+    }
+
+
+# Fed by app.crud.attendees; polled from the app lifespan.
+seat_feed = SeatFeed(coalesce_ms=get_settings().seat_feed_coalesce_ms)
@@ -0,0 +1,32 @@
+"""
+Helpers for long-lived streaming responses (exports, Server-Sent Events).
+"""
+
+import json
+from typing import Callable, Optional
+
+from fastapi.responses import StreamingResponse
+
+
+class ReleasingStreamingResponse(StreamingResponse):
+    """StreamingResponse that runs on_close once it is done, even if the client disconnects."""
+
+    def __init__(self, *args, on_close: Callable[[], None], **kwargs):
+        super().__init__(*args, **kwargs)
+        self.on_close = on_close
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.on_close()
+
+
+def format_sse(data, event: Optional[str] = None) -> bytes:
+    """Encode one Server-Sent Events message with a JSON data field."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+
+# Comment line sent on idle streams so proxies keep them open and dead clients are noticed.
+SSE_KEEPALIVE = b": keep-alive\n\n"
@@ -0,0 +1,59 @@
+"""
+Background task that runs a sweep coroutine every few seconds.
+
+Used for expiring seat holds: each sweep does bounded work (a batch at a
+time, found on an index) and reports how many rows it removed. Failures are
+logged and retried on the next tick, so a database blip does not kill the
+task. Every worker runs its own sweeper; sweeps must tolerate running
+concurrently (SKIP LOCKED, DELETE ... RETURNING).
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Sweeper:
+    """Run sweep() every interval seconds between start() and stop()."""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.swept = 0
+        self.failures = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self, sweep: Callable[[], Awaitable[int]], interval: float) -> None:
+        if interval > 0 and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._loop(sweep, interval))
+
+    async def _loop(self, sweep, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.swept += await sweep()
+                self.runs += 1
+            except Exception:
+                self.failures += 1
+                logger.warning("Sweep failed", exc_info=True)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {"running": self.running, "runs": self.runs, "swept": self.swept, "failures": self.failures}
+
+
+# Expires seat holds; started from the app lifespan.
+hold_sweeper = Sweeper()